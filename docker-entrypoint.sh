@@ -10,5 +10,16 @@ cp -r staticfiles/ ${DOCKER_NGINX_VOLUME_ROOT}/
 echo "==> $(date +%H:%M:%S) ==> Migrating Django models..."
 python src/manage.py migrate --noinput
 
-echo "==> $(date +%H:%M:%S) ==> Running Gunicorn..."
-exec gunicorn -c /app/src/config/gunicorn.py config.wsgi -b ${GUNICORN_BIND_SOCKET} -b 0.0.0.0:${GUNICORN_BIND_PORT} --chdir /app/src/
+if [ -n "${CONFIG_BUNDLE_ROOT:-}" ]; then
+  echo "==> $(date +%H:%M:%S) ==> Exporting config bundle..."
+  python src/manage.py export_config_bundle
+fi
+
+if [ "${GUNICORN_WORKER_CLASS:-sync}" = "asgi" ]; then
+  APPLICATION=config.asgi
+else
+  APPLICATION=config.wsgi
+fi
+
+echo "==> $(date +%H:%M:%S) ==> Running Gunicorn (${APPLICATION})..."
+exec gunicorn -c /app/src/config/gunicorn.py ${APPLICATION} -b ${GUNICORN_BIND_SOCKET} -b 0.0.0.0:${GUNICORN_BIND_PORT} --chdir /app/src/
@@ -1,9 +1,13 @@
-from django.test import override_settings
-from django.urls import reverse
+from django.test import AsyncRequestFactory, SimpleTestCase, override_settings
+from django.urls import resolve, reverse
 from faker import Faker
 from rest_framework import status
 from rest_framework.test import APITestCase
 
+from config.async_views import build_async_view
+
+from ..views import AboutView, fast_about
+
 faker = Faker()
 
 
@@ -81,3 +85,18 @@ class SwaggerTests(APITestCase):
         response = self.client.get(url, format="json")
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+@override_settings(APPLICATION_VERSION=semver)
+class AsyncAboutViewTests(SimpleTestCase):
+    async def test_response_matches_sync_view(self):
+        view = build_async_view(AboutView, fast_about)
+        url = reverse("v1:about:detail")
+        request = AsyncRequestFactory().get(url)
+        request.resolver_match = resolve(url)
+        expected = await self.async_client.get(url)
+
+        response = await view(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, expected.content)
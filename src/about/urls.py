@@ -1,9 +1,11 @@
 from django.urls import path
 
-from .views import AboutView
+from config.async_views import async_view
+
+from .views import AboutView, fast_about
 
 app_name = "about"
 
 urlpatterns = [
-    path("", AboutView.as_view(), name="detail"),
+    path("", async_view(AboutView, fast_about), name="detail"),
 ]
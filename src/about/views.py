@@ -1,7 +1,10 @@
 from django.conf import settings
+from django.http import HttpRequest, HttpResponse
 from rest_framework.response import Response
+from rest_framework.versioning import NamespaceVersioning
 from rest_framework.views import APIView
 
+from config.rendering import json_response, render_json
 from version import __name__
 
 
@@ -14,3 +17,17 @@ class AboutView(APIView):
             "secure": self.request.is_secure(),
         }
         return Response(response)
+
+
+async def fast_about(request: HttpRequest) -> HttpResponse:
+    """Fast path of the async view (see config.async_views)."""
+    return json_response(
+        render_json(
+            {
+                "name": __name__,
+                "version": settings.APPLICATION_VERSION,
+                "api_version": NamespaceVersioning().determine_version(request),
+                "secure": request.is_secure(),
+            }
+        )
+    )
@@ -16,7 +16,7 @@ ENABLED = os.environ.get("DD_APM_ENABLED", "false").lower() in _TRUTHY
 def setup_tracing() -> None:
     """Initialize ddtrace integrations. Must be called before any Django import.
 
-    Wired into wsgi.py only (WSGI/gunicorn deployment target). Management
+    Wired into wsgi.py and asgi.py (gunicorn sync and asgi workers). Management
     commands do not call this, so APM spans from ``manage.py`` commands will
     lack Django/requests/psycopg patches.
     """
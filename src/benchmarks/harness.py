@@ -0,0 +1,113 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+"""
+Measures the queries, latency and allocations of HTTP requests and compares
+them with a stored baseline.
+"""
+
+import json
+import math
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from django.db import connection
+from django.http import HttpResponse
+from django.test.utils import CaptureQueriesContext
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+
+# Latency and allocations depend on the machine, so only regressions larger
+# than this factor fail. Query counts must not grow at all.
+TOLERANCE = 1.5
+
+
+@dataclass(frozen=True)
+class Measurement:
+    queries: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    peak_kib: float
+
+
+def percentile(sorted_values: list[float], percentile: float) -> float:
+    index = max(math.ceil(percentile / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[index]
+
+
+def measure(
+    request: Callable[[], HttpResponse], iterations: int, warmup: int = 1
+) -> Measurement:
+    """
+    Runs ``request`` ``warmup`` times and then measures ``iterations`` runs.
+
+    Queries are the maximum of a single run. Allocations are the tracemalloc
+    peak of a single extra run, measured apart as tracing slows the runs down.
+    """
+    for _ in range(warmup):
+        request()
+
+    queries = 0
+    timings: list[float] = []
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter_ns()
+            response = request()
+            timings.append((time.perf_counter_ns() - start) / 1e6)
+        if response.status_code >= 400:
+            raise AssertionError(f"Unexpected status code {response.status_code}")
+        queries = max(queries, len(context.captured_queries))
+
+    tracemalloc.start()
+    try:
+        request()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    return Measurement(
+        queries=queries,
+        p50_ms=round(percentile(timings, 50), 3),
+        p95_ms=round(percentile(timings, 95), 3),
+        p99_ms=round(percentile(timings, 99), 3),
+        peak_kib=round(peak / 1024, 1),
+    )
+
+
+def load_baseline() -> dict[str, dict[str, Any]]:
+    if not BASELINE_PATH.exists():
+        return {}
+    baseline: dict[str, dict[str, Any]] = json.loads(BASELINE_PATH.read_text())
+    return baseline
+
+
+def save_baseline(measurements: dict[str, Measurement]) -> None:
+    baseline = load_baseline()
+    baseline.update({name: asdict(m) for name, m in measurements.items()})
+    BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+
+
+def regressions(name: str, measurement: Measurement) -> list[str]:
+    """
+    Returns a description of every metric of ``measurement`` worse than the
+    baseline. Metrics missing from the baseline are not compared, e.g. the
+    timings, which are only recorded on the machine running the benchmarks.
+    """
+    baseline = load_baseline().get(name)
+    if baseline is None:
+        return [f"{name}: no baseline, record it with BENCHMARK_UPDATE_BASELINE=true"]
+    errors = []
+    if measurement.queries > baseline["queries"]:
+        errors.append(
+            f"{name}: {measurement.queries} queries (baseline {baseline['queries']})"
+        )
+    for metric in ("p50_ms", "p95_ms", "p99_ms", "peak_kib"):
+        expected = baseline.get(metric)
+        value = getattr(measurement, metric)
+        if expected is not None and value > expected * TOLERANCE:
+            errors.append(f"{name}: {metric} {value} (baseline {expected})")
+    return errors
@@ -0,0 +1,85 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+"""
+Throughput of a single gunicorn worker through the full middleware stack.
+
+The ASGI handler with the async views (GUNICORN_WORKER_CLASS=asgi) serves
+BENCHMARK_CONCURRENCY concurrent requests. It is compared with the WSGI
+handler of the deployed sync worker, which serves one request at a time
+(PYTHON_MAX_THREADS=1).
+
+Skipped unless RUN_BENCHMARKS=true (see test_endpoints).
+"""
+
+import asyncio
+import logging
+import os
+import time
+
+import pytest
+from django.test import AsyncClient, Client, TransactionTestCase
+from django.urls import reverse
+
+from chains.tests.factories import ChainFactory
+from config.tests.utils import async_views
+
+from .test_endpoints import CHAINS, ITERATIONS, RUN_BENCHMARKS
+
+logger = logging.getLogger(__name__)
+
+CONCURRENCY = int(os.getenv("BENCHMARK_CONCURRENCY", "32"))
+
+
+@pytest.mark.skipif(not RUN_BENCHMARKS, reason="RUN_BENCHMARKS is not enabled")
+class ConcurrencyBenchmarks(TransactionTestCase):
+    def setUp(self) -> None:
+        for chain_id in range(1, CHAINS + 1):
+            ChainFactory.create(id=chain_id, short_name=f"chain-{chain_id}")
+        self.requests = ITERATIONS * CONCURRENCY
+
+    def _wsgi_throughput(self, path: str) -> float:
+        client = Client()
+        client.get(path)
+        statuses = set()
+        start = time.perf_counter_ns()
+        for _ in range(self.requests):
+            statuses.add(client.get(path).status_code)
+        elapsed = time.perf_counter_ns() - start
+        self.assertEqual(statuses, {200})
+        return self.requests / (elapsed / 1e9)
+
+    def _asgi_throughput(self, path: str) -> float:
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(CONCURRENCY)
+
+        async def get() -> int:
+            async with semaphore:
+                response = await client.get(path)
+                return int(response.status_code)
+
+        async def run() -> tuple[set[int], int]:
+            await get()
+            start = time.perf_counter_ns()
+            statuses = await asyncio.gather(*(get() for _ in range(self.requests)))
+            return set(statuses), time.perf_counter_ns() - start
+
+        with async_views():
+            statuses, elapsed = asyncio.run(run())
+        self.assertEqual(statuses, {200})
+        return self.requests / (elapsed / 1e9)
+
+    def test_chains_list_throughput(self) -> None:
+        paths = {
+            "chains_list": reverse("v1:chains:list"),
+            # Custom orderings are served by the DRF view, in a thread
+            "chains_list_ordering": reverse("v1:chains:list") + "?ordering=name",
+        }
+        for name, path in paths.items():
+            wsgi_rps = self._wsgi_throughput(path)
+            asgi_rps = self._asgi_throughput(path)
+            logger.info(
+                "%s: asgi x%d %.0f req/s, wsgi sync worker %.0f req/s",
+                name,
+                CONCURRENCY,
+                asgi_rps,
+                wsgi_rps,
+            )
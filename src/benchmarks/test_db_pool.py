@@ -0,0 +1,90 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+"""
+Latency of a database-bound endpoint as the number of concurrent workers
+grows, with a new connection per request (POSTGRES_CONN_MAX_AGE=0) and with
+the psycopg pool (POSTGRES_POOL).
+
+The live server handles every request in its own thread and closes its
+connections afterwards, like a worker without persistent connections: the
+pool keeps them open instead.
+
+Skipped unless RUN_BENCHMARKS=true (see test_endpoints).
+"""
+
+import logging
+import time
+import urllib.request
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from unittest import mock
+
+import pytest
+from django.db import connections
+from django.test import LiveServerTestCase
+from django.urls import reverse
+
+from chains.tests.factories import ChainFactory
+
+from .harness import percentile
+from .test_endpoints import ITERATIONS, RUN_BENCHMARKS
+
+logger = logging.getLogger(__name__)
+
+WORKERS = (1, 2, 4, 8, 16)
+
+
+@contextmanager
+def pooled(max_size: int) -> Iterator[None]:
+    settings_dict = connections["default"].settings_dict
+    options = {
+        **settings_dict["OPTIONS"],
+        "pool": {"min_size": max_size, "max_size": max_size},
+    }
+    with mock.patch.dict(settings_dict, {"CONN_MAX_AGE": 0, "OPTIONS": options}):
+        try:
+            yield
+        finally:
+            connections["default"].close_pool()
+
+
+@pytest.mark.skipif(not RUN_BENCHMARKS, reason="RUN_BENCHMARKS is not enabled")
+class DatabasePoolBenchmarks(LiveServerTestCase):
+    def setUp(self) -> None:
+        ChainFactory.create_batch(20)
+        # Custom orderings are served by the ORM
+        self.url = self.live_server_url + reverse("v1:chains:list") + "?ordering=name"
+
+    def _get(self, _: int) -> float:
+        start = time.perf_counter_ns()
+        with urllib.request.urlopen(self.url) as response:
+            response.read()
+        return (time.perf_counter_ns() - start) / 1e6
+
+    def _latencies(self, workers: int) -> tuple[float, float]:
+        """Returns the p50 and p95 milliseconds under ``workers`` clients."""
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(self._get, range(workers)))
+            timings = sorted(executor.map(self._get, range(ITERATIONS * workers)))
+        return percentile(timings, 50), percentile(timings, 95)
+
+    def test_latency_by_workers(self) -> None:
+        results = {}
+        for workers in WORKERS:
+            unpooled = self._latencies(workers)
+            with pooled(max_size=workers):
+                results[workers] = (unpooled, self._latencies(workers))
+
+        for workers, ((p50, p95), (pool_p50, pool_p95)) in results.items():
+            logger.info(
+                "db_pool x%d: connect per request p50 %.3fms p95 %.3fms, "
+                "pool p50 %.3fms p95 %.3fms",
+                workers,
+                p50,
+                p95,
+                pool_p50,
+                pool_p95,
+            )
+
+        (p50, _), (pool_p50, _) = results[WORKERS[-1]]
+        self.assertLess(pool_p50, p50)
@@ -0,0 +1,156 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+"""
+Benchmarks of the public endpoints against realistic data volumes.
+
+Skipped unless RUN_BENCHMARKS=true:
+
+    RUN_BENCHMARKS=true pytest src/benchmarks
+
+BENCHMARK_SCALE scales the seeded volumes (default 1.0) and
+BENCHMARK_ITERATIONS the measured requests per endpoint (default 50).
+BENCHMARK_UPDATE_BASELINE=true records the results in baseline.json instead
+of comparing them.
+"""
+
+import logging
+import os
+import random
+from collections.abc import Callable
+
+import pytest
+from django.http import HttpResponse
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+
+from chains.models import Chain, Feature, GasToken, Wallet
+from chains.tests.factories import (
+    ChainFactory,
+    FeatureFactory,
+    GasPriceFactory,
+    GasTokenFactory,
+    ServiceFactory,
+    WalletFactory,
+)
+from safe_apps.tests.factories import SafeAppFactory
+
+from .harness import Measurement, measure, regressions, save_baseline
+
+logger = logging.getLogger(__name__)
+
+RUN_BENCHMARKS = os.getenv("RUN_BENCHMARKS", "false").lower() == "true"
+UPDATE_BASELINE = os.getenv("BENCHMARK_UPDATE_BASELINE", "false").lower() == "true"
+SCALE = float(os.getenv("BENCHMARK_SCALE", "1.0"))
+ITERATIONS = int(os.getenv("BENCHMARK_ITERATIONS", "50"))
+
+CHAINS = max(int(500 * SCALE), 1)
+WALLETS = max(int(50 * SCALE), 1)
+FEATURES = max(int(200 * SCALE), 1)
+GLOBAL_FEATURES = max(FEATURES // 10, 1)
+GAS_TOKENS = max(int(20 * SCALE), 1)
+SAFE_APPS = max(int(5000 * SCALE), 1)
+SERVICES = ("cgw", "wallet-web", "mobile")
+
+
+@pytest.mark.skipif(not RUN_BENCHMARKS, reason="RUN_BENCHMARKS is not enabled")
+class EndpointBenchmarks(APITestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        rng = random.Random(0)
+        # Every created object triggers a CGW hook, which is not configured
+        logging.disable(logging.CRITICAL)
+        try:
+            services = [ServiceFactory.create(key=key) for key in SERVICES]
+            chains = [
+                ChainFactory.create(id=chain_id, short_name=f"chain-{chain_id}")
+                for chain_id in range(1, CHAINS + 1)
+            ]
+            for chain in chains:
+                GasPriceFactory.create_batch(2, chain=chain)
+
+            wallets = [
+                WalletFactory.create(key=f"wallet-{index}") for index in range(WALLETS)
+            ]
+            Wallet.chains.through.objects.bulk_create(
+                Wallet.chains.through(wallet=wallet, chain=chain)
+                for wallet in wallets
+                for chain in rng.sample(chains, len(chains) // 2)
+            )
+
+            features = [
+                FeatureFactory.create(
+                    key=f"feature-{index}",
+                    scope=(
+                        Feature.Scope.GLOBAL
+                        if index < GLOBAL_FEATURES
+                        else Feature.Scope.PER_CHAIN
+                    ),
+                    services=rng.sample(services, 2),
+                )
+                for index in range(FEATURES)
+            ]
+            Feature.chains.through.objects.bulk_create(
+                Feature.chains.through(feature=feature, chain=chain)
+                for feature in features[GLOBAL_FEATURES:]
+                for chain in rng.sample(chains, len(chains) // 4)
+            )
+
+            gas_tokens = GasTokenFactory.create_batch(GAS_TOKENS)
+            GasToken.chains.through.objects.bulk_create(
+                GasToken.chains.through(gastoken=gas_token, chain=chain)
+                for gas_token in gas_tokens
+                for chain in chains
+            )
+
+            for _ in range(SAFE_APPS):
+                SafeAppFactory.create(
+                    chain_ids=[chain.id for chain in rng.sample(chains, 2)]
+                )
+        finally:
+            logging.disable(logging.NOTSET)
+
+    def test_endpoints(self) -> None:
+        chain = Chain.objects.order_by("id").first()
+        assert chain is not None
+        client = APIClient()
+
+        def get(path: str) -> Callable[[], HttpResponse]:
+            return lambda: client.get(path, format="json")  # type: ignore[return-value]
+
+        endpoints = {
+            "about": get(reverse("v1:about:detail")),
+            "v1_chains_list": get(reverse("v1:chains:list")),
+            "v1_chains_list_ordering": get(
+                reverse("v1:chains:list") + "?ordering=-name"
+            ),
+            "v1_chains_detail": get(reverse("v1:chains:detail", args=[chain.id])),
+            "v1_chains_detail_by_short_name": get(
+                reverse("v1:chains:detail_by_short_name", args=[chain.short_name])
+            ),
+            "v1_gas_tokens_list": get(
+                reverse("v1:chains:gas-tokens-list", args=[chain.id])
+            ),
+            "v2_chains_list": get(reverse("v2:chains:list", args=["cgw"])),
+            "v2_chains_detail": get(
+                reverse("v2:chains:detail", args=["cgw", chain.id])
+            ),
+            "v1_safe_apps_list": get(reverse("v1:safe-apps:list")),
+            "v1_safe_apps_list_by_chain": get(
+                reverse("v1:safe-apps:list") + f"?chainId={chain.id}"
+            ),
+        }
+
+        measurements: dict[str, Measurement] = {}
+        for name, request in endpoints.items():
+            measurements[name] = measure(request, iterations=ITERATIONS)
+            logger.info("%s: %s", name, measurements[name])
+
+        if UPDATE_BASELINE:
+            save_baseline(measurements)
+            return
+
+        errors = [
+            error
+            for name, measurement in measurements.items()
+            for error in regressions(name, measurement)
+        ]
+        self.assertEqual(errors, [], "\n".join(errors))
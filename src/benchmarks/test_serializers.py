@@ -0,0 +1,84 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+"""
+Micro-benchmark of the compiled ChainSerializer representation against the
+generic DRF one.
+
+Skipped unless RUN_BENCHMARKS=true (see test_endpoints).
+"""
+
+import logging
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from rest_framework import serializers
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from chains.loaders import ChainBatchLoader
+from chains.models import Chain
+from chains.serializers import ChainSerializer
+from chains.tests.factories import ChainFactory, GasPriceFactory
+
+from .test_endpoints import CHAINS, ITERATIONS, RUN_BENCHMARKS
+
+logger = logging.getLogger(__name__)
+
+
+def _run(serialize: Callable[[], Any]) -> tuple[float, float]:
+    """Returns the median milliseconds and the peak KiB of ``serialize``."""
+    serialize()
+    timings = []
+    for _ in range(ITERATIONS):
+        start = time.perf_counter_ns()
+        serialize()
+        timings.append((time.perf_counter_ns() - start) / 1e6)
+    tracemalloc.start()
+    try:
+        serialize()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    timings.sort()
+    return timings[len(timings) // 2], peak / 1024
+
+
+@pytest.mark.skipif(not RUN_BENCHMARKS, reason="RUN_BENCHMARKS is not enabled")
+class ChainSerializerBenchmarks(APITestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        for chain_id in range(1, CHAINS + 1):
+            chain = ChainFactory.create(id=chain_id, short_name=f"chain-{chain_id}")
+            GasPriceFactory.create_batch(2, chain=chain)
+
+    def test_compiled_representation(self) -> None:
+        chains = list(Chain.objects.order_by("id"))
+        context = {
+            "request": APIRequestFactory().get("/"),
+            # Queries are not part of the benchmark
+            "chain_batch": ChainBatchLoader().load(chains),
+        }
+
+        def compiled() -> Any:
+            return ChainSerializer(chains, many=True, context=context).data
+
+        def generic() -> Any:
+            serializer = ChainSerializer(chains, many=True, context=context)
+            return [
+                serializers.ModelSerializer.to_representation(serializer.child, chain)
+                for chain in chains
+            ]
+
+        with self.assertNumQueries(0):
+            compiled_ms, compiled_kib = _run(compiled)
+            generic_ms, generic_kib = _run(generic)
+        logger.info(
+            "chain_serializer: compiled %.3fms %.1fKiB, generic %.3fms %.1fKiB",
+            compiled_ms,
+            compiled_kib,
+            generic_ms,
+            generic_kib,
+        )
+
+        self.assertLess(compiled_ms, generic_ms)
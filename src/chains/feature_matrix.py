@@ -0,0 +1,115 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+import logging
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from config.versioning import bump_version, get_version, has_expired
+
+from .models import Feature, Service
+
+logger = logging.getLogger(__name__)
+
+# Only features and services changes rebuild the matrix, chains or wallets
+# changes do not (see chains.signals)
+FEATURES_VERSION_NAMESPACE = "features"
+
+
+@dataclass(frozen=True)
+class FeatureMatrix:
+    """
+    Features enabled for every service on every chain (v2).
+
+    A service gets its GLOBAL features on every chain, plus the PER_CHAIN
+    features assigned to the chain. The merged lists are sorted by key once,
+    when the matrix is built.
+    """
+
+    version: int
+    service_keys: frozenset[str]
+    global_features: dict[str, list[Feature]]
+    chain_features: dict[str, dict[int, list[Feature]]]
+    built_at: float = field(default_factory=time.monotonic)
+
+    def is_current(self, version: int) -> bool:
+        return self.version == version and not has_expired(self.built_at)
+
+    def get(self, service_key: str, chain_id: int) -> list[Feature]:
+        chain_features = self.chain_features.get(service_key, {})
+        if chain_id in chain_features:
+            return chain_features[chain_id]
+        return self.global_features.get(service_key, [])
+
+
+def build_matrix(version: int) -> FeatureMatrix:
+    service_keys = frozenset(Service.objects.values_list("key", flat=True))
+
+    features: dict[int, Feature] = {}
+    feature_services: dict[int, list[str]] = defaultdict(list)
+    for link in Feature.services.through.objects.select_related("feature", "service"):
+        features[link.feature_id] = link.feature
+        feature_services[link.feature_id].append(link.service.key)
+
+    global_features: dict[str, list[Feature]] = defaultdict(list)
+    for feature_id, feature in features.items():
+        if feature.scope == Feature.Scope.GLOBAL:
+            for service_key in feature_services[feature_id]:
+                global_features[service_key].append(feature)
+
+    per_chain_features: dict[str, dict[int, list[Feature]]] = defaultdict(
+        lambda: defaultdict(list)
+    )
+    for feature_id, chain_id in Feature.chains.through.objects.filter(
+        feature__scope=Feature.Scope.PER_CHAIN, feature_id__in=features.keys()
+    ).values_list("feature_id", "chain_id"):
+        for service_key in feature_services[feature_id]:
+            per_chain_features[service_key][chain_id].append(features[feature_id])
+
+    def by_key(feature: Feature) -> str:
+        return feature.key
+
+    return FeatureMatrix(
+        version=version,
+        service_keys=service_keys,
+        global_features={
+            service_key: sorted(service_features, key=by_key)
+            for service_key, service_features in global_features.items()
+        },
+        chain_features={
+            service_key: {
+                chain_id: sorted(
+                    [*global_features[service_key], *chain_features], key=by_key
+                )
+                for chain_id, chain_features in service_chains.items()
+            }
+            for service_key, service_chains in per_chain_features.items()
+        },
+    )
+
+
+_matrix: FeatureMatrix | None = None
+_lock = threading.Lock()
+
+
+def get_matrix() -> FeatureMatrix:
+    global _matrix
+    version = get_version(FEATURES_VERSION_NAMESPACE)
+    matrix = _matrix
+    if matrix is None or not matrix.is_current(version):
+        with _lock:
+            matrix = _matrix
+            if matrix is None or not matrix.is_current(version):
+                logger.info("Building feature matrix for version %d", version)
+                matrix = _matrix = build_matrix(version)
+    return matrix
+
+
+def invalidate() -> None:
+    bump_version(FEATURES_VERSION_NAMESPACE)
+
+
+def clear() -> None:
+    global _matrix
+    with _lock:
+        _matrix = None
@@ -0,0 +1,135 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+import logging
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.http import HttpRequest
+
+from config import timing
+from config.rendering import render_json
+from config.versioning import (
+    aget_version,
+    aversion_etag,
+    bump_version,
+    get_version,
+    has_expired,
+    version_etag,
+)
+
+from .models import Chain, GasToken
+from .serializers import GasTokenSerializer
+from .snapshot import CHAINS_VERSION_NAMESPACE
+
+logger = logging.getLogger(__name__)
+
+GAS_TOKENS_VERSION_NAMESPACE = "gas-tokens"
+
+# Same ordering as GasTokensListView.get_queryset
+ORDERING = ("gastoken__priority", "gastoken__symbol", "gastoken__id")
+
+
+def _chain_namespace(chain_id: int) -> str:
+    return f"{GAS_TOKENS_VERSION_NAMESPACE}:chain:{chain_id}"
+
+
+@dataclass(frozen=True)
+class GasTokenIndex:
+    """
+    Gas tokens of every visible chain, ordered and rendered as JSON fragments.
+
+    A token accepted on several chains is rendered once and its fragment is
+    shared by the lists of those chains.
+    """
+
+    version: tuple[int, int]
+    by_chain: dict[int, list[bytes]]
+    built_at: float = field(default_factory=time.monotonic)
+
+    def is_current(self, version: tuple[int, int]) -> bool:
+        return self.version == version and not has_expired(self.built_at)
+
+
+@timing.timed(timing.SERIALIZE)
+def build_index(version: tuple[int, int]) -> GasTokenIndex:
+    by_chain: dict[int, list[bytes]] = {
+        chain_id: []
+        for chain_id in Chain.objects.filter(hidden=False).values_list("id", flat=True)
+    }
+    fragments: dict[int, bytes] = {}
+    for link in (
+        GasToken.chains.through.objects.filter(chain__hidden=False)
+        .select_related("gastoken")
+        .order_by(*ORDERING)
+    ):
+        fragment = fragments.get(link.gastoken_id)
+        if fragment is None:
+            fragment = fragments[link.gastoken_id] = render_json(
+                GasTokenSerializer(link.gastoken).data
+            )
+        by_chain[link.chain_id].append(fragment)
+    return GasTokenIndex(version=version, by_chain=by_chain)
+
+
+_index: GasTokenIndex | None = None
+_lock = threading.Lock()
+
+
+def get_index() -> GasTokenIndex:
+    global _index
+    # The index also depends on the visible chains
+    version = (
+        get_version(CHAINS_VERSION_NAMESPACE),
+        get_version(GAS_TOKENS_VERSION_NAMESPACE),
+    )
+    index = _index
+    if index is None or not index.is_current(version):
+        with _lock:
+            index = _index
+            if index is None or not index.is_current(version):
+                logger.info("Building gas tokens index for version %s", version)
+                index = _index = build_index(version)
+    return index
+
+
+async def aget_index() -> GasTokenIndex:
+    """Async get_index, a stale index is rebuilt in a worker thread."""
+    index = _index
+    if index is not None and index.is_current(
+        (
+            await aget_version(CHAINS_VERSION_NAMESPACE),
+            await aget_version(GAS_TOKENS_VERSION_NAMESPACE),
+        )
+    ):
+        return index
+    return await sync_to_async(get_index)()
+
+
+def etag(request: HttpRequest, *args: Any, **kwargs: Any) -> str:
+    """ETag of the gas tokens of chain ``pk``, see version_etag."""
+    return version_etag(CHAINS_VERSION_NAMESPACE, _chain_namespace(kwargs["pk"]))(
+        request
+    )
+
+
+async def aetag(request: HttpRequest, *args: Any, **kwargs: Any) -> str:
+    """Async etag, for config.async_views.condition."""
+    return await aversion_etag(
+        CHAINS_VERSION_NAMESPACE, _chain_namespace(kwargs["pk"])
+    )(request)
+
+
+def invalidate(chain_ids: Iterable[int]) -> None:
+    """Invalidates the index and the ETags of the gas tokens of ``chain_ids``."""
+    bump_version(GAS_TOKENS_VERSION_NAMESPACE)
+    for chain_id in set(chain_ids):
+        bump_version(_chain_namespace(chain_id))
+
+
+def clear() -> None:
+    global _index
+    with _lock:
+        _index = None
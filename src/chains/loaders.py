@@ -0,0 +1,91 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from . import feature_matrix
+from .models import Chain, Feature, GasPrice, Wallet
+
+
+@dataclass(frozen=True)
+class ChainBatch:
+    """Related objects required to serialize a set of chains."""
+
+    chain_ids: frozenset[int] = frozenset()
+    gas_prices: dict[int, list[GasPrice]] = field(default_factory=dict)
+    disabled_wallets: dict[int, list[Wallet]] = field(default_factory=dict)
+    features: dict[int, list[Feature]] = field(default_factory=dict)
+
+
+class ChainBatchLoader:
+    """
+    Loads gas prices, wallets and features for many chains at once.
+
+    The number of queries does not depend on the number of chains: one per
+    related model. The features of a service are read from the in-memory
+    feature matrix instead.
+
+    Args:
+        service_key: When set, only the features assigned to this service are
+            loaded (v2). GLOBAL features are then enabled on every chain.
+    """
+
+    def __init__(self, service_key: str | None = None) -> None:
+        self.service_key = service_key
+
+    def load(self, chains: Iterable[Chain]) -> ChainBatch:
+        chains_by_id = {chain.id: chain for chain in chains}
+        chain_ids = frozenset(chains_by_id)
+        if not chain_ids:
+            return ChainBatch()
+        return ChainBatch(
+            chain_ids=chain_ids,
+            gas_prices=self._load_gas_prices(chains_by_id),
+            disabled_wallets=self._load_disabled_wallets(chain_ids),
+            features=self._load_features(chain_ids),
+        )
+
+    @staticmethod
+    def _load_gas_prices(chains: dict[int, Chain]) -> dict[int, list[GasPrice]]:
+        gas_prices: dict[int, list[GasPrice]] = defaultdict(list)
+        for gas_price in GasPrice.objects.filter(chain_id__in=chains.keys()).order_by(
+            "rank"
+        ):
+            # Read by the error of an invalid gas price
+            gas_price.chain = chains[gas_price.chain_id]
+            gas_prices[gas_price.chain_id].append(gas_price)
+        return gas_prices
+
+    @staticmethod
+    def _load_disabled_wallets(chain_ids: frozenset[int]) -> dict[int, list[Wallet]]:
+        wallets = list(Wallet.objects.order_by("key"))
+        enabled_wallet_ids: dict[int, set[int]] = defaultdict(set)
+        for chain_id, wallet_id in Wallet.chains.through.objects.filter(
+            chain_id__in=chain_ids
+        ).values_list("chain_id", "wallet_id"):
+            enabled_wallet_ids[chain_id].add(wallet_id)
+        return {
+            chain_id: [
+                wallet
+                for wallet in wallets
+                if wallet.id not in enabled_wallet_ids[chain_id]
+            ]
+            for chain_id in chain_ids
+        }
+
+    def _load_features(self, chain_ids: frozenset[int]) -> dict[int, list[Feature]]:
+        if self.service_key is not None:
+            matrix = feature_matrix.get_matrix()
+            return {
+                chain_id: matrix.get(self.service_key, chain_id)
+                for chain_id in chain_ids
+            }
+
+        features: dict[int, list[Feature]] = defaultdict(list)
+        for link in (
+            Feature.chains.through.objects.filter(chain_id__in=chain_ids)
+            .select_related("feature")
+            .order_by("feature__key")
+        ):
+            features[link.chain_id].append(link.feature)
+        return features
@@ -11,6 +11,8 @@ from django.db import models
 from django.db.models import QuerySet
 from safe_eth.eth.django.models import EthereumAddressBinaryField, Uint256Field
 
+from config.tracking import TrackedFieldsMixin
+
 HEX_ARGB_REGEX = re.compile("^#[0-9a-fA-F]{6}$")
 
 color_validator = RegexValidator(HEX_ARGB_REGEX, "Invalid hex color", "invalid")
@@ -63,7 +65,7 @@ def validate_url(url: str) -> None:
         raise ValidationError(f"{url} is not a valid url")
 
 
-class Chain(models.Model):
+class Chain(TrackedFieldsMixin, models.Model):
     class RpcAuthentication(models.TextChoices):
         API_KEY_PATH = "API_KEY_PATH"
         NO_AUTHENTICATION = "NO_AUTHENTICATION"
@@ -1,5 +1,6 @@
 # SPDX-License-Identifier: FSL-1.1-MIT
 from abc import abstractmethod
+from collections.abc import Callable, Iterable
 from typing import Any
 
 from drf_yasg.utils import swagger_serializer_method
@@ -8,7 +9,10 @@ from rest_framework import serializers
 from rest_framework.exceptions import APIException
 from rest_framework.utils.serializer_helpers import ReturnDict
 
-from .models import Chain, Feature, GasPrice, GasToken, Service, Wallet
+from config.serialization import compile_serializer
+
+from .loaders import ChainBatch, ChainBatchLoader
+from .models import Chain, Feature, GasPrice, GasToken, Wallet
 
 
 class GasPriceOracleSerializer(serializers.Serializer[GasPrice]):
@@ -43,27 +47,31 @@ class GasPriceSerializer(serializers.ModelSerializer[GasPrice]):
         ref_name = "chains.serializers.GasPriceSerializer"
 
     def to_representation(self, instance: GasPrice) -> ReturnDict[Any, Any]:
+        return self.get_variant(instance)(instance).data
+
+    @staticmethod
+    def get_variant(instance: GasPrice) -> type[serializers.Serializer[GasPrice]]:
         if (
             instance.oracle_uri
             and instance.fixed_wei_value is None
             and instance.max_fee_per_gas is None
             and instance.max_priority_fee_per_gas is None
         ):
-            return GasPriceOracleSerializer(instance).data
+            return GasPriceOracleSerializer
         elif (
             instance.fixed_wei_value is not None
             and instance.oracle_uri is None
             and instance.max_fee_per_gas is None
             and instance.max_priority_fee_per_gas is None
         ):
-            return GasPriceFixedSerializer(instance).data
+            return GasPriceFixedSerializer
         elif (
             instance.max_fee_per_gas
             and instance.max_priority_fee_per_gas
             and instance.oracle_uri is None
             and instance.fixed_wei_value is None
         ):
-            return GasPriceFixed1559Serializer(instance).data
+            return GasPriceFixed1559Serializer
         else:
             raise APIException(
                 f"The gas price oracle or a fixed gas price was not provided for chain {instance.chain}"
@@ -239,76 +247,124 @@ class ChainSerializer(serializers.ModelSerializer[Chain]):
             "relayer",
         ]
 
+    _compiled: Callable[[Chain], dict[str, Any]] | None = None
+    _nested: (
+        dict[type[serializers.Serializer[Any]], Callable[[Any], dict[str, Any]]] | None
+    ) = None
+    _chain_batch: ChainBatch | None = None
+
+    def to_representation(self, instance: Chain) -> dict[str, Any]:
+        # With many=True the child serializer, and so the compiled function,
+        # is shared by every chain of the list
+        if self._compiled is None:
+            self._compiled = compile_serializer(self)
+        return self._compiled(instance)
+
+    def _represent(
+        self, serializer_class: type[serializers.Serializer[Any]], instance: Any
+    ) -> dict[str, Any]:
+        """
+        Returns the representation of ``instance`` by the nested
+        ``serializer_class``, compiled once for every chain of the list (see
+        compile_serializer).
+        """
+        if self._nested is None:
+            self._nested = {}
+        representation = self._nested.get(serializer_class)
+        if representation is None:
+            representation = self._nested[serializer_class] = compile_serializer(
+                serializer_class(context=self.context)
+            )
+        return representation(instance)
+
     @swagger_serializer_method(serializer_or_field=CurrencySerializer)  # type: ignore[untyped-decorator]
-    def get_native_currency(self, obj: Chain) -> ReturnDict[Any, Any]:
-        return CurrencySerializer(
-            obj, context={"request": self.context["request"]}
-        ).data
+    def get_native_currency(self, obj: Chain) -> dict[str, Any]:
+        return self._represent(CurrencySerializer, obj)
 
-    @staticmethod
     @swagger_serializer_method(serializer_or_field=ThemeSerializer)  # type: ignore[untyped-decorator]
-    def get_theme(obj: Chain) -> ReturnDict[Any, Any]:
-        return ThemeSerializer(obj).data
+    def get_theme(self, obj: Chain) -> dict[str, Any]:
+        return self._represent(ThemeSerializer, obj)
 
-    @staticmethod
     @swagger_serializer_method(serializer_or_field=BaseRpcUriSerializer)  # type: ignore[untyped-decorator]
-    def get_safe_apps_rpc_uri(obj: Chain) -> ReturnDict[Any, Any]:
-        return SafeAppsRpcUriSerializer(obj).data
+    def get_safe_apps_rpc_uri(self, obj: Chain) -> dict[str, Any]:
+        return self._represent(SafeAppsRpcUriSerializer, obj)
 
-    @staticmethod
     @swagger_serializer_method(serializer_or_field=BaseRpcUriSerializer)  # type: ignore[untyped-decorator]
-    def get_rpc_uri(obj: Chain) -> ReturnDict[Any, Any]:
-        return RpcUriSerializer(obj).data
+    def get_rpc_uri(self, obj: Chain) -> dict[str, Any]:
+        return self._represent(RpcUriSerializer, obj)
 
-    @staticmethod
     @swagger_serializer_method(serializer_or_field=BaseRpcUriSerializer)  # type: ignore[untyped-decorator]
-    def get_public_rpc_uri(obj: Chain) -> ReturnDict[Any, Any]:
-        return PublicRpcUriSerializer(obj).data
+    def get_public_rpc_uri(self, obj: Chain) -> dict[str, Any]:
+        return self._represent(PublicRpcUriSerializer, obj)
 
-    @staticmethod
     @swagger_serializer_method(serializer_or_field=BlockExplorerUriTemplateSerializer)  # type: ignore[untyped-decorator]
-    def get_block_explorer_uri_template(obj: Chain) -> ReturnDict[Any, Any]:
-        return BlockExplorerUriTemplateSerializer(obj).data
+    def get_block_explorer_uri_template(self, obj: Chain) -> dict[str, Any]:
+        return self._represent(BlockExplorerUriTemplateSerializer, obj)
 
-    @staticmethod
     @swagger_serializer_method(serializer_or_field=BeaconChainExplorerUriTemplateSerializer)  # type: ignore[untyped-decorator]
-    def get_beacon_chain_explorer_uri_template(obj: Chain) -> ReturnDict[Any, Any]:
-        return BeaconChainExplorerUriTemplateSerializer(obj).data
+    def get_beacon_chain_explorer_uri_template(self, obj: Chain) -> dict[str, Any]:
+        return self._represent(BeaconChainExplorerUriTemplateSerializer, obj)
+
+    def _get_chain_batch(self, instance: Chain) -> ChainBatch:
+        """
+        Returns the related objects of the serialized chains.
+
+        Views provide them in the "chain_batch" context key. Otherwise they are
+        loaded once for every chain handled by the root serializer, and kept by
+        this serializer (the child shared by every chain of a list).
+        """
+        batch: ChainBatch | None = self._chain_batch or self.context.get(
+            "chain_batch"
+        )
+        if batch is None or instance.id not in batch.chain_ids:
+            root_instance = self.root.instance
+            chains = list(root_instance) if isinstance(root_instance, Iterable) else []
+            if instance not in chains:
+                chains.append(instance)
+            batch = ChainBatchLoader(self.context.get("service_key")).load(chains)
+            self._chain_batch = batch
+        return batch
 
     @swagger_serializer_method(serializer_or_field=GasPriceSerializer)  # type: ignore[untyped-decorator]
-    def get_gas_price(self, instance: Chain) -> ReturnDict[Any, Any]:
-        ranked_gas_prices = instance.gasprice_set.all().order_by("rank")
-        return GasPriceSerializer(ranked_gas_prices, many=True).data
+    def get_gas_price(self, instance: Chain) -> list[dict[str, Any]]:
+        ranked_gas_prices = self._get_chain_batch(instance).gas_prices.get(
+            instance.id, []
+        )
+        # Same as GasPriceSerializer.to_representation
+        return [
+            self._represent(GasPriceSerializer.get_variant(gas_price), gas_price)
+            for gas_price in ranked_gas_prices
+        ]
 
     @swagger_serializer_method(serializer_or_field=WalletSerializer)  # type: ignore[untyped-decorator]
-    def get_disabled_wallets(self, instance: Chain) -> ReturnDict[Any, Any]:
-        disabled_wallets = instance.get_disabled_wallets().order_by("key")
-        return WalletSerializer(disabled_wallets, many=True).data
+    def get_disabled_wallets(self, instance: Chain) -> list[str]:
+        disabled_wallets = self._get_chain_batch(instance).disabled_wallets.get(
+            instance.id, []
+        )
+        wallet_serializer = WalletSerializer()
+        return [
+            wallet_serializer.to_representation(wallet) for wallet in disabled_wallets
+        ]
 
     @swagger_serializer_method(serializer_or_field=FeatureSerializer)  # type: ignore[untyped-decorator]
-    def get_features(self, instance: Chain) -> ReturnDict[Any, Any]:
-        service: Service | None = self.context.get("service")
-        if service:
-            global_features = self.context.get("_service_global_features", [])
-            per_chain_features = instance.feature_set.all()
-            enabled_features = sorted(
-                [*global_features, *per_chain_features],
-                key=lambda f: f.key,
-            )
-        else:
-            enabled_features = list(
-                instance.feature_set.all().order_by("key")
-            )
-        return FeatureSerializer(enabled_features, many=True).data
+    def get_features(self, instance: Chain) -> list[str]:
+        enabled_features = self._get_chain_batch(instance).features.get(
+            instance.id, []
+        )
+        feature_serializer = FeatureSerializer()
+        return [
+            feature_serializer.to_representation(feature)
+            for feature in enabled_features
+        ]
 
     @swagger_serializer_method(serializer_or_field=PricesProviderSerializer)  # type: ignore[untyped-decorator]
-    def get_prices_provider(self, instance: Chain) -> ReturnDict[Any, Any]:
-        return PricesProviderSerializer(instance).data
+    def get_prices_provider(self, instance: Chain) -> dict[str, Any]:
+        return self._represent(PricesProviderSerializer, instance)
 
     @swagger_serializer_method(serializer_or_field=BalancesProviderSerializer)  # type: ignore[untyped-decorator]
-    def get_balances_provider(self, instance: Chain) -> ReturnDict[Any, Any]:
-        return BalancesProviderSerializer(instance).data
+    def get_balances_provider(self, instance: Chain) -> dict[str, Any]:
+        return self._represent(BalancesProviderSerializer, instance)
 
     @swagger_serializer_method(serializer_or_field=RelayerSerializer)  # type: ignore[untyped-decorator]
-    def get_relayer(self, instance: Chain) -> ReturnDict[Any, Any]:
-        return RelayerSerializer(instance).data
+    def get_relayer(self, instance: Chain) -> dict[str, Any]:
+        return self._represent(RelayerSerializer, instance)
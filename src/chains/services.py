@@ -3,7 +3,7 @@ import logging
 from collections.abc import Iterable
 
 from chains.models import Service
-from clients.safe_client_gateway import HookEvent, hook_event
+from clients.safe_client_gateway import HookEvent, hook_events
 
 logger = logging.getLogger(__name__)
 
@@ -33,10 +33,11 @@ class ChainUpdateWebhookService:
                     len(service_keys),
                 )
 
+        events = []
         for chain_id in chain_ids:
             if service_keys:
                 for service_key in service_keys:
-                    hook_event(
+                    events.append(
                         HookEvent(
                             type=HookEvent.Type.CHAIN_UPDATE,
                             chain_id=chain_id,
@@ -44,9 +45,10 @@ class ChainUpdateWebhookService:
                         )
                     )
             else:
-                hook_event(
+                events.append(
                     HookEvent(
                         type=HookEvent.Type.CHAIN_UPDATE,
                         chain_id=chain_id,
                     )
                 )
+        hook_events(events)
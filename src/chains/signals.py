@@ -7,7 +7,8 @@ from django.core.signals import request_finished
 from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
 
-from .models import Chain, Feature, GasPrice, Service, Wallet
+from . import feature_matrix, gas_tokens, snapshot
+from .models import Chain, Feature, GasPrice, GasToken, Service, Wallet
 from .services import ChainUpdateWebhookService
 
 logger = logging.getLogger(__name__)
@@ -33,16 +34,50 @@ def _clear_feature_old_scope(instance: Feature) -> None:
         del cache[id(instance)]
 
 
+# Chains saved without changing their fields, by id, between their pre_save
+# and post_save signals
+_unchanged_chain_storage = threading.local()
+
+
+def _get_unchanged_chains() -> dict[int, Chain]:
+    if not hasattr(_unchanged_chain_storage, "chains"):
+        _unchanged_chain_storage.chains = {}
+    chains: dict[int, Chain] = _unchanged_chain_storage.chains
+    return chains
+
+
 @receiver(request_finished)
 def _clear_feature_scope_cache(**kwargs: Any) -> None:
     if hasattr(_feature_scope_storage, "cache"):
         _feature_scope_storage.cache.clear()
+    if hasattr(_unchanged_chain_storage, "chains"):
+        _unchanged_chain_storage.chains.clear()
+
+
+# Saving a chain without changing its fields, e.g. an admin save without
+# edits, or a change of a hidden chain, neither invalidates the caches nor
+# notifies CGW. The fields are compared with the values the chain was loaded
+# with (see config.tracking), its related objects have their own receivers
+@receiver(pre_save, sender=Chain)
+def on_chain_pre_save(sender: Chain, instance: Chain, **kwargs: Any) -> None:
+    changed = instance.get_changed_fields()
+    if changed is None:
+        return
+    # Hidden chains are not served
+    if not changed or (instance.hidden and "hidden" not in changed):
+        _get_unchanged_chains()[id(instance)] = instance
 
 
 @receiver(post_save, sender=Chain)
 @receiver(post_delete, sender=Chain)
 def on_chain_update(sender: Chain, instance: Chain, **kwargs: Any) -> None:
+    # The instance is kept in the storage so its id cannot be reused
+    unchanged = _get_unchanged_chains().pop(id(instance), None) is instance
+    if unchanged and kwargs["signal"] is post_save:
+        logger.info("Chain %s fields unchanged. Skipping CGW webhook", instance.id)
+        return
     logger.info("Chain update. Triggering CGW webhook")
+    snapshot.invalidate()
     webhook_service.notify([instance.id])
 
 
@@ -50,6 +85,7 @@ def on_chain_update(sender: Chain, instance: Chain, **kwargs: Any) -> None:
 @receiver(post_delete, sender=GasPrice)
 def on_gas_price_update(sender: GasPrice, instance: GasPrice, **kwargs: Any) -> None:
     logger.info("GasPrice update. Triggering CGW webhook")
+    snapshot.invalidate()
     webhook_service.notify([instance.chain.id])
 
 
@@ -73,6 +109,8 @@ def on_feature_scope_change_pre_save(sender: Feature, instance: Feature, **kwarg
 @receiver(pre_delete, sender=Feature)
 def on_feature_changed(sender: Feature, instance: Feature, **kwargs: Any) -> None:
     logger.info("Feature update. Triggering CGW webhook")
+    snapshot.invalidate()
+    feature_matrix.invalidate()
     old_scope = _get_feature_old_scope(instance)
     if old_scope and old_scope != instance.scope:
         # Scope changes are handled by the on_feature_scope_change_post_save signal
@@ -100,6 +138,8 @@ def on_feature_scope_change_post_save(sender: Feature, instance: Feature, **kwar
         old_scope,
         instance.scope,
     )
+    snapshot.invalidate()
+    feature_matrix.invalidate()
     service_keys = list(instance.services.values_list("key", flat=True))
     chain_ids = Chain.objects.values_list("id", flat=True)
     webhook_service.notify(chain_ids, service_keys)
@@ -111,6 +151,8 @@ def on_feature_chains_changed(
     sender: Feature, instance: Feature, action: str, pk_set: set[int], **kwargs: Any
 ) -> None:
     logger.info("FeatureChains update. Triggering CGW webhook")
+    snapshot.invalidate()
+    feature_matrix.invalidate()
     old_scope = _get_feature_old_scope(instance)
     if old_scope and old_scope != instance.scope:
         return
@@ -125,6 +167,8 @@ def on_feature_services_changed(
     sender: Feature, instance: Feature, action: str, pk_set: set[int], **kwargs: Any
 ) -> None:
     logger.info("FeatureServices update. Triggering CGW webhook")
+    snapshot.invalidate()
+    feature_matrix.invalidate()
     if action in ("post_add", "post_remove"):
         affected_service_keys = list(
             Service.objects.filter(pk__in=pk_set).values_list("key", flat=True)
@@ -141,6 +185,7 @@ def on_feature_services_changed(
 @receiver(pre_delete, sender=Wallet)
 def on_wallet_changed(sender: Wallet, instance: Wallet, **kwargs: Any) -> None:
     logger.info("Wallet update. Triggering CGW webhook")
+    snapshot.invalidate()
     chain_ids = instance.chains.values_list("id", flat=True)
     webhook_service.notify(chain_ids)
 
@@ -150,5 +195,55 @@ def on_wallet_chains_changed(
     sender: Wallet, instance: Wallet, action: str, pk_set: set[int], **kwargs: Any
 ) -> None:
     logger.info("WalletChains update. Triggering CGW webhook")
+    snapshot.invalidate()
     if action in ("post_add", "post_remove"):
         webhook_service.notify(pk_set)
+
+
+# Services are not part of the CHAIN_UPDATE payloads but they are served by
+# the chains endpoints, whose ETags depend on the config version
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def on_service_update(sender: Service, instance: Service, **kwargs: Any) -> None:
+    logger.info("Service update. Invalidating chains config")
+    snapshot.invalidate()
+    feature_matrix.invalidate()
+
+
+def _get_gas_token_chain_ids(
+    instance: GasToken | Chain, action: str, pk_set: set[int] | None
+) -> set[int]:
+    """Chain ids affected by a GasToken.chains change."""
+    if isinstance(instance, Chain):  # reverse relation: pk_set holds GasTokens
+        return {instance.id}
+    if action == "pre_clear":
+        return set(instance.chains.values_list("id", flat=True))
+    return set(pk_set or ())
+
+
+# pre_delete is used because on pre_delete the model still has chains
+# which is not the case on post_delete
+@receiver(post_save, sender=GasToken)
+@receiver(pre_delete, sender=GasToken)
+def on_gas_token_update(sender: GasToken, instance: GasToken, **kwargs: Any) -> None:
+    logger.info("GasToken update. Triggering CGW webhook")
+    chain_ids = set(instance.chains.values_list("id", flat=True))
+    gas_tokens.invalidate(chain_ids)
+    webhook_service.notify(chain_ids)
+
+
+@receiver(m2m_changed, sender=GasToken.chains.through)
+def on_gas_token_chains_changed(
+    sender: GasToken,
+    instance: GasToken | Chain,
+    action: str,
+    pk_set: set[int] | None,
+    **kwargs: Any,
+) -> None:
+    logger.info("GasTokenChains update. Triggering CGW webhook")
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    chain_ids = _get_gas_token_chain_ids(instance, action, pk_set)
+    gas_tokens.invalidate(chain_ids)
+    if action == "post_add" or action == "post_remove":
+        webhook_service.notify(chain_ids)
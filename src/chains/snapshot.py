@@ -0,0 +1,112 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+
+from asgiref.sync import sync_to_async
+from rest_framework.request import Request
+
+from config import metrics, timing
+from config.rendering import render_json
+from config.versioning import (
+    aget_version,
+    bump_version,
+    get_version,
+    has_expired,
+)
+
+from .loaders import ChainBatchLoader
+from .models import Chain
+from .serializers import ChainSerializer
+
+logger = logging.getLogger(__name__)
+
+CHAINS_VERSION_NAMESPACE = "chains"
+
+SNAPSHOT_LOOKUPS = metrics.registry.counter(
+    "chains_snapshot_lookups_total",
+    "Lookups of the chains snapshot by result, a miss builds it",
+    ("result",),
+)
+
+# Same ordering as ChainsListView.ordering
+DEFAULT_ORDERING = ("relevance", "name")
+
+
+@dataclass(frozen=True)
+class ChainSnapshot:
+    """
+    v1 chain configs of every visible chain, rendered as JSON fragments.
+
+    Built once per config version and per base URL (image fields are
+    rendered as absolute URIs) and shared by all requests of the process.
+    """
+
+    version: int
+    results: list[bytes]
+    by_id: dict[int, bytes]
+    by_short_name: dict[str, bytes]
+    built_at: float = field(default_factory=time.monotonic)
+
+    def is_current(self, version: int) -> bool:
+        return self.version == version and not has_expired(self.built_at)
+
+
+_snapshots: dict[str, ChainSnapshot] = {}
+_lock = threading.Lock()
+
+
+@timing.timed(timing.SERIALIZE)
+def build_snapshot(request: Request, version: int) -> ChainSnapshot:
+    chains = list(Chain.objects.filter(hidden=False).order_by(*DEFAULT_ORDERING))
+    context = {"request": request, "chain_batch": ChainBatchLoader().load(chains)}
+    results = [
+        render_json(data)
+        for data in ChainSerializer(chains, many=True, context=context).data
+    ]
+    return ChainSnapshot(
+        version=version,
+        results=results,
+        by_id={chain.id: result for chain, result in zip(chains, results)},
+        by_short_name={
+            chain.short_name: result for chain, result in zip(chains, results)
+        },
+    )
+
+
+def get_snapshot(request: Request) -> ChainSnapshot:
+    version = get_version(CHAINS_VERSION_NAMESPACE)
+    base_url = request.build_absolute_uri("/")
+    snapshot = _snapshots.get(base_url)
+    if snapshot is None or not snapshot.is_current(version):
+        with _lock:
+            snapshot = _snapshots.get(base_url)
+            if snapshot is None or not snapshot.is_current(version):
+                logger.info("Building chains snapshot for version %d", version)
+                snapshot = build_snapshot(request, version)
+                _snapshots[base_url] = snapshot
+                SNAPSHOT_LOOKUPS.inc("miss")
+                return snapshot
+    SNAPSHOT_LOOKUPS.inc("hit")
+    return snapshot
+
+
+async def aget_snapshot(request: Request) -> ChainSnapshot:
+    """Async get_snapshot, a stale snapshot is rebuilt in a worker thread."""
+    snapshot = _snapshots.get(request.build_absolute_uri("/"))
+    if snapshot is not None and snapshot.is_current(
+        await aget_version(CHAINS_VERSION_NAMESPACE)
+    ):
+        SNAPSHOT_LOOKUPS.inc("hit")
+        return snapshot
+    return await sync_to_async(get_snapshot)(request)
+
+
+def invalidate() -> None:
+    bump_version(CHAINS_VERSION_NAMESPACE)
+
+
+def clear() -> None:
+    with _lock:
+        _snapshots.clear()
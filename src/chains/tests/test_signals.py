@@ -1,14 +1,18 @@
 # SPDX-License-Identifier: FSL-1.1-MIT
+import json
 from unittest.mock import patch
 
 import responses
 from django.core.signals import request_finished
-from django.test import TestCase, override_settings
+from django.http import HttpRequest, HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
 from faker import Faker
 
-from ..models import Feature, Service, Wallet
+from config.middleware import HookEventsMiddleware
+
+from ..models import Chain, Feature, Service, Wallet
 from ..signals import _clear_feature_old_scope, _feature_scope_storage, _set_feature_old_scope
-from .factories import ChainFactory, FeatureFactory, GasPriceFactory, ServiceFactory, WalletFactory
+from .factories import ChainFactory, FeatureFactory, GasPriceFactory, GasTokenFactory, ServiceFactory, WalletFactory
 
 fake = Faker()
 Faker.seed(0)
@@ -845,3 +849,124 @@ class GasPriceHookTestCase(TestCase):
         for call in responses.calls:
             body = call.request.body.decode("utf-8")
             assert f'"chainId": "{self.chain.id}"' in body
+
+
+@override_settings(CGW_URL="http://127.0.0.1", CGW_AUTH_TOKEN="example-token")
+class GasTokenHookTestCase(TestCase):
+    def setUp(self) -> None:
+        self.chain = ChainFactory.create()
+
+    def _chain_ids(self) -> list[str]:
+        return [
+            json.loads(call.request.body)["chainId"] for call in responses.calls
+        ]
+
+    @responses.activate
+    def test_on_gas_token_chains_added(self) -> None:
+        gas_token = GasTokenFactory.create()
+        responses.reset()
+        responses.add(responses.POST, "http://127.0.0.1/v1/hooks/events", status=200)
+
+        gas_token.chains.add(self.chain)
+
+        assert self._chain_ids() == [str(self.chain.id)]
+
+    @responses.activate
+    def test_on_gas_token_update(self) -> None:
+        gas_token = GasTokenFactory.create(chains=(self.chain,))
+        responses.reset()
+        responses.add(responses.POST, "http://127.0.0.1/v1/hooks/events", status=200)
+
+        gas_token.priority = 1
+        gas_token.save()
+
+        assert self._chain_ids() == [str(self.chain.id)]
+
+    @responses.activate
+    def test_on_gas_token_delete(self) -> None:
+        gas_token = GasTokenFactory.create(chains=(self.chain,))
+        responses.reset()
+        responses.add(responses.POST, "http://127.0.0.1/v1/hooks/events", status=200)
+
+        gas_token.delete()
+
+        assert self._chain_ids() == [str(self.chain.id)]
+
+    @responses.activate
+    def test_on_chain_gas_tokens_removed(self) -> None:
+        gas_token = GasTokenFactory.create(chains=(self.chain,))
+        responses.reset()
+        responses.add(responses.POST, "http://127.0.0.1/v1/hooks/events", status=200)
+
+        self.chain.gastoken_set.remove(gas_token)
+
+        assert self._chain_ids() == [str(self.chain.id)]
+
+
+@override_settings(CGW_URL="http://127.0.0.1", CGW_AUTH_TOKEN="example-token")
+class RequestHooksTestCase(TestCase):
+    @responses.activate
+    def test_request_changes_notified_once(self) -> None:
+        responses.add(responses.POST, "http://127.0.0.1/v1/hooks/events", status=200)
+
+        def view(request: HttpRequest) -> HttpResponse:
+            # Like an admin save of a chain with gas price and wallet inlines
+            chain = ChainFactory.create(id=1)
+            GasPriceFactory.create_batch(2, chain=chain)
+            WalletFactory.create().chains.add(chain)
+            chain.save()
+            return HttpResponse()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            HookEventsMiddleware(view)(RequestFactory().post("/admin/"))
+
+        assert [json.loads(call.request.body) for call in responses.calls] == [
+            {"type": "CHAIN_UPDATE", "chainId": "1"}
+        ]
+
+
+@override_settings(CGW_URL="http://127.0.0.1", CGW_AUTH_TOKEN="example-token")
+class UnchangedChainHookTestCase(TestCase):
+    def setUp(self) -> None:
+        ServiceFactory.create(key="CGW")
+        self.chain = ChainFactory.create(relevance=1)
+        GasPriceFactory.create(chain=self.chain)
+
+    @responses.activate
+    def test_no_hook_on_save_without_changes(self) -> None:
+        responses.add(responses.POST, "http://127.0.0.1/v1/hooks/events", status=200)
+
+        with patch("chains.signals.snapshot.invalidate") as invalidate:
+            Chain.objects.get(pk=self.chain.pk).save()
+
+        invalidate.assert_not_called()
+        assert len(responses.calls) == 0
+
+    def test_save_without_changes_only_updates(self) -> None:
+        chain = Chain.objects.get(pk=self.chain.pk)
+
+        with self.assertNumQueries(1):
+            chain.save()
+
+    @responses.activate
+    def test_no_hook_on_hidden_chain_change(self) -> None:
+        self.chain.hidden = True
+        self.chain.save()
+        responses.reset()
+        responses.add(responses.POST, "http://127.0.0.1/v1/hooks/events", status=200)
+
+        self.chain.relevance = 2
+        self.chain.save()
+
+        assert len(responses.calls) == 0
+
+    @responses.activate
+    def test_hook_on_relevance_change(self) -> None:
+        responses.add(responses.POST, "http://127.0.0.1/v1/hooks/events", status=200)
+
+        self.chain.relevance = 2
+        self.chain.save()
+
+        assert [json.loads(call.request.body) for call in responses.calls] == [
+            {"type": "CHAIN_UPDATE", "chainId": str(self.chain.id), "service": "CGW"}
+        ]
@@ -1,12 +1,34 @@
 # SPDX-License-Identifier: FSL-1.1-MIT
+import gzip
+from compression import zstd
 from decimal import Decimal
 from typing import Any
+from unittest import mock
 
+from django.test import AsyncRequestFactory, TestCase
 from django.urls import reverse
 from faker import Faker
-from rest_framework.test import APITestCase
-
-from ..models import Chain, Feature
+from rest_framework import serializers
+from rest_framework.exceptions import APIException
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from config.async_views import build_async_view
+from config.middleware import COMPRESSORS
+
+from .. import gas_tokens
+from ..models import Chain, Feature, Service, Wallet
+from ..serializers import ChainSerializer
+from ..views import (
+    ChainsDetailView,
+    ChainsDetailViewByShortName,
+    ChainsListView,
+    GasTokensListView,
+    achains_etag,
+    fast_chain_by_short_name,
+    fast_chain_detail,
+    fast_chains_list,
+    fast_gas_tokens_list,
+)
 from .factories import (
     ChainFactory,
     FeatureFactory,
@@ -335,6 +357,422 @@ class ChainsListViewHiddenTests(APITestCase):
         self.assertEqual(len(response.json()["results"]), 5)
 
 
+class ChainsSnapshotTests(APITestCase):
+    def test_snapshot_served_without_queries(self) -> None:
+        ChainFactory.create(id=1, short_name="eth")
+        list_url = reverse("v1:chains:list")
+        detail_url = reverse("v1:chains:detail", args=[1])
+        short_name_url = reverse("v1:chains:detail_by_short_name", args=["eth"])
+        self.client.get(path=list_url, data=None, format="json")
+
+        with self.assertNumQueries(0):
+            list_response = self.client.get(path=list_url, data=None, format="json")
+            detail_response = self.client.get(
+                path=detail_url, data=None, format="json"
+            )
+            short_name_response = self.client.get(
+                path=short_name_url, data=None, format="json"
+            )
+
+        self.assertEqual(list_response.status_code, 200)
+        self.assertEqual(detail_response.status_code, 200)
+        self.assertEqual(short_name_response.status_code, 200)
+        self.assertEqual(list_response.json()["results"], [detail_response.json()])
+
+    def test_pre_rendered_list_matches_rendered_list(self) -> None:
+        for chain_id in range(3):
+            chain = ChainFactory.create(id=chain_id + 1, name=f"Chain {chain_id}")
+            GasPriceFactory.create(chain=chain)
+        url = reverse("v1:chains:list")
+
+        for query in ("?limit=2", "?limit=2&offset=2"):
+            with self.subTest(query=query):
+                pre_rendered = self.client.get(path=url + query, format="json")
+                # Custom orderings are rendered by DRF, relevance and name are
+                # the default ordering
+                rendered = self.client.get(
+                    path=url + query + "&ordering=relevance,name", format="json"
+                )
+
+                self.assertEqual(pre_rendered["Content-Type"], "application/json")
+                self.assertEqual(
+                    pre_rendered.json()["results"], rendered.json()["results"]
+                )
+                self.assertEqual(
+                    pre_rendered.content,
+                    rendered.content.replace(b"&ordering=relevance%2Cname", b""),
+                )
+
+    def test_snapshot_rebuilt_on_chain_update(self) -> None:
+        chain = ChainFactory.create(id=1, name="Before")
+        url = reverse("v1:chains:detail", args=[1])
+        self.client.get(path=url, data=None, format="json")
+
+        chain.name = "After"
+        chain.save()
+        response = self.client.get(path=url, data=None, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["chainName"], "After")
+
+    def test_snapshot_rebuilt_on_gas_price_update(self) -> None:
+        chain = ChainFactory.create(id=1)
+        url = reverse("v1:chains:detail", args=[1])
+        self.client.get(path=url, data=None, format="json")
+
+        gas_price = GasPriceFactory.create(chain=chain)
+        response = self.client.get(path=url, data=None, format="json")
+
+        self.assertEqual(
+            response.json()["gasPrice"],
+            [{"type": "fixed", "weiValue": str(gas_price.fixed_wei_value)}],
+        )
+
+    def test_snapshot_rebuilt_once_expired(self) -> None:
+        ChainFactory.create(id=1, name="Before")
+        url = reverse("v1:chains:detail", args=[1])
+        self.client.get(path=url, data=None, format="json")
+        # A change whose version bump is missed by this process
+        Chain.objects.filter(id=1).update(name="After")
+
+        stale = self.client.get(path=url, data=None, format="json")
+        with self.settings(SNAPSHOT_MAX_AGE_SECONDS=0):
+            expired = self.client.get(path=url, data=None, format="json")
+
+        self.assertEqual(stale.json()["chainName"], "Before")
+        self.assertEqual(expired.json()["chainName"], "After")
+
+    def test_snapshot_rebuilt_on_wallet_without_chains(self) -> None:
+        ChainFactory.create(id=1)
+        url = reverse("v1:chains:detail", args=[1])
+        self.client.get(path=url, data=None, format="json")
+
+        WalletFactory.create(key="Test Wallet")
+        response = self.client.get(path=url, data=None, format="json")
+
+        self.assertEqual(response.json()["disabledWallets"], ["Test Wallet"])
+
+    def test_custom_ordering(self) -> None:
+        chain_1 = ChainFactory.create(name="aaa", relevance=1)
+        chain_2 = ChainFactory.create(name="bbb", relevance=10)
+        url = reverse("v1:chains:list") + "?ordering=-relevance"
+
+        response = self.client.get(path=url, data=None, format="json")
+
+        chain_ids = [result["chainId"] for result in response.json()["results"]]
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(chain_ids, [str(chain_2.id), str(chain_1.id)])
+
+
+class ChainsConditionalGetTests(APITestCase):
+    def test_matching_etag_returns_not_modified(self) -> None:
+        ChainFactory.create(id=1)
+        urls = [
+            reverse("v1:chains:list"),
+            reverse("v1:chains:detail", args=[1]),
+            reverse("v1:chains:gas-tokens-list", args=[1]),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(path=url, data=None, format="json")
+                etag = response.headers["ETag"]
+
+                with self.assertNumQueries(0):
+                    not_modified_response = self.client.get(
+                        path=url, data=None, format="json", HTTP_IF_NONE_MATCH=etag
+                    )
+
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(not_modified_response.status_code, 304)
+                self.assertEqual(not_modified_response.content, b"")
+
+    def test_v2_matching_etag_returns_not_modified(self) -> None:
+        ServiceFactory.create(key="cgw")
+        ChainFactory.create(id=1)
+        url = reverse("v2:chains:detail", args=["cgw", 1])
+        etag = self.client.get(path=url, data=None, format="json").headers["ETag"]
+
+        response = self.client.get(
+            path=url, data=None, format="json", HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes_on_chain_update(self) -> None:
+        chain = ChainFactory.create(id=1)
+        url = reverse("v1:chains:detail", args=[1])
+        etag = self.client.get(path=url, data=None, format="json").headers["ETag"]
+
+        chain.name = "Updated"
+        chain.save()
+        response = self.client.get(
+            path=url, data=None, format="json", HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        self.assertEqual(response.json()["chainName"], "Updated")
+
+    def test_etag_differs_per_query(self) -> None:
+        ChainFactory.create_batch(2)
+        url = reverse("v1:chains:list")
+
+        response_1 = self.client.get(path=url + "?limit=1", data=None, format="json")
+        response_2 = self.client.get(
+            path=url + "?limit=1&offset=1", data=None, format="json"
+        )
+
+        self.assertNotEqual(response_1.headers["ETag"], response_2.headers["ETag"])
+
+
+class CompressedResponsesTests(APITestCase):
+    def setUp(self) -> None:
+        for chain_id in range(1, 4):
+            ChainFactory.create(id=chain_id)
+        self.url = reverse("v1:chains:list")
+
+    def test_gzip(self) -> None:
+        uncompressed = self.client.get(path=self.url, format="json")
+
+        response = self.client.get(
+            path=self.url, format="json", headers={"accept-encoding": "gzip, deflate"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(response["ETag"], f"W/{uncompressed['ETag']}")
+        self.assertEqual(gzip.decompress(response.content), uncompressed.content)
+
+    def test_preferred_encoding(self) -> None:
+        uncompressed = self.client.get(path=self.url, format="json")
+
+        response = self.client.get(
+            path=self.url, format="json", headers={"accept-encoding": "gzip, zstd"}
+        )
+
+        self.assertEqual(response["Content-Encoding"], "zstd")
+        self.assertEqual(zstd.decompress(response.content), uncompressed.content)
+
+    def test_not_accepted_encoding(self) -> None:
+        response = self.client.get(
+            path=self.url, format="json", headers={"accept-encoding": "gzip;q=0"}
+        )
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+    def test_compressed_once_per_version(self) -> None:
+        compress = mock.Mock(wraps=COMPRESSORS["gzip"])
+        headers = {"accept-encoding": "gzip"}
+
+        with mock.patch.dict(COMPRESSORS, gzip=compress):
+            first = self.client.get(path=self.url, format="json", headers=headers)
+            second = self.client.get(path=self.url, format="json", headers=headers)
+            ChainFactory.create(id=4)
+            third = self.client.get(path=self.url, format="json", headers=headers)
+
+        self.assertEqual(compress.call_count, 2)
+        self.assertEqual(first.content, second.content)
+        self.assertNotEqual(first.content, third.content)
+
+    def test_weak_etag_not_modified(self) -> None:
+        headers = {"accept-encoding": "gzip"}
+        response = self.client.get(path=self.url, format="json", headers=headers)
+
+        response = self.client.get(
+            path=self.url,
+            format="json",
+            headers={**headers, "if-none-match": response["ETag"]},
+        )
+
+        self.assertEqual(response.status_code, 304)
+
+
+class ChainsQueryCountTests(APITestCase):
+    """The number of queries must not depend on the number of chains."""
+
+    def _create_chains(self, count: int) -> None:
+        service = ServiceFactory.create(key="cgw")
+        FeatureFactory.create(
+            key="global", scope=Feature.Scope.GLOBAL, chains=(), services=(service,)
+        )
+        WalletFactory.create(key="disabled")
+        for index in range(count):
+            chain = ChainFactory.create()
+            GasPriceFactory.create(chain=chain)
+            GasPriceFactory.create(chain=chain)
+            WalletFactory.create(key=f"wallet-{index}", chains=(chain,))
+            FeatureFactory.create(
+                key=f"feature-{index}", chains=(chain,), services=(service,)
+            )
+
+    @staticmethod
+    def _delete_chains() -> None:
+        Chain.objects.all().delete()
+        Feature.objects.all().delete()
+        Service.objects.all().delete()
+        Wallet.objects.all().delete()
+
+    def test_v1_list_query_count(self) -> None:
+        for count in (1, 20):
+            with self.subTest(count=count):
+                self._create_chains(count)
+                url = reverse("v1:chains:list") + "?ordering=name"
+
+                # count, chains, gas prices, wallets, wallet links and features
+                with self.assertNumQueries(6):
+                    response = self.client.get(path=url, data=None, format="json")
+
+                self.assertEqual(response.status_code, 200)
+                self._delete_chains()
+
+    def test_v1_snapshot_build_query_count(self) -> None:
+        self._create_chains(20)
+        url = reverse("v1:chains:list")
+
+        # chains, gas prices, wallets, wallet links and features
+        with self.assertNumQueries(5):
+            response = self.client.get(path=url, data=None, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], 20)
+
+    def test_v2_list_query_count(self) -> None:
+        for count in (1, 20):
+            with self.subTest(count=count):
+                self._create_chains(count)
+                url = reverse("v2:chains:list", args=["cgw"])
+
+                # count, chains, gas prices, wallets, wallet links and the
+                # feature matrix: services, feature services and feature chains
+                with self.assertNumQueries(8):
+                    response = self.client.get(path=url, data=None, format="json")
+
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json()["count"], count)
+                for result in response.json()["results"]:
+                    self.assertEqual(len(result["features"]), 2)
+                    self.assertEqual(len(result["gasPrice"]), 2)
+                self._delete_chains()
+
+    def test_v2_detail_query_count(self) -> None:
+        self._create_chains(1)
+        chain = Chain.objects.get()
+        url = reverse("v2:chains:detail", args=["cgw", chain.id])
+
+        # chain, gas prices, wallets, wallet links and the feature matrix:
+        # services, feature services and feature chains
+        with self.assertNumQueries(7):
+            response = self.client.get(path=url, data=None, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["disabledWallets"]), 1)
+
+    def test_v2_feature_matrix_is_reused(self) -> None:
+        self._create_chains(20)
+        url = reverse("v2:chains:list", args=["cgw"])
+        self.client.get(path=url, data=None, format="json")
+
+        # count, chains, gas prices, wallets and wallet links
+        with self.assertNumQueries(5):
+            response = self.client.get(path=url, data=None, format="json")
+
+        for result in response.json()["results"]:
+            self.assertEqual(len(result["features"]), 2)
+
+    def test_v2_feature_matrix_is_reused_on_chain_change(self) -> None:
+        self._create_chains(1)
+        chain = Chain.objects.get()
+        url = reverse("v2:chains:detail", args=["cgw", chain.id])
+        self.client.get(path=url, data=None, format="json")
+
+        chain.name = "Renamed"
+        chain.save()
+
+        # chain, gas prices, wallets and wallet links
+        with self.assertNumQueries(4):
+            response = self.client.get(path=url, data=None, format="json")
+
+        self.assertEqual(response.json()["chainName"], "Renamed")
+
+    def test_v2_feature_matrix_is_rebuilt_on_feature_chains_change(self) -> None:
+        self._create_chains(1)
+        chain = Chain.objects.get()
+        url = reverse("v2:chains:detail", args=["cgw", chain.id])
+        self.client.get(path=url, data=None, format="json")
+
+        feature = FeatureFactory.create(key="added", services=Service.objects.all())
+        feature.chains.add(chain)
+        response = self.client.get(path=url, data=None, format="json")
+
+        self.assertEqual(response.json()["features"], ["added", "feature-0", "global"])
+
+
+class ChainSerializerCompilationTests(APITestCase):
+    """The compiled representation must match the generic DRF one."""
+
+    def setUp(self) -> None:
+        oracle_chain = ChainFactory.create(id=1, relayer_type=None)
+        GasPriceFactory.create(
+            chain=oracle_chain,
+            oracle_uri="https://oracle.test",
+            fixed_wei_value=None,
+            rank=2,
+        )
+        GasPriceFactory.create(chain=oracle_chain, rank=1)
+        fixed_1559_chain = ChainFactory.create(id=2, ens_registry_address=None)
+        GasPriceFactory.create(
+            chain=fixed_1559_chain,
+            fixed_wei_value=None,
+            max_fee_per_gas=1000,
+            max_priority_fee_per_gas=10,
+        )
+        ChainFactory.create(id=3)
+        WalletFactory.create(key="wallet", chains=[oracle_chain])
+        service = ServiceFactory.create(key="cgw")
+        FeatureFactory.create(
+            key="per-chain", chains=[fixed_1559_chain], services=[service]
+        )
+        FeatureFactory.create(
+            key="global", scope=Feature.Scope.GLOBAL, services=[service]
+        )
+        self.request = APIRequestFactory().get("/")
+
+    def _assert_matches_generic(self, context: dict[str, Any]) -> None:
+        chains = list(Chain.objects.order_by("id"))
+        serializer = ChainSerializer(chains, many=True, context=context)
+
+        data = serializer.data
+
+        generic_serializer = ChainSerializer(chains, many=True, context=context)
+        self.assertEqual(
+            data,
+            [
+                serializers.ModelSerializer.to_representation(
+                    generic_serializer.child, chain
+                )
+                for chain in chains
+            ],
+        )
+
+    def test_v1_representation(self) -> None:
+        self._assert_matches_generic({"request": self.request})
+
+    def test_v2_representation(self) -> None:
+        self._assert_matches_generic({"request": self.request, "service_key": "cgw"})
+
+    def test_invalid_gas_price(self) -> None:
+        chain = Chain.objects.get(id=3)
+        GasPriceFactory.create(
+            chain=chain, oracle_uri="https://oracle.test", fixed_wei_value=1
+        )
+        serializer = ChainSerializer(chain, context={"request": self.request})
+
+        with self.assertRaises(APIException):
+            serializer.data
+
+
 class ChainsEnsRegistryTests(APITestCase):
     def test_null_ens_registry_address(self) -> None:
         ChainFactory.create(id=1, ens_registry_address=None)
@@ -955,3 +1393,154 @@ class GasTokensOrderingTests(APITestCase):
         addresses = [token["address"] for token in response.json()["results"]]
         # Deterministic fallback to ascending id.
         self.assertEqual(addresses, [first.address, second.address])
+
+
+class GasTokensIndexTests(APITestCase):
+    def test_served_without_queries(self) -> None:
+        chain = ChainFactory.create()
+        GasTokenFactory.create_batch(3, chains=(chain,))
+        url = reverse("v1:chains:gas-tokens-list", args=[chain.id])
+        response = self.client.get(path=url + "?limit=2", format="json")
+
+        with self.assertNumQueries(0):
+            next_response = self.client.get(
+                path=url + "?limit=2&offset=2", format="json"
+            )
+
+        self.assertEqual(response.json()["count"], 3)
+        self.assertEqual(len(response.json()["results"]), 2)
+        self.assertEqual(len(next_response.json()["results"]), 1)
+        self.assertIsNone(next_response.json()["next"])
+
+    def test_rebuilt_on_gas_token_update(self) -> None:
+        chain = ChainFactory.create()
+        gas_token = GasTokenFactory.create(chains=(chain,), symbol="BEFORE")
+        url = reverse("v1:chains:gas-tokens-list", args=[chain.id])
+        self.client.get(path=url, format="json")
+
+        gas_token.symbol = "AFTER"
+        gas_token.save()
+        response = self.client.get(path=url, format="json")
+
+        self.assertEqual(response.json()["results"][0]["symbol"], "AFTER")
+
+    def test_rebuilt_on_gas_token_chains_change(self) -> None:
+        chain = ChainFactory.create()
+        gas_token = GasTokenFactory.create(chains=(chain,))
+        url = reverse("v1:chains:gas-tokens-list", args=[chain.id])
+        self.client.get(path=url, format="json")
+
+        gas_token.chains.remove(chain)
+        response = self.client.get(path=url, format="json")
+
+        self.assertEqual(response.json()["count"], 0)
+
+    def test_rebuilt_on_chain_hidden(self) -> None:
+        chain = ChainFactory.create()
+        url = reverse("v1:chains:gas-tokens-list", args=[chain.id])
+        self.client.get(path=url, format="json")
+
+        chain.hidden = True
+        chain.save()
+        response = self.client.get(path=url, format="json")
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_etag_only_changes_for_affected_chains(self) -> None:
+        chain = ChainFactory.create()
+        other_chain = ChainFactory.create()
+        gas_token = GasTokenFactory.create(chains=(chain,))
+        url = reverse("v1:chains:gas-tokens-list", args=[chain.id])
+        other_url = reverse("v1:chains:gas-tokens-list", args=[other_chain.id])
+        etag = self.client.get(path=url, format="json")["ETag"]
+        other_etag = self.client.get(path=other_url, format="json")["ETag"]
+
+        gas_token.priority = 1
+        gas_token.save()
+
+        self.assertNotEqual(self.client.get(path=url, format="json")["ETag"], etag)
+        self.assertEqual(
+            self.client.get(path=other_url, format="json")["ETag"], other_etag
+        )
+
+
+class AsyncViewsTests(TestCase):
+    def setUp(self) -> None:
+        chain = ChainFactory.create(id=1, short_name="eth")
+        GasTokenFactory.create(chains=(chain,))
+        self.factory = AsyncRequestFactory()
+        self.list_view = build_async_view(
+            ChainsListView, fast_chains_list, achains_etag
+        )
+        self.detail_view = build_async_view(
+            ChainsDetailView, fast_chain_detail, achains_etag
+        )
+
+    async def test_responses_match_sync_views(self) -> None:
+        cases = [
+            (self.list_view, reverse("v1:chains:list"), {}),
+            (self.detail_view, reverse("v1:chains:detail", args=[1]), {"pk": 1}),
+            (
+                build_async_view(
+                    ChainsDetailViewByShortName,
+                    fast_chain_by_short_name,
+                    achains_etag,
+                ),
+                reverse("v1:chains:detail_by_short_name", args=["eth"]),
+                {"short_name": "eth"},
+            ),
+            (
+                build_async_view(
+                    GasTokensListView, fast_gas_tokens_list, gas_tokens.aetag
+                ),
+                reverse("v1:chains:gas-tokens-list", args=[1]),
+                {"pk": 1},
+            ),
+        ]
+        for view, url, kwargs in cases:
+            with self.subTest(url=url):
+                expected = await self.async_client.get(url)
+
+                response = await view(self.factory.get(url), **kwargs)
+
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.content, expected.content)
+                self.assertEqual(response["ETag"], expected["ETag"])
+
+    async def test_not_found_handled_by_drf_view(self) -> None:
+        url = reverse("v1:chains:detail", args=[2])
+
+        response = await self.detail_view(self.factory.get(url), pk=2)
+
+        self.assertEqual(response.status_code, 404)
+
+    async def test_custom_ordering_handled_by_drf_view(self) -> None:
+        url = reverse("v1:chains:list") + "?ordering=-name"
+        expected = await self.async_client.get(url)
+
+        response = await self.list_view(self.factory.get(url))
+        response.render()
+
+        self.assertEqual(response.content, expected.content)
+
+    async def test_matching_etag_returns_not_modified(self) -> None:
+        url = reverse("v1:chains:list")
+        etag = (await self.list_view(self.factory.get(url)))["ETag"]
+
+        response = await self.list_view(
+            self.factory.get(url, headers={"if-none-match": etag})
+        )
+
+        self.assertEqual(response.status_code, 304)
+
+    async def test_etag_read_without_sync_cache_calls(self) -> None:
+        url = reverse("v1:chains:list")
+        etag = (await self.list_view(self.factory.get(url)))["ETag"]
+
+        with mock.patch("config.versioning.get_version") as get_version:
+            response = await self.list_view(
+                self.factory.get(url, headers={"if-none-match": etag})
+            )
+
+        self.assertEqual(response.status_code, 304)
+        get_version.assert_not_called()
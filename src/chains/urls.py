@@ -1,22 +1,41 @@
 # SPDX-License-Identifier: FSL-1.1-MIT
 from django.urls import path
 
+from chains import gas_tokens
 from chains.views import (
     ChainsDetailView,
     ChainsDetailViewByShortName,
     ChainsListView,
     GasTokensListView,
+    achains_etag,
+    fast_chain_by_short_name,
+    fast_chain_detail,
+    fast_chains_list,
+    fast_gas_tokens_list,
 )
+from config.async_views import async_view
 
 app_name = "chains"
 
 urlpatterns = [
-    path("", ChainsListView.as_view(), name="list"),
-    path("<int:pk>/", ChainsDetailView.as_view(), name="detail"),
-    path("<int:pk>/gas-tokens/", GasTokensListView.as_view(), name="gas-tokens-list"),
+    path(
+        "",
+        async_view(ChainsListView, fast_chains_list, achains_etag),
+        name="list",
+    ),
+    path(
+        "<int:pk>/",
+        async_view(ChainsDetailView, fast_chain_detail, achains_etag),
+        name="detail",
+    ),
+    path(
+        "<int:pk>/gas-tokens/",
+        async_view(GasTokensListView, fast_gas_tokens_list, gas_tokens.aetag),
+        name="gas-tokens-list",
+    ),
     path(
         "<str:short_name>/",
-        ChainsDetailViewByShortName.as_view(),
+        async_view(ChainsDetailViewByShortName, fast_chain_by_short_name, achains_etag),
         name="detail_by_short_name",
     ),
 ]
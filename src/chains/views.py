@@ -1,28 +1,104 @@
 # SPDX-License-Identifier: FSL-1.1-MIT
 from typing import Any
 
-from django.db.models import Prefetch, QuerySet
+from django.db.models import QuerySet
+from django.http import Http404, HttpRequest, HttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from drf_yasg.utils import swagger_auto_schema
-from rest_framework import filters
-from rest_framework.generics import ListAPIView, RetrieveAPIView
+from rest_framework import filters, mixins
+from rest_framework.generics import GenericAPIView, ListAPIView, RetrieveAPIView
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer
 
-from .models import Chain, Feature, GasToken, Service
+from config import timing
+from config.rendering import json_response, paginated_json
+from config.versioning import aversion_etag, version_etag
+
+from . import feature_matrix, gas_tokens, snapshot
+from .loaders import ChainBatchLoader
+from .models import Chain, GasToken
 from .serializers import ChainSerializer, GasTokenSerializer
 
 
+# Conditional GET: a matching If-None-Match is answered with a 304 as long as
+# the chains config version did not change
+chains_etag = version_etag(snapshot.CHAINS_VERSION_NAMESPACE)
+chains_condition = condition(etag_func=chains_etag)
+achains_etag = aversion_etag(snapshot.CHAINS_VERSION_NAMESPACE)
+
+
 class ChainsPagination(LimitOffsetPagination):
     default_limit = 40
     max_limit = 100
 
+    def paginate_fragments(
+        self, fragments: list[bytes], request: Request
+    ) -> list[bytes]:
+        """
+        Same as paginate_queryset for pre-rendered JSON fragments. The limit
+        always has a value, default_limit if the request has none.
+        """
+        self.request = request
+        self.count = len(fragments)
+        self.limit = self.get_limit(request)
+        self.offset = self.get_offset(request)
+        if self.limit is None:
+            return fragments
+        return fragments[self.offset : self.offset + self.limit]
+
+
+def paginated_response(request: Request, fragments: list[bytes]) -> HttpResponse:
+    """Paginates pre-rendered JSON fragments like ChainsPagination does."""
+    paginator = ChainsPagination()
+    page = paginator.paginate_fragments(fragments, request)
+    return json_response(
+        paginated_json(
+            count=len(fragments),
+            next=paginator.get_next_link(),
+            previous=paginator.get_previous_link(),
+            fragments=page,
+        )
+    )
+
+
+class ChainBatchMixin(
+    mixins.ListModelMixin, mixins.RetrieveModelMixin, GenericAPIView[Chain]
+):
+    """
+    Loads the related objects of the serialized chains in a fixed number of
+    queries (see ChainBatchLoader) and hands them to ChainSerializer.
+    """
+
+    def get_serializer(self, *args: Any, **kwargs: Any) -> BaseSerializer[Chain]:
+        if args:
+            chains = args[0] if kwargs.get("many", False) else [args[0]]
+            context = kwargs.setdefault("context", self.get_serializer_context())
+            context["chain_batch"] = ChainBatchLoader(
+                context.get("service_key")
+            ).load(chains)
+        return super().get_serializer(*args, **kwargs)
 
-class ChainsListView(ListAPIView[Chain]):
+    # The responses not served from the snapshots are serialized by the ORM
+    # paths of the DRF views (see config.timing)
+    @timing.timed(timing.SERIALIZE)
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        return super().list(request, *args, **kwargs)
+
+    @timing.timed(timing.SERIALIZE)
+    def retrieve(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        return super().retrieve(request, *args, **kwargs)
+
+
+class ChainsListView(ChainBatchMixin, ListAPIView[Chain]):
     serializer_class = ChainSerializer
     pagination_class = ChainsPagination
-    queryset = Chain.objects.filter(hidden=False).prefetch_related("feature_set")
+    queryset = Chain.objects.filter(hidden=False)
+    # count, chains, gas prices, wallets, wallet links and features
+    query_budget = 6
     filter_backends = [filters.OrderingFilter]
     ordering_fields = ["relevance", "name"]
     ordering = [
@@ -30,23 +106,44 @@ class ChainsListView(ListAPIView[Chain]):
         "name",
     ]
 
+    @method_decorator(chains_condition)
+    def get(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        return super().get(request, *args, **kwargs)
 
-class ChainsDetailView(RetrieveAPIView[Chain]):
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> HttpResponse:  # type: ignore[override]
+        # Custom orderings are not precomputed and go through the ORM
+        if "ordering" in request.query_params:
+            return super().list(request, *args, **kwargs)
+        return paginated_response(request, snapshot.get_snapshot(request).results)
+
+
+class ChainsDetailView(ChainBatchMixin, RetrieveAPIView[Chain]):
     serializer_class = ChainSerializer
-    queryset = Chain.objects.filter(hidden=False).prefetch_related("feature_set")
+    queryset = Chain.objects.filter(hidden=False)
+    # Snapshot build: chains, gas prices, wallets, wallet links and features
+    query_budget = 5
 
+    @method_decorator(chains_condition)
     @swagger_auto_schema(
         operation_id="Get chain by id"
     )  # type: ignore[untyped-decorator]
     def get(self, request: Request, *args: Any, **kwargs: Any) -> Response:
         return super().get(request, *args, **kwargs)
 
+    def retrieve(self, request: Request, *args: Any, **kwargs: Any) -> HttpResponse:  # type: ignore[override]
+        content = snapshot.get_snapshot(request).by_id.get(self.kwargs["pk"])
+        if content is None:
+            raise Http404
+        return json_response(content)
 
-class ChainsDetailViewByShortName(RetrieveAPIView[Chain]):
+
+class ChainsDetailViewByShortName(ChainBatchMixin, RetrieveAPIView[Chain]):
     lookup_field = "short_name"
     serializer_class = ChainSerializer
-    queryset = Chain.objects.filter(hidden=False).prefetch_related("feature_set")
+    queryset = Chain.objects.filter(hidden=False)
+    query_budget = ChainsDetailView.query_budget
 
+    @method_decorator(chains_condition)
     @swagger_auto_schema(
         operation_id="Get chain by shortName",
         operation_description="Warning: `shortNames` may contain characters that need to be URL encoded (i.e.: whitespaces)",  # noqa E501
@@ -54,11 +151,32 @@ class ChainsDetailViewByShortName(RetrieveAPIView[Chain]):
     def get(self, request: Request, *args: Any, **kwargs: Any) -> Response:
         return super().get(request, *args, **kwargs)
 
+    def retrieve(self, request: Request, *args: Any, **kwargs: Any) -> HttpResponse:  # type: ignore[override]
+        content = snapshot.get_snapshot(request).by_short_name.get(
+            self.kwargs["short_name"]
+        )
+        if content is None:
+            raise Http404
+        return json_response(content)
+
 
 class GasTokensListView(ListAPIView[GasToken]):
     serializer_class = GasTokenSerializer
     pagination_class = ChainsPagination
+    # Index build: chains and gas token links
+    query_budget = 2
+
+    @method_decorator(condition(etag_func=gas_tokens.etag))
+    def get(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        return super().get(request, *args, **kwargs)
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> HttpResponse:  # type: ignore[override]
+        fragments = gas_tokens.get_index().by_chain.get(self.kwargs["pk"])
+        if fragments is None:
+            raise Http404
+        return paginated_response(request, fragments)
 
+    # Only used to document the endpoint, list() is served from the index
     def get_queryset(self) -> QuerySet[GasToken]:
         chain = get_object_or_404(Chain, pk=self.kwargs["pk"], hidden=False)
         return GasToken.objects.filter(chains=chain).order_by(
@@ -66,7 +184,14 @@ class GasTokensListView(ListAPIView[GasToken]):
         )
 
 
-class ChainsListViewV2(ListAPIView[Chain]):
+def get_service_key(service_key: str) -> str:
+    """Raises Http404 if no Service has ``service_key``."""
+    if service_key not in feature_matrix.get_matrix().service_keys:
+        raise Http404
+    return service_key
+
+
+class ChainsListViewV2(ChainBatchMixin, ListAPIView[Chain]):
     """
     v2 endpoint that returns chain configs filtered by service.
 
@@ -80,31 +205,23 @@ class ChainsListViewV2(ListAPIView[Chain]):
     filter_backends = [filters.OrderingFilter]
     ordering_fields = ["relevance", "name"]
     ordering = ["relevance", "name"]
+    # count, chains, gas prices, wallets, wallet links and the feature matrix:
+    # services, feature services and feature chains
+    query_budget = 8
 
     def get_queryset(self) -> QuerySet[Chain]:
-        self.service = get_object_or_404(Service, key=self.kwargs["service_key"])
-        return Chain.objects.filter(hidden=False).prefetch_related(
-            Prefetch(
-                "feature_set",
-                queryset=Feature.objects.filter(
-                    services=self.service, scope=Feature.Scope.PER_CHAIN
-                ).order_by("key"),
-            )
-        )
+        get_service_key(self.kwargs["service_key"])
+        return Chain.objects.filter(hidden=False)
 
     def get_serializer_context(self) -> dict[str, Any]:
         context = dict(super().get_serializer_context())
         if getattr(self, "swagger_fake_view", False):
             return context
 
-        context["service"] = self.service
-        context["_service_global_features"] = list(
-            Feature.objects.filter(
-                services=self.service, scope=Feature.Scope.GLOBAL
-            ).order_by("key")
-        )
+        context["service_key"] = self.kwargs["service_key"]
         return context
 
+    @method_decorator(chains_condition)
     @swagger_auto_schema(
         operation_id="Get chains by service"
     )  # type: ignore[untyped-decorator]
@@ -112,7 +229,7 @@ class ChainsListViewV2(ListAPIView[Chain]):
         return super().get(request, *args, **kwargs)
 
 
-class ChainsDetailViewV2(RetrieveAPIView[Chain]):
+class ChainsDetailViewV2(ChainBatchMixin, RetrieveAPIView[Chain]):
     """
     v2 endpoint that returns a single chain config filtered by service.
 
@@ -123,34 +240,57 @@ class ChainsDetailViewV2(RetrieveAPIView[Chain]):
 
     serializer_class = ChainSerializer
     queryset = Chain.objects.filter(hidden=False)
+    # chain, gas prices, wallets, wallet links and the feature matrix
+    query_budget = 7
 
     def get_object(self) -> Chain:
-        self.service = get_object_or_404(Service, key=self.kwargs["service_key"])
-        queryset = Chain.objects.filter(hidden=False).prefetch_related(
-            Prefetch(
-                "feature_set",
-                queryset=Feature.objects.filter(
-                    services=self.service, scope=Feature.Scope.PER_CHAIN
-                ).order_by("key"),
-            )
-        )
-        return get_object_or_404(queryset, pk=self.kwargs["pk"])
+        get_service_key(self.kwargs["service_key"])
+        return get_object_or_404(self.get_queryset(), pk=self.kwargs["pk"])
 
     def get_serializer_context(self) -> dict[str, Any]:
         context = dict(super().get_serializer_context())
         if getattr(self, "swagger_fake_view", False):
             return context
 
-        context["service"] = self.service
-        context["_service_global_features"] = list(
-            Feature.objects.filter(
-                services=self.service, scope=Feature.Scope.GLOBAL
-            ).order_by("key")
-        )
+        context["service_key"] = self.kwargs["service_key"]
         return context
 
+    @method_decorator(chains_condition)
     @swagger_auto_schema(
         operation_id="Get chain by id for service"
     )  # type: ignore[untyped-decorator]
     def get(self, request: Request, *args: Any, **kwargs: Any) -> Response:
         return super().get(request, *args, **kwargs)
+
+
+# Fast paths of the async views (see config.async_views). The requests they
+# cannot answer from the snapshots, e.g. 404s, are handled by the DRF views.
+
+
+async def fast_chains_list(request: HttpRequest) -> HttpResponse | None:
+    drf_request = Request(request)
+    if "ordering" in drf_request.query_params:
+        return None
+    chains_snapshot = await snapshot.aget_snapshot(drf_request)
+    return paginated_response(drf_request, chains_snapshot.results)
+
+
+async def fast_chain_detail(request: HttpRequest, pk: int) -> HttpResponse | None:
+    chains_snapshot = await snapshot.aget_snapshot(Request(request))
+    content = chains_snapshot.by_id.get(pk)
+    return None if content is None else json_response(content)
+
+
+async def fast_chain_by_short_name(
+    request: HttpRequest, short_name: str
+) -> HttpResponse | None:
+    chains_snapshot = await snapshot.aget_snapshot(Request(request))
+    content = chains_snapshot.by_short_name.get(short_name)
+    return None if content is None else json_response(content)
+
+
+async def fast_gas_tokens_list(request: HttpRequest, pk: int) -> HttpResponse | None:
+    fragments = (await gas_tokens.aget_index()).by_chain.get(pk)
+    if fragments is None:
+        return None
+    return paginated_response(Request(request), fragments)
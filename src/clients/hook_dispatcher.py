@@ -0,0 +1,125 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+import logging
+import os
+import queue
+import threading
+import time
+from collections.abc import Callable, Hashable
+from typing import Generic, TypeVar
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+E = TypeVar("E")
+
+
+class HookEventDispatcher(Generic[E]):
+    """
+    Sends hook events from a pool of background threads.
+
+    Events are enqueued once the current transaction commits. An event that is
+    equal (by ``key``) to one still waiting in the queue is dropped, and every
+    event waits ``coalesce_window`` seconds before being sent so that the
+    duplicates triggered by a single admin change are coalesced.
+
+    Once its window has elapsed, an event is sent together with the events
+    queued meanwhile, up to ``max_batch_size`` events per call to ``send``.
+    If the queue is full the event is sent synchronously instead of dropped.
+
+    Args:
+        send: Sends a list of events. Exceptions are logged.
+        key: Identifies duplicated events.
+        max_queue_size: Maximum number of events waiting to be sent.
+        workers: Number of threads sending events.
+        coalesce_window: Seconds an event waits in the queue before being sent.
+        max_batch_size: Maximum number of events passed to ``send`` at once.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[list[E]], object],
+        key: Callable[[E], Hashable],
+        max_queue_size: int,
+        workers: int,
+        coalesce_window: float,
+        max_batch_size: int = 1,
+    ) -> None:
+        self.send = send
+        self.key = key
+        self.workers = workers
+        self.coalesce_window = coalesce_window
+        self.max_batch_size = max(max_batch_size, 1)
+        self._queue: queue.Queue[tuple[Hashable, E, float]] = queue.Queue(
+            maxsize=max_queue_size
+        )
+        self._pending: set[Hashable] = set()
+        self._lock = threading.Lock()
+        self._pid: int | None = None
+
+    def dispatch(self, event: E) -> None:
+        """Enqueues ``event`` after the current transaction commits."""
+        transaction.on_commit(lambda: self.enqueue(event))
+
+    def enqueue(self, event: E) -> None:
+        self._ensure_workers()
+        key = self.key(event)
+        with self._lock:
+            if key in self._pending:
+                return
+            try:
+                self._queue.put_nowait((key, event, time.monotonic()))
+            except queue.Full:
+                logger.warning("Hook event queue is full. Sending %s inline", event)
+            else:
+                self._pending.add(key)
+                return
+        self._send([event])
+
+    def flush(self) -> None:
+        """Blocks until every enqueued event has been sent."""
+        self._queue.join()
+
+    def _ensure_workers(self) -> None:
+        # Threads do not survive a fork (e.g. gunicorn preload), start them
+        # lazily in the process that enqueues the events
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            for index in range(self.workers):
+                threading.Thread(
+                    target=self._run, name=f"hook-dispatcher-{index}", daemon=True
+                ).start()
+            self._pid = pid
+
+    def _run(self) -> None:
+        while True:
+            key, event, enqueued_at = self._queue.get()
+            keys, batch = [key], [event]
+            try:
+                delay = enqueued_at + self.coalesce_window - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                # Send the events queued meanwhile along with this one
+                while len(batch) < self.max_batch_size:
+                    try:
+                        key, event, _ = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    keys.append(key)
+                    batch.append(event)
+                with self._lock:
+                    self._pending.difference_update(keys)
+                self._send(batch)
+            finally:
+                for _ in keys:
+                    self._queue.task_done()
+
+    def _send(self, events: list[E]) -> None:
+        try:
+            self.send(events)
+        except Exception:
+            logger.exception("Error sending %d hook events", len(events))
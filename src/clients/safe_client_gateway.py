@@ -1,5 +1,9 @@
 # SPDX-License-Identifier: FSL-1.1-MIT
 import logging
+import time
+from collections.abc import AsyncIterator, Hashable, Iterable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass
 from enum import Enum
 from functools import cache
@@ -8,10 +12,27 @@ from urllib.parse import urljoin
 
 import apm
 import requests
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.db import transaction
+
+from config import metrics
+
+from .hook_dispatcher import HookEventDispatcher
 
 logger = logging.getLogger(__name__)
 
+HOOK_REQUESTS = metrics.registry.counter(
+    "cgw_hook_requests_total",
+    "Requests to the CGW hooks endpoint by kind (event or batch) and result",
+    ("kind", "result"),
+)
+HOOK_REQUEST_DURATION = metrics.registry.histogram(
+    "cgw_hook_request_duration_seconds",
+    "Duration of the requests to the CGW hooks endpoint by kind",
+    ("kind",),
+)
+
 
 @dataclass
 class HookEvent:
@@ -43,7 +64,168 @@ def cgw_setup() -> tuple[str, str]:
     return (settings.CGW_URL, settings.CGW_AUTH_TOKEN)
 
 
+def _key(event: HookEvent) -> Hashable:
+    return (event.type, event.chain_id, event.service)
+
+
+@cache
+def get_dispatcher() -> HookEventDispatcher[HookEvent]:
+    return HookEventDispatcher(
+        send=send_hook_events,
+        key=_key,
+        max_queue_size=settings.CGW_HOOKS_QUEUE_SIZE,
+        workers=settings.CGW_HOOKS_WORKERS,
+        coalesce_window=settings.CGW_HOOKS_COALESCE_WINDOW_SECONDS,
+        max_batch_size=settings.CGW_HOOKS_BATCH_SIZE,
+    )
+
+
+# A context variable, so that the events of the ORM run in the threads of
+# sync_to_async are collected by the async middleware
+_collected: ContextVar[dict[Hashable, HookEvent] | None] = ContextVar(
+    "collected_hook_events", default=None
+)
+
+
+@contextmanager
+def collect_hook_events() -> Iterator[None]:
+    """
+    Collects the events of the hook_events calls made in the block and sends
+    them, deduplicated, once the block exits and the current transaction
+    commits. Nothing is sent if the block raises.
+
+    Nested blocks collect their events in the outermost one. The outbox
+    (CGW_HOOKS_OUTBOX) already deduplicates the events, which are stored in
+    the transaction that triggered them, so they are not collected.
+    """
+    if _collected.get() is not None:
+        yield
+        return
+    events: dict[Hashable, HookEvent] = {}
+    token = _collected.set(events)
+    try:
+        yield
+    finally:
+        _collected.reset(token)
+    _send_on_commit(events)
+
+
+@asynccontextmanager
+async def acollect_hook_events() -> AsyncIterator[None]:
+    """Async version of collect_hook_events."""
+    if _collected.get() is not None:
+        yield
+        return
+    events: dict[Hashable, HookEvent] = {}
+    token = _collected.set(events)
+    try:
+        yield
+    finally:
+        _collected.reset(token)
+    # The transactions of the request belong to the connection of the
+    # sync_to_async thread (thread sensitive) that ran its ORM
+    await sync_to_async(_send_on_commit)(events)
+
+
+def _send_on_commit(events: dict[Hashable, HookEvent]) -> None:
+    if events:
+        logger.info("Sending %d collected hook events on commit", len(events))
+        transaction.on_commit(lambda: _send(list(events.values())))
+
+
 def hook_event(event: HookEvent) -> None:
+    """
+    Notifies CGW about ``event``. With CGW_HOOKS_ASYNC enabled the event is sent
+    in the background after the current transaction commits.
+    """
+    hook_events([event])
+
+
+def hook_events(events: Iterable[HookEvent]) -> None:
+    """
+    Notifies CGW about ``events``, in batches if CGW_HOOKS_BATCH_SIZE > 1.
+
+    With CGW_HOOKS_OUTBOX enabled the events are stored in the outbox, in the
+    current transaction, and sent by the ``send_hook_events`` command.
+    Otherwise, inside a collect_hook_events block, they are sent when it exits.
+    """
+    if settings.CGW_HOOKS_OUTBOX:
+        from webhooks.models import OutboxEvent
+
+        OutboxEvent.objects.enqueue(events)
+        return
+    collected = _collected.get()
+    if collected is None:
+        _send(list(events))
+        return
+    for event in events:
+        collected.setdefault(_key(event), event)
+
+
+def _send(events: list[HookEvent]) -> None:
+    if settings.CGW_HOOKS_ASYNC:
+        dispatcher = get_dispatcher()
+        for event in events:
+            dispatcher.dispatch(event)
+    else:
+        send_hook_events(events)
+
+
+def _hooks_url(url: str) -> str:
+    return urljoin(url.rstrip("/") + "/", "v1/hooks/events")
+
+
+def _payload(event: HookEvent) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {"type": event.type, "chainId": str(event.chain_id)}
+    if event.service is not None:
+        payload["service"] = event.service
+    return payload
+
+
+def send_hook_events(events: list[HookEvent]) -> list[HookEvent]:
+    """
+    Sends ``events`` as arrays of at most CGW_HOOKS_BATCH_SIZE events. The
+    events of a batch rejected by CGW are sent one by one.
+
+    Returns:
+        The events that could not be sent.
+    """
+    batch_size = settings.CGW_HOOKS_BATCH_SIZE
+    if batch_size <= 1 or len(events) <= 1:
+        return [event for event in events if not send_hook_event(event)]
+
+    failed: list[HookEvent] = []
+    for start in range(0, len(events), batch_size):
+        batch = events[start : start + batch_size]
+        if not _send_hook_event_batch(batch):
+            failed.extend(event for event in batch if not send_hook_event(event))
+    return failed
+
+
+def _send_hook_event_batch(events: list[HookEvent]) -> bool:
+    try:
+        with apm.trace("cgw.hook_events") as span:
+            if span is not None:
+                span.set_tag("cgw.batch_size", str(len(events)))
+            try:
+                (url, token) = cgw_setup()
+                post(_hooks_url(url), token, json=[_payload(e) for e in events])
+                return True
+            except Exception as error:
+                logger.warning(
+                    "Batch of %d hook events failed (%s). Sending them one by one",
+                    len(events),
+                    error,
+                )
+                return False
+    except Exception:
+        logger.exception("APM instrumentation error in hook_events")
+        return False
+
+
+def send_hook_event(event: HookEvent) -> bool:
+    """Sends ``event``. Returns whether CGW accepted it."""
+    sent = False
     try:
         with apm.trace("cgw.hook_event", resource=event.type.value) as span:
             if span is not None:
@@ -52,11 +234,8 @@ def hook_event(event: HookEvent) -> None:
                     span.set_tag("cgw.service", event.service)
             try:
                 (url, token) = cgw_setup()
-                url = urljoin(url.rstrip("/") + "/", "v1/hooks/events")
-                payload: Dict[str, Any] = {"type": event.type, "chainId": str(event.chain_id)}
-                if event.service is not None:
-                    payload["service"] = event.service
-                post(url, token, json=payload)
+                post(_hooks_url(url), token, json=_payload(event))
+                sent = True
             except Exception as error:
                 logger.exception(error)
                 if span is not None:
@@ -66,13 +245,24 @@ def hook_event(event: HookEvent) -> None:
                         logger.exception("APM set_exc_info failed")
     except Exception:
         logger.exception("APM instrumentation error in hook_event")
+    return sent
 
 
-def post(url: str, token: str, json: Dict[str, Any]) -> None:
-    request = setup_session().post(
-        url,
-        json=json,
-        headers={"Authorization": f"Basic {token}"},
-        timeout=settings.CGW_SESSION_TIMEOUT_SECONDS,
-    )
-    request.raise_for_status()
+def post(url: str, token: str, json: Dict[str, Any] | list[Dict[str, Any]]) -> None:
+    kind = "batch" if isinstance(json, list) else "event"
+    start = time.perf_counter()
+    try:
+        request = setup_session().post(
+            url,
+            json=json,
+            headers={"Authorization": f"Basic {token}"},
+            timeout=settings.CGW_SESSION_TIMEOUT_SECONDS,
+        )
+        request.raise_for_status()
+    except Exception:
+        HOOK_REQUESTS.inc(kind, "failure")
+        raise
+    else:
+        HOOK_REQUESTS.inc(kind, "success")
+    finally:
+        HOOK_REQUEST_DURATION.observe(time.perf_counter() - start, kind)
@@ -0,0 +1,155 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from django.test import TestCase, override_settings
+
+from ..hook_dispatcher import HookEventDispatcher
+from ..safe_client_gateway import (
+    HookEvent,
+    get_dispatcher,
+    hook_event,
+    send_hook_events,
+)
+
+
+class _CGWStub(ThreadingHTTPServer):
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _CGWStubHandler)
+        self.events: list[Any] = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _CGWStubHandler(BaseHTTPRequestHandler):
+    server: _CGWStub
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.events.append(json.loads(body))
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class HookEventDispatcherTestCase(TestCase):
+    def setUp(self) -> None:
+        self.cgw = _CGWStub()
+        threading.Thread(target=self.cgw.serve_forever, daemon=True).start()
+        self.addCleanup(self.cgw.server_close)
+        self.addCleanup(self.cgw.shutdown)
+        settings_override = override_settings(
+            CGW_URL=self.cgw.url, CGW_AUTH_TOKEN="example-token"
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def _dispatcher(
+        self, max_queue_size: int = 100, workers: int = 2, max_batch_size: int = 1
+    ) -> HookEventDispatcher[HookEvent]:
+        return HookEventDispatcher(
+            send=send_hook_events,
+            key=lambda event: (event.type, event.chain_id, event.service),
+            max_queue_size=max_queue_size,
+            workers=workers,
+            coalesce_window=0.1,
+            max_batch_size=max_batch_size,
+        )
+
+    def test_events_are_sent_after_commit(self) -> None:
+        dispatcher = self._dispatcher()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            dispatcher.dispatch(HookEvent(type=HookEvent.Type.CHAIN_UPDATE, chain_id=1))
+        dispatcher.flush()
+
+        self.assertEqual(self.cgw.events, [])
+
+        for callback in callbacks:
+            callback()
+        dispatcher.flush()
+
+        self.assertEqual(self.cgw.events, [{"type": "CHAIN_UPDATE", "chainId": "1"}])
+
+    def test_duplicated_events_are_coalesced(self) -> None:
+        dispatcher = self._dispatcher()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(10):
+                dispatcher.dispatch(
+                    HookEvent(type=HookEvent.Type.CHAIN_UPDATE, chain_id=1)
+                )
+                dispatcher.dispatch(
+                    HookEvent(
+                        type=HookEvent.Type.CHAIN_UPDATE, chain_id=1, service="WALLET_WEB"
+                    )
+                )
+                dispatcher.dispatch(
+                    HookEvent(type=HookEvent.Type.SAFE_APPS_UPDATE, chain_id=1)
+                )
+        dispatcher.flush()
+
+        self.assertCountEqual(
+            self.cgw.events,
+            [
+                {"type": "CHAIN_UPDATE", "chainId": "1"},
+                {"type": "CHAIN_UPDATE", "chainId": "1", "service": "WALLET_WEB"},
+                {"type": "SAFE_APPS_UPDATE", "chainId": "1"},
+            ],
+        )
+
+    def test_events_after_sending_are_not_coalesced(self) -> None:
+        dispatcher = self._dispatcher()
+
+        for _ in range(2):
+            dispatcher.enqueue(HookEvent(type=HookEvent.Type.CHAIN_UPDATE, chain_id=1))
+            dispatcher.flush()
+
+        self.assertEqual(len(self.cgw.events), 2)
+
+    @override_settings(CGW_HOOKS_BATCH_SIZE=2)
+    def test_queued_events_are_batched(self) -> None:
+        dispatcher = self._dispatcher(workers=1, max_batch_size=2)
+
+        for chain_id in range(3):
+            dispatcher.enqueue(
+                HookEvent(type=HookEvent.Type.CHAIN_UPDATE, chain_id=chain_id)
+            )
+        dispatcher.flush()
+
+        self.assertEqual(
+            self.cgw.events,
+            [
+                [
+                    {"type": "CHAIN_UPDATE", "chainId": "0"},
+                    {"type": "CHAIN_UPDATE", "chainId": "1"},
+                ],
+                {"type": "CHAIN_UPDATE", "chainId": "2"},
+            ],
+        )
+
+    def test_full_queue_sends_inline(self) -> None:
+        dispatcher = self._dispatcher(max_queue_size=1, workers=0)
+
+        dispatcher.enqueue(HookEvent(type=HookEvent.Type.CHAIN_UPDATE, chain_id=1))
+        dispatcher.enqueue(HookEvent(type=HookEvent.Type.CHAIN_UPDATE, chain_id=2))
+
+        self.assertEqual(self.cgw.events, [{"type": "CHAIN_UPDATE", "chainId": "2"}])
+
+    def test_hook_event_is_dispatched_when_async(self) -> None:
+        get_dispatcher.cache_clear()
+        self.addCleanup(get_dispatcher.cache_clear)
+
+        with override_settings(CGW_HOOKS_ASYNC=True):
+            with self.captureOnCommitCallbacks(execute=True):
+                hook_event(HookEvent(type=HookEvent.Type.CHAIN_UPDATE, chain_id=1))
+                self.assertEqual(self.cgw.events, [])
+            get_dispatcher().flush()
+
+        self.assertEqual(self.cgw.events, [{"type": "CHAIN_UPDATE", "chainId": "1"}])
@@ -0,0 +1,136 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+import json
+
+import responses
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import TestCase, override_settings
+
+from ..safe_client_gateway import (
+    HookEvent,
+    acollect_hook_events,
+    collect_hook_events,
+    hook_events,
+)
+
+HOOKS_URL = "http://127.0.0.1/v1/hooks/events"
+
+
+@override_settings(CGW_URL="http://127.0.0.1", CGW_AUTH_TOKEN="example-token")
+class HookEventsTestCase(TestCase):
+    events = [
+        HookEvent(type=HookEvent.Type.CHAIN_UPDATE, chain_id=chain_id)
+        for chain_id in range(5)
+    ]
+
+    @responses.activate
+    def test_events_sent_one_by_one_by_default(self) -> None:
+        responses.add(responses.POST, HOOKS_URL, status=200)
+
+        hook_events(self.events)
+
+        assert [json.loads(call.request.body) for call in responses.calls] == [
+            {"type": "CHAIN_UPDATE", "chainId": str(chain_id)} for chain_id in range(5)
+        ]
+
+    @responses.activate
+    @override_settings(CGW_HOOKS_BATCH_SIZE=3)
+    def test_events_sent_in_batches(self) -> None:
+        responses.add(responses.POST, HOOKS_URL, status=200)
+
+        hook_events(self.events)
+
+        assert [json.loads(call.request.body) for call in responses.calls] == [
+            [{"type": "CHAIN_UPDATE", "chainId": str(chain_id)} for chain_id in (0, 1, 2)],
+            [{"type": "CHAIN_UPDATE", "chainId": str(chain_id)} for chain_id in (3, 4)],
+        ]
+
+    @responses.activate
+    @override_settings(CGW_HOOKS_BATCH_SIZE=10)
+    def test_rejected_batch_falls_back_to_single_events(self) -> None:
+        responses.add(
+            responses.POST,
+            HOOKS_URL,
+            status=400,
+            match=[
+                responses.matchers.json_params_matcher(
+                    [
+                        {"type": "CHAIN_UPDATE", "chainId": "0"},
+                        {"type": "CHAIN_UPDATE", "chainId": "1"},
+                    ]
+                )
+            ],
+        )
+        responses.add(responses.POST, HOOKS_URL, status=200)
+
+        hook_events(self.events[:2])
+
+        assert [json.loads(call.request.body) for call in responses.calls] == [
+            [
+                {"type": "CHAIN_UPDATE", "chainId": "0"},
+                {"type": "CHAIN_UPDATE", "chainId": "1"},
+            ],
+            {"type": "CHAIN_UPDATE", "chainId": "0"},
+            {"type": "CHAIN_UPDATE", "chainId": "1"},
+        ]
+
+    @responses.activate
+    @override_settings(CGW_URL=None, CGW_HOOKS_BATCH_SIZE=10)
+    def test_no_batch_sent_with_no_url(self) -> None:
+        hook_events(self.events)
+
+        assert len(responses.calls) == 0
+
+
+@override_settings(CGW_URL="http://127.0.0.1", CGW_AUTH_TOKEN="example-token")
+class CollectHookEventsTestCase(TestCase):
+    events = [
+        HookEvent(type=HookEvent.Type.CHAIN_UPDATE, chain_id=chain_id)
+        for chain_id in (1, 2, 1)
+    ]
+
+    @responses.activate
+    def test_collected_events_sent_once_on_commit(self) -> None:
+        responses.add(responses.POST, HOOKS_URL, status=200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with collect_hook_events():
+                hook_events(self.events)
+                with collect_hook_events():
+                    hook_events(self.events)
+
+                assert len(responses.calls) == 0
+
+        assert [json.loads(call.request.body) for call in responses.calls] == [
+            {"type": "CHAIN_UPDATE", "chainId": "1"},
+            {"type": "CHAIN_UPDATE", "chainId": "2"},
+        ]
+
+    @responses.activate
+    def test_events_collected_from_sync_to_async(self) -> None:
+        responses.add(responses.POST, HOOKS_URL, status=200)
+
+        async def handle_request() -> None:
+            async with acollect_hook_events():
+                await sync_to_async(hook_events)(self.events)
+                await sync_to_async(hook_events)(self.events)
+
+                assert len(responses.calls) == 0
+
+        with self.captureOnCommitCallbacks(execute=True):
+            async_to_sync(handle_request)()
+
+        assert [json.loads(call.request.body) for call in responses.calls] == [
+            {"type": "CHAIN_UPDATE", "chainId": "1"},
+            {"type": "CHAIN_UPDATE", "chainId": "2"},
+        ]
+
+    @responses.activate
+    def test_collected_events_not_sent_on_error(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(ValueError):
+                with collect_hook_events():
+                    hook_events(self.events)
+                    raise ValueError
+
+        assert callbacks == []
+        assert len(responses.calls) == 0
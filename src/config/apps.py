@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+class ConfigAppConfig(AppConfig):
+    name = "config"
+
+    def ready(self) -> None:
+        from config.db import install_execute_wrapper
+
+        # Connected before the first connection is created
+        connection_created.connect(install_execute_wrapper)
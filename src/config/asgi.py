@@ -9,8 +9,13 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
-
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
+# APM must be initialized before any Django import (required for patch() to work)
+from apm import setup_tracing
+
+setup_tracing()
+
+from django.core.asgi import get_asgi_application
+
 application = get_asgi_application()
@@ -0,0 +1,96 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+"""
+Async versions of the read-only API views, used when ASYNC_VIEWS is enabled
+(ASGI deployments, see config/gunicorn.py).
+
+DRF views are synchronous. Under ASGI every request they handle is run in a
+worker thread, so an async view answers the requests it can from the
+in-memory snapshots on the event loop and only hands the others (custom
+orderings, v2, stale snapshots...) to the DRF view.
+"""
+
+from collections.abc import Awaitable, Callable
+from functools import wraps
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpRequest, HttpResponseBase
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.views import APIView
+
+FastPath = Callable[..., Awaitable[HttpResponseBase | None]]
+EtagFunc = Callable[..., Awaitable[str]]
+View = Callable[..., Any]
+AsyncView = Callable[..., Awaitable[HttpResponseBase]]
+
+
+def condition(etag_func: EtagFunc) -> Callable[[AsyncView], AsyncView]:
+    """
+    django.views.decorators.http.condition for async views and an async
+    ``etag_func``, which reads the config versions without blocking the event
+    loop (see config.versioning.aversion_etag).
+    """
+
+    def decorator(func: AsyncView) -> AsyncView:
+        @wraps(func)
+        async def inner(
+            request: HttpRequest, *args: Any, **kwargs: Any
+        ) -> HttpResponseBase:
+            etag = quote_etag(await etag_func(request, *args, **kwargs))
+            response: HttpResponseBase | None = get_conditional_response(
+                request, etag=etag
+            )
+            if response is None:
+                response = await func(request, *args, **kwargs)
+            if request.method in ("GET", "HEAD"):
+                response.headers.setdefault("ETag", etag)
+            return response
+
+        return inner
+
+    return decorator
+
+
+def build_async_view(
+    view_class: type[APIView],
+    fast_path: FastPath,
+    etag_func: EtagFunc | None = None,
+) -> View:
+    """
+    Returns an async view answering GET requests with ``fast_path`` and
+    delegating to ``view_class`` when it returns None.
+
+    The view keeps the ``cls`` and ``initkwargs`` attributes of DRF views so
+    that the schema still documents ``view_class``.
+    """
+    sync_view = sync_to_async(view_class.as_view())
+
+    async def view(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponseBase:
+        if request.method == "GET":
+            fast_response = await fast_path(request, *args, **kwargs)
+            if fast_response is not None:
+                return fast_response
+        response: HttpResponseBase = await sync_view(request, *args, **kwargs)
+        return response
+
+    wrapped: View = view
+    if etag_func is not None:
+        wrapped = condition(etag_func)(view)
+    wrapped = csrf_exempt(wrapped)
+    wrapped.cls = view_class  # type: ignore[attr-defined]
+    wrapped.initkwargs = {}  # type: ignore[attr-defined]
+    return wrapped
+
+
+def async_view(
+    view_class: type[APIView],
+    fast_path: FastPath,
+    etag_func: EtagFunc | None = None,
+) -> View:
+    """The async view of ``view_class`` if ASYNC_VIEWS is enabled, else its view."""
+    if settings.ASYNC_VIEWS:
+        return build_async_view(view_class, fast_path, etag_func)
+    return view_class.as_view()
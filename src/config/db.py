@@ -0,0 +1,105 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+"""
+Database connection pool metrics and request-wide query wrappers.
+
+With POSTGRES_POOL every process keeps its own psycopg pool, so the stats
+only describe the process serving the request. The /metrics endpoint reports
+them for every worker (see config.metrics).
+
+Django connections belong to a thread, and under ASGI the ORM of a request
+runs in the threads of sync_to_async, not in the event loop running the
+middleware. ``execute_wrapper`` wraps the queries of the current context
+instead, whichever connection they are made on.
+"""
+
+import functools
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.http import HttpRequest, JsonResponse
+
+from . import metrics
+
+# psycopg pool stats describing the current state of the pool
+POOL_GAUGES = (
+    "pool_min",
+    "pool_max",
+    "pool_size",
+    "pool_available",
+    "requests_waiting",
+)
+
+
+def get_pool_stats() -> dict[str, dict[str, int]]:
+    """
+    Returns the psycopg pool stats (pool_size, pool_available,
+    requests_waiting, requests_wait_ms, ...) of every pooled database.
+    """
+    stats = {}
+    for alias in connections:
+        pool = getattr(connections[alias], "pool", None)
+        if pool is not None:
+            stats[alias] = pool.get_stats()
+    return stats
+
+
+def pool_stats_view(request: HttpRequest) -> JsonResponse:
+    return JsonResponse(get_pool_stats())
+
+
+def collect_pool_metrics() -> Iterable[metrics.Metric]:
+    gauge = metrics.Gauge(
+        "db_pool_connections", "Connection pool stats by database", ("database", "stat")
+    )
+    for alias, stats in get_pool_stats().items():
+        for stat in POOL_GAUGES:
+            gauge.set(stats.get(stat, 0), alias, stat)
+    return [gauge]
+
+
+metrics.registry.add_collector(collect_pool_metrics)
+
+
+ExecuteWrapper = Callable[..., object]
+
+_execute_wrappers: ContextVar[tuple[ExecuteWrapper, ...]] = ContextVar(
+    "execute_wrappers", default=()
+)
+
+
+@contextmanager
+def execute_wrapper(wrapper: ExecuteWrapper) -> Iterator[None]:
+    """
+    Like connection.execute_wrapper, but wraps the queries made in the current
+    context on any connection, including from sync_to_async threads.
+    """
+    token = _execute_wrappers.set((*_execute_wrappers.get(), wrapper))
+    try:
+        yield
+    finally:
+        _execute_wrappers.reset(token)
+
+
+def _execute(
+    execute: Callable[..., object],
+    sql: str,
+    params: object,
+    many: bool,
+    context: dict[str, object],
+) -> object:
+    # The first wrapper is the outermost one, like connection.execute_wrapper
+    for wrapper in reversed(_execute_wrappers.get()):
+        execute = functools.partial(wrapper, execute)
+    return execute(sql, params, many, context)
+
+
+def install_execute_wrapper(
+    sender: Any, connection: BaseDatabaseWrapper, **kwargs: Any
+) -> None:
+    """Wraps the queries of ``connection`` (connection_created receiver)."""
+    if _execute not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute)
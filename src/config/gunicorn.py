@@ -1,6 +1,7 @@
 # SPDX-License-Identifier: FSL-1.1-MIT
 import multiprocessing
 import os
+from pathlib import Path
 
 
 def _parse_bool(value: str) -> bool:
@@ -17,4 +18,20 @@ accesslog = "-"
 workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2))
 threads = int(os.getenv("PYTHON_MAX_THREADS", 1))
 
+# "asgi" serves config.asgi from gunicorn's asyncio worker (see
+# docker-entrypoint.sh), together with ASYNC_VIEWS
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "sync")
+# Maximum number of concurrent connections of every asgi worker
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 1000))
+# Django does not implement the ASGI lifespan protocol
+asgi_lifespan = "off"
+
 reload = _parse_bool(os.getenv("WEB_RELOAD", "false"))
+
+
+def on_starting(server: object) -> None:
+    # Discard the metrics of the workers of a previous run (see config.metrics)
+    metrics_dir = os.getenv("METRICS_DIR")
+    if metrics_dir:
+        for file in Path(metrics_dir).glob("*.json"):
+            file.unlink(missing_ok=True)
@@ -0,0 +1,342 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+"""
+In-process metrics exposed in the Prometheus text format (see metrics_view).
+
+Metrics are recorded in memory under a single lock, so recording a value only
+costs a dictionary update. With METRICS_DIR set, every process also writes its
+metrics to its own file there (see MetricsStore) and the endpoint merges the
+files of every gunicorn worker: counters and histograms are summed, those of
+exited workers included, and gauges are reported per live worker.
+"""
+
+import atexit
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable, Sequence
+from functools import cache
+from pathlib import Path
+from typing import Any, TypeVar
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+
+logger = logging.getLogger(__name__)
+
+Labels = tuple[str, ...]
+# Metric name to its dump, see Metric.dump
+Dump = dict[str, dict[str, Any]]
+
+# Seconds
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+_lock = threading.Lock()
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(
+        self, name: str, documentation: str, labels: Sequence[str] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.values: dict[Labels, Any] = {}
+
+    def dump(self) -> dict[str, Any]:
+        with _lock:
+            values = [
+                [list(labels), value.copy() if isinstance(value, list) else value]
+                for labels, value in self.values.items()
+            ]
+        return {
+            "kind": self.kind,
+            "help": self.documentation,
+            "labels": list(self.labels),
+            "values": values,
+        }
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with _lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with _lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        with _lock:
+            self.values[labels] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with _lock:
+            counts = self.values.get(labels)
+            if counts is None:
+                # The count of every bucket, then of +Inf, then the sum
+                counts = self.values[labels] = [0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    def dump(self) -> dict[str, Any]:
+        return {**super().dump(), "buckets": list(self.buckets)}
+
+
+M = TypeVar("M", bound=Metric)
+
+
+class Registry:
+    """
+    The metrics of the process.
+
+    Collectors return metrics computed when the registry is dumped, e.g. from
+    the state of a connection pool.
+    """
+
+    def __init__(self) -> None:
+        self.metrics: dict[str, Metric] = {}
+        self.collectors: list[Callable[[], Iterable[Metric]]] = []
+
+    def register(self, metric: M) -> M:
+        """Registers ``metric``, or returns the one already registered."""
+        with _lock:
+            registered = self.metrics.setdefault(metric.name, metric)
+        if type(registered) is not type(metric):
+            raise ValueError(f"Metric {metric.name} is already registered")
+        return registered
+
+    def counter(
+        self, name: str, documentation: str, labels: Sequence[str] = ()
+    ) -> Counter:
+        return self.register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labels))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[Metric]]) -> None:
+        self.collectors.append(collector)
+
+    def dump(self) -> Dump:
+        metrics = list(self.metrics.values())
+        for collector in self.collectors:
+            try:
+                metrics.extend(collector())
+            except Exception:
+                logger.exception("Error collecting metrics from %s", collector)
+        return {metric.name: metric.dump() for metric in metrics}
+
+
+registry = Registry()
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def merge(dumps: dict[int, Dump], live_pids: set[int]) -> Dump:
+    """
+    Merges the dumps of several processes, by pid.
+
+    Counters and histograms are summed. Gauges get a ``pid`` label and those of
+    the processes not in ``live_pids`` are dropped.
+    """
+    merged: Dump = {}
+    for pid, dump in sorted(dumps.items()):
+        for name, metric in dump.items():
+            is_gauge = metric["kind"] == "gauge"
+            if is_gauge and pid not in live_pids:
+                continue
+            target = merged.get(name)
+            if target is None:
+                names = metric["labels"] + ["pid"] if is_gauge else metric["labels"]
+                target = merged[name] = {**metric, "labels": names, "values": {}}
+            for labels, value in metric["values"]:
+                key = (*labels, str(pid)) if is_gauge else tuple(labels)
+                current = target["values"].get(key)
+                if current is None:
+                    target["values"][key] = value
+                elif isinstance(value, list):
+                    target["values"][key] = [a + b for a, b in zip(current, value)]
+                else:
+                    target["values"][key] = current + value
+    return {
+        name: {**metric, "values": list(metric["values"].items())}
+        for name, metric in merged.items()
+    }
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return f"{{{pairs}}}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(dump: Dump) -> str:
+    """Renders ``dump`` in the Prometheus text exposition format."""
+    lines = []
+    for name, metric in sorted(dump.items()):
+        lines.append(f"# HELP {name} {_escape(metric['help'])}")
+        lines.append(f"# TYPE {name} {metric['kind']}")
+        label_names = metric["labels"]
+        for labels, value in sorted(metric["values"], key=lambda item: item[0]):
+            if metric["kind"] != "histogram":
+                labels_text = _format_labels(label_names, labels)
+                lines.append(f"{name}{labels_text} {_format_value(value)}")
+                continue
+            cumulative = 0
+            bounds = [_format_value(bound) for bound in metric["buckets"]] + ["+Inf"]
+            for bound, count in zip(bounds, value[:-1]):
+                cumulative += count
+                labels_text = _format_labels([*label_names, "le"], [*labels, bound])
+                lines.append(f"{name}_bucket{labels_text} {cumulative}")
+            labels_text = _format_labels(label_names, labels)
+            lines.append(f"{name}_sum{labels_text} {_format_value(value[-1])}")
+            lines.append(f"{name}_count{labels_text} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsStore:
+    """
+    The metrics of every process, one file per process in ``directory``.
+
+    Every process writes its file every ``interval`` seconds, from a
+    background thread, and when it exits.
+    """
+
+    def __init__(self, directory: Path, interval: float) -> None:
+        self.directory = directory
+        self.interval = interval
+        self._pid: int | None = None
+        self._lock = threading.Lock()
+
+    def write(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        file = self.directory / f"{os.getpid()}.json"
+        temporary = file.with_suffix(".tmp")
+        temporary.write_text(json.dumps(registry.dump()))
+        os.replace(temporary, file)
+
+    def read(self) -> dict[int, Dump]:
+        dumps = {}
+        for file in self.directory.glob("*.json"):
+            try:
+                dumps[int(file.stem)] = json.loads(file.read_text())
+            except (OSError, ValueError):
+                logger.warning("Skipping unreadable metrics file %s", file)
+        return dumps
+
+    def ensure_writer(self) -> None:
+        # Threads do not survive a fork (e.g. gunicorn preload), start the
+        # writer lazily in the process recording the metrics
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            threading.Thread(
+                target=self._run, name="metrics-writer", daemon=True
+            ).start()
+            atexit.register(self._write)
+            self._pid = pid
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            self._write()
+
+    def _write(self) -> None:
+        try:
+            self.write()
+        except Exception:
+            logger.exception("Error writing the metrics of process %d", os.getpid())
+
+
+@cache
+def get_store() -> MetricsStore | None:
+    if not settings.METRICS_DIR:
+        return None
+    return MetricsStore(
+        Path(settings.METRICS_DIR), settings.METRICS_WRITE_INTERVAL_SECONDS
+    )
+
+
+def collect() -> Dump:
+    """Returns the metrics of every process (see MetricsStore)."""
+    store = get_store()
+    if store is None:
+        return merge({os.getpid(): registry.dump()}, {os.getpid()})
+    store.write()
+    dumps = store.read()
+    return merge(dumps, {pid for pid in dumps if _is_alive(pid)})
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    return HttpResponse(
+        render(collect()), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -1,35 +1,355 @@
+import gzip
 import logging
-import time
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from compression import zstd
+from typing import Any
 
-from django.http import HttpRequest
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_vary_headers
 
+from clients.safe_client_gateway import acollect_hook_events, collect_hook_events
 
-class LoggingMiddleware:
-    def __init__(self, get_response):
+from . import db, metrics, queries, timing
+
+
+class SyncAndAsyncMiddleware:
+    """
+    Base of the middleware that run on both the WSGI and the ASGI handlers.
+
+    Django adapts a sync-only middleware to the ASGI handler by running it,
+    and the rest of the chain, in a thread: every request would leave the
+    event loop. Subclasses implement ``handle`` and its async version
+    ``ahandle``, called with the sync or async ``get_response`` of the chain.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], Any]) -> None:
         self.get_response = get_response
-        self.logger = logging.getLogger("LoggingMiddleware")
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
-    @staticmethod
-    def get_milliseconds_now():
-        return int(time.time() * 1000)
+    def __call__(self, request: HttpRequest) -> Any:
+        if iscoroutinefunction(self):
+            return self.ahandle(request)
+        return self.handle(request)
 
-    def __call__(self, request: HttpRequest):
-        # before view (and other middleware) are called
-        milliseconds = self.get_milliseconds_now()
+    def handle(self, request: HttpRequest) -> HttpResponse:
+        raise NotImplementedError
+
+    async def ahandle(self, request: HttpRequest) -> HttpResponse:
+        raise NotImplementedError
 
-        response = self.get_response(request)
 
-        # after view is called
+class LoggingMiddleware(SyncAndAsyncMiddleware):
+    """
+    Logs the routed requests with their timing breakdown (see config.timing),
+    also sent as a Server-Timing header with SERVER_TIMING.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], Any]) -> None:
+        super().__init__(get_response)
+        self.logger = logging.getLogger("LoggingMiddleware")
+        self.server_timing = settings.SERVER_TIMING
+
+    def handle(self, request: HttpRequest) -> HttpResponse:
+        with timing.request_timings() as timings:
+            response = self.get_response(request)
+        return self._log(request, response, timings)
+
+    async def ahandle(self, request: HttpRequest) -> HttpResponse:
+        with timing.request_timings() as timings:
+            response = await self.get_response(request)
+        return self._log(request, response, timings)
+
+    def _log(
+        self,
+        request: HttpRequest,
+        response: HttpResponse,
+        timings: timing.RequestTimings,
+    ) -> HttpResponse:
+        if self.server_timing:
+            response["Server-Timing"] = timings.server_timing()
         if request.resolver_match:
             route = (
                 request.resolver_match.route if request.resolver_match else request.path
             )
+            fields = timings.as_log_fields()
             self.logger.info(
-                "MT::%s::%s::%s::%d::%s",
+                "MT::%s::%s::%.3f::%d::%s",
                 request.method,
                 route,
-                self.get_milliseconds_now() - milliseconds,
+                fields["duration_ms"],
                 response.status_code,
                 request.path,
+                extra=fields,
+            )
+        return response
+
+
+# Content codings by order of preference. Brotli is not in the standard library.
+# The default levels: compressing is part of the first request of every version
+COMPRESSORS: dict[str, Callable[[bytes], bytes]] = {
+    "zstd": lambda content: zstd.compress(content, level=3),
+    "gzip": lambda content: gzip.compress(content, compresslevel=6, mtime=0),
+}
+
+
+def _quality(params: str) -> float:
+    for param in params.split(";"):
+        key, _, value = param.strip().partition("=")
+        if key == "q":
+            try:
+                return float(value)
+            except ValueError:
+                return 0
+    return 1
+
+
+def get_accepted_encoding(accept_encoding: str) -> str | None:
+    """Returns the preferred content coding of ``accept_encoding``, if any."""
+    accepted = set()
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.partition(";")
+        if _quality(params) > 0:
+            accepted.add(name.strip().lower())
+    for encoding in COMPRESSORS:
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return None
+
+COMPRESSED_RESPONSE_LOOKUPS = metrics.registry.counter(
+    "compressed_response_cache_lookups_total",
+    "Lookups of the compressed responses cache by content coding and result",
+    ("encoding", "result"),
+)
+
+
+class CompressedResponseCacheMiddleware(SyncAndAsyncMiddleware):
+    """
+    Compresses the responses carrying an ETag and keeps the compressed bytes,
+    keyed by ETag and content coding, in a per-process LRU cache.
+
+    The config ETags depend on the config version and on the request URI (see
+    config.versioning), so every version of a response is only compressed once
+    per process. Responses without an ETag are left to nginx.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], Any]) -> None:
+        super().__init__(get_response)
+        self.max_size = settings.COMPRESSED_RESPONSES_CACHE_SIZE
+        self.min_length = settings.COMPRESSED_RESPONSES_MIN_LENGTH
+        self.cache: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def handle(self, request: HttpRequest) -> HttpResponse:
+        response = self.get_response(request)
+        key = self._get_key(request, response)
+        if key is None:
+            return response
+        compressed = self._get_cached(key)
+        if compressed is None:
+            compressed = self._compress(key, response.content)
+        return self._encode(response, key, compressed)
+
+    async def ahandle(self, request: HttpRequest) -> HttpResponse:
+        response = await self.get_response(request)
+        key = self._get_key(request, response)
+        if key is None:
+            return response
+        compressed = self._get_cached(key)
+        if compressed is None:
+            # Compressing a large response would block the event loop
+            compressed = await sync_to_async(self._compress, thread_sensitive=False)(
+                key, response.content
             )
+        return self._encode(response, key, compressed)
+
+    def _get_key(
+        self, request: HttpRequest, response: HttpResponse
+    ) -> tuple[str, str] | None:
+        """The ETag and the content coding of ``response``, if compressed."""
+        etag = response.get("ETag")
+        if (
+            etag is None
+            or response.status_code != 200
+            or response.streaming
+            or response.has_header("Content-Encoding")
+            or len(response.content) < self.min_length
+        ):
+            return None
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = get_accepted_encoding(request.headers.get("Accept-Encoding", ""))
+        if encoding is None:
+            return None
+        return etag, encoding
+
+    def _encode(
+        self, response: HttpResponse, key: tuple[str, str], content: bytes
+    ) -> HttpResponse:
+        if len(content) >= len(response.content):
+            return response
+        etag, encoding = key
+        response.content = content
+        response["Content-Length"] = str(len(content))
+        response["Content-Encoding"] = encoding
+        # The representation changes with the coding (RFC 9110 8.8.3), the
+        # conditional GETs use a weak comparison so they still match
+        if etag.startswith('"'):
+            response["ETag"] = f"W/{etag}"
+        return response
+
+    def _get_cached(self, key: tuple[str, str]) -> bytes | None:
+        with self.lock:
+            compressed = self.cache.get(key)
+            if compressed is not None:
+                self.cache.move_to_end(key)
+        COMPRESSED_RESPONSE_LOOKUPS.inc(
+            key[1], "miss" if compressed is None else "hit"
+        )
+        return compressed
+
+    def _compress(self, key: tuple[str, str], content: bytes) -> bytes:
+        compressed = COMPRESSORS[key[1]](content)
+        with self.lock:
+            self.cache[key] = compressed
+            while len(self.cache) > self.max_size:
+                self.cache.popitem(last=False)
+        return compressed
+
+
+class HookEventsMiddleware(SyncAndAsyncMiddleware):
+    """
+    Sends the CGW hook events triggered by a request once, deduplicated, after
+    its changes are committed (see collect_hook_events).
+
+    A single admin save (e.g. a Chain with its inlines) triggers the same
+    events from several signal receivers.
+    """
+
+    def handle(self, request: HttpRequest) -> HttpResponse:
+        if request.method in ("GET", "HEAD", "OPTIONS"):
+            return self.get_response(request)
+        with collect_hook_events():
+            return self.get_response(request)
+
+    async def ahandle(self, request: HttpRequest) -> HttpResponse:
+        if request.method in ("GET", "HEAD", "OPTIONS"):
+            return await self.get_response(request)
+        async with acollect_hook_events():
+            return await self.get_response(request)
+
+
+class QueryInspectionMiddleware(SyncAndAsyncMiddleware):
+    """
+    Reports the queries repeated by a request, likely N+1s, and checks the
+    query budget of its view (see config.queries).
+    """
+
+    def handle(self, request: HttpRequest) -> HttpResponse:
+        inspector = queries.QueryInspector(settings.QUERY_REPEAT_THRESHOLD)
+        with db.execute_wrapper(inspector):
+            response = self.get_response(request)
+        return self._check(request, response, inspector)
+
+    async def ahandle(self, request: HttpRequest) -> HttpResponse:
+        inspector = queries.QueryInspector(settings.QUERY_REPEAT_THRESHOLD)
+        with db.execute_wrapper(inspector):
+            response = await self.get_response(request)
+        return self._check(request, response, inspector)
+
+    def _check(
+        self,
+        request: HttpRequest,
+        response: HttpResponse,
+        inspector: queries.QueryInspector,
+    ) -> HttpResponse:
+        if request.resolver_match:
+            queries.check(
+                request.resolver_match.route,
+                queries.get_query_budget(request.resolver_match.func),
+                inspector,
+                enforce=settings.QUERY_BUDGET_ENFORCE,
+            )
+        return response
+
+
+REQUEST_DURATION = metrics.registry.histogram(
+    "http_request_duration_seconds",
+    "Duration of the HTTP requests by route",
+    ("method", "route", "status"),
+)
+REQUESTS_IN_FLIGHT = metrics.registry.gauge(
+    "http_requests_in_flight", "HTTP requests being handled by the worker"
+)
+REQUEST_QUERIES = metrics.registry.histogram(
+    "db_queries_per_request",
+    "Database queries made by the HTTP requests by route",
+    ("route",),
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100),
+)
+REQUEST_QUERIES_DURATION = metrics.registry.histogram(
+    "db_queries_duration_seconds_per_request",
+    "Time spent in database queries by the HTTP requests by route",
+    ("route",),
+)
+
+
+class MetricsMiddleware(SyncAndAsyncMiddleware):
+    """
+    Records the duration and the database queries of every request by route,
+    and the requests in flight (see config.metrics).
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], Any]) -> None:
+        super().__init__(get_response)
+        self.store = metrics.get_store()
+
+    def handle(self, request: HttpRequest) -> HttpResponse:
+        self._start()
+        try:
+            with timing.request_timings() as timings:
+                response = self.get_response(request)
+                duration = timings.elapsed() / 1e9
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+        return self._record(request, response, timings, duration)
+
+    async def ahandle(self, request: HttpRequest) -> HttpResponse:
+        self._start()
+        try:
+            with timing.request_timings() as timings:
+                response = await self.get_response(request)
+                duration = timings.elapsed() / 1e9
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+        return self._record(request, response, timings, duration)
+
+    def _start(self) -> None:
+        if self.store is not None:
+            self.store.ensure_writer()
+        REQUESTS_IN_FLIGHT.inc()
+
+    def _record(
+        self,
+        request: HttpRequest,
+        response: HttpResponse,
+        timings: timing.RequestTimings,
+        duration: float,
+    ) -> HttpResponse:
+        # Unmatched paths are not used as labels, they are unbounded
+        route = request.resolver_match.route if request.resolver_match else ""
+        REQUEST_DURATION.observe(
+            duration, request.method or "", route, str(response.status_code)
+        )
+        REQUEST_QUERIES.observe(timings.queries, route)
+        REQUEST_QUERIES_DURATION.observe(
+            timings.durations.get(timing.DATABASE, 0) / 1e9, route
+        )
         return response
@@ -0,0 +1,175 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+"""
+Query patterns of the requests: N+1 detection and query budgets.
+
+Every query of a request is grouped by its shape, its SQL without literals
+and with the lists of placeholders collapsed. A shape repeated
+QUERY_REPEAT_THRESHOLD times usually comes from a loop over related objects
+(an N+1) and is attributed to the code of the project that issued it, e.g. a
+serializer method.
+
+Views declare the number of queries they need with a ``query_budget``
+attribute. A request over the budget of its view is logged, or raises
+QueryBudgetExceeded with QUERY_BUDGET_ENFORCE (enabled by the tests).
+Repeated shapes and exceeded budgets are also tagged in APM.
+"""
+
+import logging
+import re
+import sys
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import apm
+
+from . import db, timing
+
+logger = logging.getLogger(__name__)
+
+# Same form as the file names of the code objects
+_ROOT = Path(__file__).parent.parent
+_PLACEHOLDER_LISTS = re.compile(r"\bIN \((?:%s, )*%s\)")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+# The execute wrappers calling the inspector are not the origin of a query
+_WRAPPER_FILES = frozenset((__file__, db.__file__, timing.__file__))
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+@lru_cache(maxsize=1024)
+def get_shape(sql: str) -> str:
+    """Returns ``sql`` without its literals, e.g. LIMIT 21 and IN lists."""
+    return _LITERALS.sub("?", _PLACEHOLDER_LISTS.sub("IN (...)", sql))
+
+
+def get_origin() -> str | None:
+    """Returns the innermost project code calling this function, if any."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        path = Path(frame.f_code.co_filename)
+        if (
+            frame.f_code.co_filename not in _WRAPPER_FILES
+            and path.is_relative_to(_ROOT)
+            and "site-packages" not in path.parts
+        ):
+            location = path.relative_to(_ROOT)
+            return f"{location}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+@dataclass
+class QueryPattern:
+    shape: str
+    count: int = 0
+    # Where the query was issued when it was first reported as repeated
+    origin: str | None = None
+
+
+class QueryInspector:
+    """
+    Groups the queries it wraps by shape (see config.db.execute_wrapper).
+    """
+
+    def __init__(self, repeat_threshold: int) -> None:
+        self.repeat_threshold = repeat_threshold
+        self.patterns: dict[str, QueryPattern] = {}
+        self.count = 0
+
+    def __call__(
+        self,
+        execute: Callable[..., object],
+        sql: str,
+        params: object,
+        many: bool,
+        context: dict[str, object],
+    ) -> object:
+        shape = get_shape(sql)
+        pattern = self.patterns.get(shape)
+        if pattern is None:
+            pattern = self.patterns[shape] = QueryPattern(shape)
+        pattern.count += 1
+        self.count += 1
+        if pattern.count == self.repeat_threshold:
+            pattern.origin = get_origin()
+        return execute(sql, params, many, context)
+
+    def repeated(self) -> list[QueryPattern]:
+        return [
+            pattern
+            for pattern in self.patterns.values()
+            if pattern.count >= self.repeat_threshold
+        ]
+
+
+def get_query_budget(view: Callable[..., Any]) -> int | None:
+    """The ``query_budget`` of a view function or of its DRF view class."""
+    budget: int | None = getattr(view, "query_budget", None)
+    if budget is None:
+        budget = getattr(getattr(view, "cls", None), "query_budget", None)
+    return budget
+
+
+def check(
+    route: str, budget: int | None, inspector: QueryInspector, enforce: bool
+) -> None:
+    """
+    Logs the repeated shapes of the queries of a request to ``route`` and
+    checks its budget.
+
+    Raises:
+        QueryBudgetExceeded: if ``enforce`` and the request made more
+            queries than ``budget``.
+    """
+    repeated = inspector.repeated()
+    exceeded = budget is not None and inspector.count > budget
+    if not repeated and not exceeded:
+        return
+    for pattern in repeated:
+        logger.warning(
+            "Query repeated %d times on %s by %s: %s",
+            pattern.count,
+            route,
+            pattern.origin,
+            pattern.shape,
+        )
+    _tag(route, budget, inspector, repeated)
+    if not exceeded:
+        return
+    message = f"{inspector.count} queries on {route}, over its budget of {budget}"
+    if enforce:
+        shapes = "\n".join(
+            f"{pattern.count} x {pattern.shape}"
+            for pattern in inspector.patterns.values()
+        )
+        raise QueryBudgetExceeded(f"{message}:\n{shapes}")
+    logger.warning(message)
+
+
+def _tag(
+    route: str,
+    budget: int | None,
+    inspector: QueryInspector,
+    repeated: list[QueryPattern],
+) -> None:
+    try:
+        with apm.trace("db.query_inspection", resource=route) as span:
+            if span is None:
+                return
+            span.set_tag("db.query_count", inspector.count)
+            if budget is not None:
+                span.set_tag("db.query_budget", budget)
+                span.set_tag("db.query_budget_exceeded", inspector.count > budget)
+            if repeated:
+                span.set_tag("db.n_plus_one", True)
+                span.set_tag(
+                    "db.n_plus_one.origins",
+                    ", ".join(str(pattern.origin) for pattern in repeated),
+                )
+    except Exception:
+        logger.exception("APM instrumentation error in query inspection")
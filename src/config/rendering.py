@@ -0,0 +1,61 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+"""
+Pre-rendered JSON fragments.
+
+Snapshots render every object once with the API renderer and build the list
+responses by joining the resulting bytes, which is byte-for-byte what
+rendering the whole list would produce.
+"""
+
+from collections.abc import Iterable, Mapping
+from typing import TYPE_CHECKING, Any
+
+from django.http import HttpResponse
+
+if TYPE_CHECKING:
+    # The camel case renderer is untyped, it is a DRF JSONRenderer
+    from rest_framework.renderers import JSONRenderer as CamelCaseJSONRenderer
+else:
+    from djangorestframework_camel_case.render import CamelCaseJSONRenderer
+
+from . import timing
+
+_renderer = CamelCaseJSONRenderer()
+
+
+class JSONRenderer(CamelCaseJSONRenderer):
+    """API renderer, timed as the rendering of the request (see config.timing)."""
+
+    def render(
+        self,
+        data: Any,
+        accepted_media_type: str | None = None,
+        renderer_context: Mapping[str, Any] | None = None,
+    ) -> bytes:
+        with timing.timed(timing.RENDER):
+            rendered: bytes = super().render(
+                data, accepted_media_type, renderer_context
+            )
+        return rendered
+
+
+def render_json(data: Any) -> bytes:
+    rendered: bytes = _renderer.render(data)
+    return rendered
+
+
+def json_array(fragments: Iterable[bytes]) -> bytes:
+    return b"[" + b",".join(fragments) + b"]"
+
+
+@timing.timed(timing.RENDER)
+def paginated_json(
+    count: int, next: str | None, previous: str | None, fragments: Iterable[bytes]
+) -> bytes:
+    """Same envelope as LimitOffsetPagination.get_paginated_response."""
+    envelope = render_json({"count": count, "next": next, "previous": previous})
+    return envelope[:-1] + b',"results":' + json_array(fragments) + b"}"
+
+
+def json_response(content: bytes) -> HttpResponse:
+    return HttpResponse(content, content_type="application/json")
@@ -0,0 +1,77 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+"""
+Compiled serializer representations.
+
+``Serializer.to_representation`` is cheap, but the nested serializers of a
+representation are usually instantiated for every object, deep-copying their
+declared fields each time. Compiling binds the fields of a serializer once
+and returns a plain function producing the same dict.
+"""
+
+from collections.abc import Callable, Mapping
+from typing import Any
+
+from rest_framework.fields import SerializerMethodField, SkipField
+from rest_framework.relations import PKOnlyObject
+from rest_framework.serializers import Serializer
+
+Representation = Callable[[Any], Any]
+
+
+def compile_serializer(
+    serializer: Serializer[Any],
+    overrides: Mapping[str, Representation] | None = None,
+) -> Callable[[Any], dict[str, Any]]:
+    """
+    Returns a function equivalent to ``serializer.to_representation``.
+
+    Method fields call the bound ``get_<field>`` methods of ``serializer``
+    directly, so those stay the only definition of their values.
+
+    Args:
+        serializer: Bound serializer whose readable fields are compiled. It
+            must outlive the function, as method fields call it.
+        overrides: Functions that build the value of a field from the whole
+            instance, e.g. compiled nested serializers.
+    """
+    overrides = overrides or {}
+    readable_fields: list[
+        tuple[str, Representation | None, Representation, Representation]
+    ] = []
+    for field_name, field in serializer.fields.items():
+        # Same as Serializer._readable_fields
+        if field.write_only:
+            continue
+        override = overrides.get(field_name)
+        if override is None and isinstance(field, SerializerMethodField):
+            override = getattr(serializer, field.method_name)
+        readable_fields.append(
+            (field_name, override, field.get_attribute, field.to_representation)
+        )
+
+    def to_representation(instance: Any) -> dict[str, Any]:
+        data: dict[str, Any] = {}
+        for (
+            field_name,
+            override,
+            get_attribute,
+            field_representation,
+        ) in readable_fields:
+            if override is not None:
+                data[field_name] = override(instance)
+                continue
+            # Same as Serializer.to_representation
+            try:
+                attribute = get_attribute(instance)
+            except SkipField:
+                continue
+            check_for_none = (
+                attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+            )
+            data[field_name] = (
+                None if check_for_none is None else field_representation(attribute)
+            )
+        return data
+
+    return to_representation
+
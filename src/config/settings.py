@@ -11,9 +11,11 @@ https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 
 import django_stubs_ext
+from django.core.exceptions import ImproperlyConfigured
 
 django_stubs_ext.monkeypatch()
 
@@ -42,16 +44,19 @@ APPLICATION_BUILD_NUMBER = os.getenv("APPLICATION_BUILD_NUMBER")
 REST_FRAMEWORK = {
     # https://www.django-rest-framework.org/api-guide/renderers/
     "DEFAULT_RENDERER_CLASSES": [
-        "djangorestframework_camel_case.render.CamelCaseJSONRenderer",
+        "config.rendering.JSONRenderer",
     ],
     "DEFAULT_VERSIONING_CLASS": "rest_framework.versioning.NamespaceVersioning",
 }
 
 INSTALLED_APPS = [
     "corsheaders",
+    "config.apps.ConfigAppConfig",
     "about.apps.AboutAppConfig",
     "chains.apps.AppsConfig",
     "safe_apps.apps.AppsConfig",
+    "webhooks.apps.WebhooksConfig",
+    "exports.apps.ExportsConfig",
     "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
@@ -64,7 +69,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "config.middleware.MetricsMiddleware",
     "config.middleware.LoggingMiddleware",
+    "config.middleware.CompressedResponseCacheMiddleware",
+    "config.middleware.HookEventsMiddleware",
+    "config.middleware.QueryInspectionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -75,12 +84,75 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Metrics exposed at /metrics (see config.metrics). With METRICS_DIR set, the
+# metrics of every process are written there and merged by the endpoint
+METRICS_DIR = os.environ.get("METRICS_DIR")
+METRICS_WRITE_INTERVAL_SECONDS = float(
+    os.environ.get("METRICS_WRITE_INTERVAL_SECONDS", "5")
+)
+
+# Send the timing breakdown of every request (database, serialization,
+# rendering) as a Server-Timing header (see config.timing)
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "false").lower() == "true"
+
+# Queries of the requests (see config.queries). A query repeated that many
+# times by a request is logged as a likely N+1. A request over the query budget
+# of its view is logged, and fails with QUERY_BUDGET_ENFORCE (enabled by the
+# tests)
+QUERY_REPEAT_THRESHOLD = int(os.environ.get("QUERY_REPEAT_THRESHOLD", "5"))
+QUERY_BUDGET_ENFORCE = os.environ.get("QUERY_BUDGET_ENFORCE", "false").lower() == "true"
+
+# Serve the read-only endpoints with async views (see config.async_views).
+# Enabled by default with the ASGI gunicorn worker (GUNICORN_WORKER_CLASS=asgi)
+ASYNC_VIEWS = (
+    os.environ.get(
+        "ASYNC_VIEWS", str(os.environ.get("GUNICORN_WORKER_CLASS") == "asgi")
+    ).lower()
+    == "true"
+)
+
+# The in-process snapshots of the config (see config.versioning) are rebuilt
+# when their version is bumped, or once older than this many seconds
+SNAPSHOT_MAX_AGE_SECONDS = float(os.environ.get("SNAPSHOT_MAX_AGE_SECONDS", "300"))
+
+# Compressed variants of the responses with an ETag kept by every process
+# (see config.middleware.CompressedResponseCacheMiddleware)
+COMPRESSED_RESPONSES_CACHE_SIZE = int(
+    os.environ.get("COMPRESSED_RESPONSES_CACHE_SIZE", "256")
+)
+# Smaller responses are not compressed
+COMPRESSED_RESPONSES_MIN_LENGTH = int(
+    os.environ.get("COMPRESSED_RESPONSES_MIN_LENGTH", "1024")
+)
+
+# The cache is shared by all the gunicorn workers so that an invalidation
+# triggered by one of them (e.g. an admin save) reaches every worker.
+# Defaults to a file-based cache local to the host, only allowed with DEBUG or
+# CACHE_ALLOW_HOST_LOCAL (single host deployments): the config versions must be
+# shared by every replica, e.g. with django.core.cache.backends.redis.RedisCache
+# https://docs.djangoproject.com/en/dev/topics/cache/
+CACHE_BACKEND = os.getenv(
+    "CACHE_BACKEND", "django.core.cache.backends.filebased.FileBasedCache"
+)
+HOST_LOCAL_CACHE_BACKENDS = (
+    "django.core.cache.backends.dummy.DummyCache",
+    "django.core.cache.backends.filebased.FileBasedCache",
+    "django.core.cache.backends.locmem.LocMemCache",
+)
+CACHE_ALLOW_HOST_LOCAL = os.getenv("CACHE_ALLOW_HOST_LOCAL", "false").lower() == "true"
+if CACHE_BACKEND in HOST_LOCAL_CACHE_BACKENDS and not (
+    DEBUG or CACHE_ALLOW_HOST_LOCAL
+):
+    raise ImproperlyConfigured(
+        f"CACHE_BACKEND {CACHE_BACKEND} is local to the host, the config versions "
+        "would not be shared by the replicas. Set a shared CACHE_BACKEND (e.g. "
+        "django.core.cache.backends.redis.RedisCache) or CACHE_ALLOW_HOST_LOCAL=true"
+    )
+_cache_root = os.path.join(tempfile.gettempdir(), "safe-config-service-cache")
 CACHES = {
     "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
-    },
-    "safe-apps": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "BACKEND": CACHE_BACKEND,
+        "LOCATION": os.getenv("CACHE_LOCATION", os.path.join(_cache_root, "default")),
     },
 }
 
@@ -142,6 +214,12 @@ WSGI_APPLICATION = "config.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# Connection reuse: with POSTGRES_POOL every process keeps a psycopg pool of
+# connections (see config.db), otherwise connections are kept open for
+# POSTGRES_CONN_MAX_AGE seconds (0 closes them after every request)
+POSTGRES_POOL = os.getenv("POSTGRES_POOL", "false").lower() == "true"
+POSTGRES_CONN_MAX_AGE = int(os.getenv("POSTGRES_CONN_MAX_AGE", "60"))
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -150,6 +228,26 @@ DATABASES = {
         "PASSWORD": os.getenv("POSTGRES_PASSWORD", "postgres"),
         "HOST": os.getenv("POSTGRES_HOST", "localhost"),
         "PORT": os.getenv("POSTGRES_PORT", "5432"),
+        # The pool does not support persistent connections
+        "CONN_MAX_AGE": 0 if POSTGRES_POOL else POSTGRES_CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": (
+            os.getenv("POSTGRES_CONN_HEALTH_CHECKS", "true").lower() == "true"
+        ),
+        "OPTIONS": {
+            "connect_timeout": int(os.getenv("POSTGRES_CONNECT_TIMEOUT", "10")),
+            **(
+                {
+                    "pool": {
+                        "min_size": int(os.getenv("POSTGRES_POOL_MIN_SIZE", "2")),
+                        "max_size": int(os.getenv("POSTGRES_POOL_MAX_SIZE", "10")),
+                        # Seconds a request waits for a connection of a full pool
+                        "timeout": float(os.getenv("POSTGRES_POOL_TIMEOUT", "10")),
+                    }
+                }
+                if POSTGRES_POOL
+                else {}
+            ),
+        },
     }
 }
 
@@ -207,6 +305,41 @@ CGW_URL = os.environ.get("CGW_URL")
 CGW_AUTH_TOKEN = os.environ.get("CGW_AUTH_TOKEN")
 CGW_SESSION_MAX_RETRIES = int(os.environ.get("CGW_SESSION_MAX_RETRIES", "0"))
 CGW_SESSION_TIMEOUT_SECONDS = int(os.environ.get("CGW_SESSION_TIMEOUT_SECONDS", "2"))
+# Send the hooks from background threads after the transaction commits,
+# coalescing the duplicated events of a single change
+CGW_HOOKS_ASYNC = os.environ.get("CGW_HOOKS_ASYNC", "false").lower() == "true"
+CGW_HOOKS_QUEUE_SIZE = int(os.environ.get("CGW_HOOKS_QUEUE_SIZE", "1000"))
+CGW_HOOKS_WORKERS = int(os.environ.get("CGW_HOOKS_WORKERS", "2"))
+CGW_HOOKS_COALESCE_WINDOW_SECONDS = float(
+    os.environ.get("CGW_HOOKS_COALESCE_WINDOW_SECONDS", "0.5")
+)
+# Maximum number of events sent in a single (array) request. CGW must accept
+# arrays of events on /v1/hooks/events for values greater than 1
+CGW_HOOKS_BATCH_SIZE = int(os.environ.get("CGW_HOOKS_BATCH_SIZE", "1"))
+# Store the hooks in the database, in the transaction of the change, and send
+# them with the send_hook_events management command
+CGW_HOOKS_OUTBOX = os.environ.get("CGW_HOOKS_OUTBOX", "false").lower() == "true"
+# Failed attempts after which an outbox event is dead and no longer sent
+CGW_HOOKS_OUTBOX_MAX_ATTEMPTS = int(
+    os.environ.get("CGW_HOOKS_OUTBOX_MAX_ATTEMPTS", "20")
+)
+
+# Static config bundle served by nginx (see the export_config_bundle command).
+# It must be the bundle directory nginx serves, ${DOCKER_NGINX_VOLUME_ROOT}/bundle
+CONFIG_BUNDLE_ROOT = os.environ.get("CONFIG_BUNDLE_ROOT")
+# Scheme and host of the absolute URLs (pagination, images) of the bundle. The
+# responses are rendered for this host, so it must be in ALLOWED_HOSTS
+# (localhost is by default)
+CONFIG_BUNDLE_BASE_URL = os.environ.get("CONFIG_BUNDLE_BASE_URL", "http://localhost")
+CONFIG_BUNDLE_KEEP = int(os.environ.get("CONFIG_BUNDLE_KEEP", "2"))
+# A config change withdraws the bundle, the app serves the requests until it is
+# exported again: on start-up or, with this setting, from a background thread
+CONFIG_BUNDLE_EXPORT_ON_CHANGE = (
+    os.environ.get("CONFIG_BUNDLE_EXPORT_ON_CHANGE", "false").lower() == "true"
+)
+CONFIG_BUNDLE_EXPORT_DELAY_SECONDS = float(
+    os.environ.get("CONFIG_BUNDLE_EXPORT_DELAY_SECONDS", "5")
+)
 
 # By default, Django stores files locally, using the MEDIA_ROOT and MEDIA_URL settings.
 # (using the default the default FileSystemStorage)
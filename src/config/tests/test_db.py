@@ -0,0 +1,29 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+from unittest import mock
+
+from django.db import connection
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+
+class PoolStatsViewTests(SimpleTestCase):
+    def test_no_stats_without_pool(self) -> None:
+        response = self.client.get(reverse("check-db-pool"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {})
+
+    def test_pool_stats(self) -> None:
+        options = {**connection.settings_dict["OPTIONS"]}
+        options["pool"] = {"min_size": 1, "max_size": 3}
+        with mock.patch.dict(
+            connection.settings_dict, {"CONN_MAX_AGE": 0, "OPTIONS": options}
+        ):
+            try:
+                response = self.client.get(reverse("check-db-pool"))
+            finally:
+                connection.close_pool()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["default"]["pool_min"], 1)
+        self.assertEqual(response.json()["default"]["pool_max"], 3)
@@ -0,0 +1,160 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import responses
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from chains.tests.factories import ChainFactory
+from clients.safe_client_gateway import HookEvent, send_hook_event
+
+from .. import metrics
+
+
+class RenderTests(SimpleTestCase):
+    def setUp(self) -> None:
+        self.registry = metrics.Registry()
+
+    def _render(self, live_pids: set[int]) -> str:
+        # Dumps are written as JSON by the other processes
+        dump = json.loads(json.dumps(self.registry.dump()))
+        return metrics.render(metrics.merge({1: dump, 2: dump}, live_pids))
+
+    def test_processes_merged(self) -> None:
+        counter = self.registry.counter("requests_total", "Requests", ("route",))
+        counter.inc("a")
+        counter.inc("a", amount=2)
+        histogram = self.registry.histogram(
+            "duration_seconds", "Duration", ("route",), buckets=(0.1, 1.0)
+        )
+        histogram.observe(0.05, "a")
+        histogram.observe(5.0, "a")
+        gauge = self.registry.gauge("in_flight", "In flight")
+        gauge.inc()
+
+        self.assertEqual(
+            self._render(live_pids={2}),
+            "# HELP duration_seconds Duration\n"
+            "# TYPE duration_seconds histogram\n"
+            'duration_seconds_bucket{route="a",le="0.1"} 2\n'
+            'duration_seconds_bucket{route="a",le="1.0"} 2\n'
+            'duration_seconds_bucket{route="a",le="+Inf"} 4\n'
+            'duration_seconds_sum{route="a"} 10.1\n'
+            'duration_seconds_count{route="a"} 4\n'
+            "# HELP in_flight In flight\n"
+            "# TYPE in_flight gauge\n"
+            'in_flight{pid="2"} 1\n'
+            "# HELP requests_total Requests\n"
+            "# TYPE requests_total counter\n"
+            'requests_total{route="a"} 6\n',
+        )
+
+    def test_labels_escaped(self) -> None:
+        self.registry.counter("total", "Total", ("path",)).inc('a"\\\n')
+
+        self.assertIn('total{path="a\\"\\\\\\n"} 2', self._render(live_pids=set()))
+
+    def test_registered_once(self) -> None:
+        counter = self.registry.counter("total", "Total")
+
+        self.assertIs(self.registry.counter("total", "Total"), counter)
+        with self.assertRaises(ValueError):
+            self.registry.gauge("total", "Total")
+
+
+class MetricsViewTests(TestCase):
+    def test_request_metrics(self) -> None:
+        ChainFactory.create(id=1)
+        self.client.get(reverse("v1:chains:detail", args=[1]))
+
+        response = self.client.get(reverse("metrics"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        content = response.content.decode()
+        self.assertIn(
+            'http_request_duration_seconds_count{method="GET",'
+            'route="api/v1/chains/<int:pk>/",status="200"}',
+            content,
+        )
+        self.assertIn(
+            'db_queries_per_request_count{route="api/v1/chains/<int:pk>/"}', content
+        )
+        self.assertRegex(content, r'http_requests_in_flight\{pid="\d+"\} 1\n')
+
+    def test_cache_lookup_metrics(self) -> None:
+        for chain_id in range(1, 4):
+            ChainFactory.create(id=chain_id)
+        snapshot = metrics.registry.metrics["chains_snapshot_lookups_total"].values
+        compressed = metrics.registry.metrics[
+            "compressed_response_cache_lookups_total"
+        ].values
+        before = {
+            result: (snapshot.get((result,), 0), compressed.get(("gzip", result), 0))
+            for result in ("hit", "miss")
+        }
+
+        for _ in range(2):
+            self.client.get(
+                reverse("v1:chains:list"), headers={"accept-encoding": "gzip"}
+            )
+
+        for result in ("hit", "miss"):
+            self.assertEqual(snapshot[(result,)], before[result][0] + 1)
+            self.assertEqual(compressed[("gzip", result)], before[result][1] + 1)
+
+    @responses.activate
+    @override_settings(CGW_URL="http://127.0.0.1", CGW_AUTH_TOKEN="example-token")
+    def test_hook_metrics(self) -> None:
+        responses.add(responses.POST, "http://127.0.0.1/v1/hooks/events", status=500)
+        values = metrics.registry.metrics["cgw_hook_requests_total"].values
+        failures = values.get(("event", "failure"), 0)
+
+        send_hook_event(HookEvent(type=HookEvent.Type.CHAIN_UPDATE, chain_id=1))
+
+        self.assertEqual(values[("event", "failure")], failures + 1)
+
+
+class MetricsStoreTests(SimpleTestCase):
+    def setUp(self) -> None:
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory)
+        self.store = metrics.MetricsStore(directory, interval=5)
+        # An exited worker, above the maximum pid of Linux
+        (directory / "4194305.json").write_text(
+            json.dumps(
+                {
+                    "http_requests_in_flight": {
+                        "kind": "gauge",
+                        "help": "HTTP requests being handled by the worker",
+                        "labels": [],
+                        "values": [[[], 1]],
+                    },
+                    "cgw_hook_requests_total": {
+                        "kind": "counter",
+                        "help": "Requests to the CGW hooks endpoint",
+                        "labels": ["kind", "result"],
+                        "values": [[["batch", "success"], 1000]],
+                    },
+                }
+            )
+        )
+
+    def test_workers_merged(self) -> None:
+        with mock.patch.object(metrics, "get_store", return_value=self.store):
+            dump = metrics.collect()
+
+        self.assertEqual(
+            dict(dump["http_requests_in_flight"]["values"]).keys(),
+            {(str(os.getpid()),)},
+        )
+        self.assertGreaterEqual(
+            dict(dump["cgw_hook_requests_total"]["values"])[("batch", "success")],
+            1000,
+        )
+        self.assertTrue((self.store.directory / f"{os.getpid()}.json").exists())
@@ -0,0 +1,27 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.test import SimpleTestCase
+from django.utils.module_loading import import_string
+
+
+def get_response(request: HttpRequest) -> HttpResponse:
+    return HttpResponse()
+
+
+async def aget_response(request: HttpRequest) -> HttpResponse:
+    return HttpResponse()
+
+
+class SyncAndAsyncMiddlewareTests(SimpleTestCase):
+    def test_middleware_follow_the_handler(self) -> None:
+        for path in settings.MIDDLEWARE:
+            if not path.startswith("config."):
+                continue
+            middleware = import_string(path)
+            with self.subTest(middleware=path):
+                self.assertTrue(middleware.sync_capable)
+                self.assertTrue(middleware.async_capable)
+                self.assertFalse(iscoroutinefunction(middleware(get_response)))
+                self.assertTrue(iscoroutinefunction(middleware(aget_response)))
@@ -0,0 +1,103 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+from unittest import mock
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from chains.models import Chain
+from chains.tests.factories import ChainFactory
+from chains.views import ChainsListView
+from config.async_views import build_async_view
+
+from .. import queries
+
+
+class QueryShapeTests(SimpleTestCase):
+    def test_literals_replaced(self) -> None:
+        self.assertEqual(
+            queries.get_shape(
+                'SELECT "a"."id" FROM "a" WHERE "a"."name" = \'x\'\'y\' LIMIT 21'
+            ),
+            'SELECT "a"."id" FROM "a" WHERE "a"."name" = ? LIMIT ?',
+        )
+
+    def test_placeholder_lists_collapsed(self) -> None:
+        sql = 'SELECT "a1"."id" FROM "a1" WHERE "a1"."id" IN ({})'
+
+        self.assertEqual(
+            queries.get_shape(sql.format("%s, %s")),
+            'SELECT "a1"."id" FROM "a1" WHERE "a1"."id" IN (...)',
+        )
+        self.assertEqual(
+            queries.get_shape(sql.format("%s")),
+            queries.get_shape(sql.format("%s, %s")),
+        )
+        self.assertEqual(
+            queries.get_shape(sql.format("%s, %s, %s")),
+            queries.get_shape(sql.format("%s, %s")),
+        )
+
+
+class QueryInspectorTests(TestCase):
+    def test_repeated_queries_attributed(self) -> None:
+        chains = ChainFactory.create_batch(3)
+        inspector = queries.QueryInspector(repeat_threshold=3)
+
+        with connection.execute_wrapper(inspector):
+            Chain.objects.count()
+            for chain in chains:
+                Chain.objects.get(id=chain.id)
+
+        self.assertEqual(inspector.count, 4)
+        (pattern,) = inspector.repeated()
+        self.assertEqual(pattern.count, 3)
+        self.assertRegex(
+            pattern.origin or "",
+            r"^config/tests/test_queries\.py:\d+ in test_repeated_queries_attributed$",
+        )
+
+    def test_repeated_queries_tagged(self) -> None:
+        inspector = queries.QueryInspector(repeat_threshold=2)
+        with connection.execute_wrapper(inspector):
+            Chain.objects.exists()
+            Chain.objects.exists()
+
+        with mock.patch("apm.trace") as trace:
+            with self.assertLogs("config.queries", "WARNING"):
+                queries.check("api/v1/chains/", 2, inspector, enforce=True)
+
+        span = trace.return_value.__enter__.return_value
+        span.set_tag.assert_any_call("db.n_plus_one", True)
+        span.set_tag.assert_any_call("db.query_budget_exceeded", False)
+
+
+class QueryBudgetTests(TestCase):
+    def setUp(self) -> None:
+        ChainFactory.create_batch(2)
+
+    def test_budget_exceeded(self) -> None:
+        url = reverse("v1:chains:list") + "?ordering=name"
+
+        with mock.patch.object(ChainsListView, "query_budget", 1):
+            with self.assertRaisesMessage(
+                queries.QueryBudgetExceeded,
+                "queries on api/v1/chains/, over its budget of 1",
+            ):
+                self.client.get(url)
+
+    @override_settings(QUERY_BUDGET_ENFORCE=False)
+    def test_budget_exceeded_logged(self) -> None:
+        url = reverse("v1:chains:list") + "?ordering=name"
+
+        with mock.patch.object(ChainsListView, "query_budget", 1):
+            with self.assertLogs("config.queries", "WARNING") as logs:
+                response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("over its budget of 1", logs.output[0])
+
+    def test_budget_of_async_views(self) -> None:
+        view = build_async_view(ChainsListView, mock.AsyncMock())
+
+        self.assertEqual(queries.get_query_budget(view), ChainsListView.query_budget)
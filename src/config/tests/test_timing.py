@@ -0,0 +1,93 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+import re
+
+from asgiref.sync import sync_to_async
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from chains.tests.factories import ChainFactory
+
+from .. import timing
+
+
+class TimedTests(SimpleTestCase):
+    def test_outside_request(self) -> None:
+        with timing.timed(timing.RENDER):
+            pass
+
+    def test_nested_requests_shared(self) -> None:
+        with timing.request_timings() as timings:
+            with timing.request_timings() as nested:
+                with timing.timed(timing.RENDER):
+                    pass
+
+        self.assertIs(nested, timings)
+        self.assertIn(timing.RENDER, timings.durations)
+
+    def test_decorated_recursive_function(self) -> None:
+        @timing.timed(timing.SERIALIZE)
+        def depth(n: int) -> int:
+            return n and depth(n - 1) + 1
+
+        with timing.request_timings() as timings:
+            self.assertEqual(depth(3), 3)
+
+        self.assertGreater(timings.durations[timing.SERIALIZE], 0)
+
+    def test_server_timing(self) -> None:
+        timings = timing.RequestTimings()
+        timings.add(timing.DATABASE, 1_500_000)
+        timings.add(timing.DATABASE, 500_000)
+        timings.queries = 2
+        timings.add(timing.SERIALIZE, 250_000)
+
+        self.assertRegex(
+            timings.server_timing(),
+            r'^db;dur=2\.000;desc="2 queries", serialize;dur=0\.250, '
+            r"total;dur=\d+\.\d{3}$",
+        )
+
+
+class LoggingMiddlewareTimingTests(TestCase):
+    def test_no_header_by_default(self) -> None:
+        response = self.client.get(reverse("v1:chains:list"))
+
+        self.assertNotIn("Server-Timing", response)
+
+    @override_settings(SERVER_TIMING=True)
+    def test_server_timing(self) -> None:
+        ChainFactory.create_batch(2)
+
+        response = self.client.get(reverse("v1:chains:list") + "?ordering=name")
+
+        metrics = dict(
+            re.findall(r"([a-z]+);dur=([\d.]+)", response["Server-Timing"])
+        )
+        self.assertEqual(metrics.keys(), {"db", "serialize", "render", "total"})
+        self.assertGreater(float(metrics["db"]), 0)
+        self.assertGreater(float(metrics["serialize"]), float(metrics["render"]))
+
+    def test_log_record(self) -> None:
+        ChainFactory.create_batch(2)
+
+        with self.assertLogs("LoggingMiddleware") as logs:
+            self.client.get(reverse("v1:chains:list") + "?ordering=name")
+
+        (record,) = logs.records
+        self.assertRegex(
+            record.getMessage(), r"^MT::GET::api/v1/chains/::\d+\.\d{3}::200::"
+        )
+        self.assertGreater(record.db_queries, 0)  # type: ignore[attr-defined]
+        self.assertGreater(record.serialize_ms, 0)  # type: ignore[attr-defined]
+        self.assertGreater(record.render_ms, 0)  # type: ignore[attr-defined]
+
+    async def test_log_record_of_async_request(self) -> None:
+        await sync_to_async(ChainFactory.create_batch)(2)
+
+        with self.assertLogs("LoggingMiddleware") as logs:
+            await self.async_client.get(reverse("v1:chains:list") + "?ordering=name")
+
+        (record,) = logs.records
+        # The queries are made from a sync_to_async thread
+        self.assertGreater(record.db_queries, 0)  # type: ignore[attr-defined]
+        self.assertGreater(record.serialize_ms, 0)  # type: ignore[attr-defined]
@@ -0,0 +1,22 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+from unittest import mock
+
+from django.test import TestCase
+
+from ..versioning import bump_version, get_version
+
+
+class BumpVersionTests(TestCase):
+    def test_bumps_change_the_version(self) -> None:
+        version = get_version("test")
+
+        # Bumps of a same nanosecond, e.g. from several hosts
+        with mock.patch("time.time_ns", return_value=version):
+            with self.captureOnCommitCallbacks(execute=True):
+                bump_version("test")
+            bumped = get_version("test")
+            with self.captureOnCommitCallbacks(execute=True):
+                bump_version("test")
+
+        self.assertGreater(bumped, version)
+        self.assertGreater(get_version("test"), bumped)
@@ -0,0 +1,33 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+import importlib
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from django.test import override_settings
+from django.urls import clear_url_caches
+
+import about.urls
+import chains.urls
+import config.urls
+import safe_apps.urls
+
+# The URLconfs building their views with config.async_views.async_view, and
+# the root one including them
+URL_MODULES = (about.urls, chains.urls, safe_apps.urls, config.urls)
+
+
+def _reload_urls() -> None:
+    for module in URL_MODULES:
+        importlib.reload(module)
+    clear_url_caches()
+
+
+@contextmanager
+def async_views() -> Iterator[None]:
+    """Routes the requests to the async views, as ASYNC_VIEWS does on start-up."""
+    try:
+        with override_settings(ASYNC_VIEWS=True):
+            _reload_urls()
+            yield
+    finally:
+        _reload_urls()
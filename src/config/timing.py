@@ -0,0 +1,134 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+"""
+Per-request breakdown of the time spent in the database, serializing and
+rendering, measured with the monotonic nanosecond clock.
+
+The middleware measure every request with ``request_timings``, which also
+times its database queries. The code serializing and rendering the responses
+adds its durations with ``timed``. The durations may overlap, e.g. the
+database time includes the queries made while serializing.
+"""
+
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import ParamSpec, TypeVar
+
+from . import db
+
+DATABASE = "db"
+SERIALIZE = "serialize"
+RENDER = "render"
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+class RequestTimings:
+    def __init__(self) -> None:
+        self.start = time.perf_counter_ns()
+        # Nanoseconds by name
+        self.durations: dict[str, int] = {}
+        self.queries = 0
+
+    def add(self, name: str, duration: int) -> None:
+        self.durations[name] = self.durations.get(name, 0) + duration
+
+    def elapsed(self) -> int:
+        """Nanoseconds since the start of the request."""
+        return time.perf_counter_ns() - self.start
+
+    def __call__(
+        self,
+        execute: Callable[..., object],
+        sql: str,
+        params: object,
+        many: bool,
+        context: dict[str, object],
+    ) -> object:
+        # Counts and times the queries (see config.db.execute_wrapper)
+        start = time.perf_counter_ns()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.add(DATABASE, time.perf_counter_ns() - start)
+            self.queries += 1
+
+    def as_log_fields(self) -> dict[str, float | int]:
+        """Milliseconds by name, for the structured log records."""
+        fields: dict[str, float | int] = {"duration_ms": self.elapsed() / 1e6}
+        for name in (DATABASE, SERIALIZE, RENDER):
+            fields[f"{name}_ms"] = self.durations.get(name, 0) / 1e6
+        fields["db_queries"] = self.queries
+        return fields
+
+    def server_timing(self) -> str:
+        """The breakdown as a Server-Timing header value (milliseconds)."""
+        database = self.durations.get(DATABASE, 0) / 1e6
+        metrics = [f'{DATABASE};dur={database:.3f};desc="{self.queries} queries"']
+        metrics.extend(
+            f"{name};dur={duration / 1e6:.3f}"
+            for name, duration in self.durations.items()
+            if name != DATABASE
+        )
+        metrics.append(f"total;dur={self.elapsed() / 1e6:.3f}")
+        return ", ".join(metrics)
+
+
+_current: ContextVar[RequestTimings | None] = ContextVar(
+    "request_timings", default=None
+)
+
+
+@contextmanager
+def request_timings() -> Iterator[RequestTimings]:
+    """
+    Measures the current request, timing its database queries.
+
+    Nested blocks share the timings of the outermost one.
+    """
+    timings = _current.get()
+    if timings is not None:
+        yield timings
+        return
+    timings = RequestTimings()
+    token = _current.set(timings)
+    try:
+        with db.execute_wrapper(timings):
+            yield timings
+    finally:
+        _current.reset(token)
+
+
+class Timed:
+    """
+    Adds the duration of the block, or of each call of the decorated
+    function, to the ``name`` timing of the current request, if any.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        # (timings, start) by nesting level, e.g. of recursive calls
+        self._starts: list[tuple[RequestTimings | None, int]] = []
+
+    def __enter__(self) -> None:
+        self._starts.append((_current.get(), time.perf_counter_ns()))
+
+    def __exit__(self, *exc_info: object) -> None:
+        timings, start = self._starts.pop()
+        if timings is not None:
+            timings.add(self.name, time.perf_counter_ns() - start)
+
+    def __call__(self, func: Callable[P, R]) -> Callable[P, R]:
+        @wraps(func)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            with self:
+                return func(*args, **kwargs)
+
+        return wrapper
+
+
+def timed(name: str) -> Timed:
+    return Timed(name)
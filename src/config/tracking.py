@@ -0,0 +1,76 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+"""
+Changes of the fields of model instances.
+
+The signal receivers skipping the saves that change nothing (see
+chains.signals and safe_apps.signals) compare the fields of the saved
+instance with the values it was loaded or last saved with, instead of
+querying the previous row and serializing both versions.
+"""
+
+from collections.abc import Collection
+from typing import Any, Self
+
+from django.db import models
+from django.db.models.base import DEFERRED
+
+
+class TrackedFieldsMixin(models.Model):
+    """
+    Keeps the values of the concrete fields of an instance as it was loaded
+    or last saved.
+
+    A save rolled back afterwards still updates them, like it updates the
+    instance itself.
+    """
+
+    _tracked_values: dict[str, Any] | None = None
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(
+        cls,
+        db: str | None,
+        field_names: Collection[str],
+        values: Collection[Any],
+    ) -> Self:
+        instance = super().from_db(db, field_names, values)
+        instance._tracked_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        super().save(*args, **kwargs)
+        deferred = self.get_deferred_fields()
+        self._tracked_values = {
+            field.attname: field.get_prep_value(getattr(self, field.attname))
+            for field in self._meta.concrete_fields
+            if field.attname not in deferred
+        }
+
+    def get_tracked_value(self, attname: str) -> Any:
+        """The value of ``attname`` as loaded or last saved."""
+        if self._tracked_values is None:
+            raise ValueError(f"{self!r} was neither loaded nor saved")
+        return self._tracked_values.get(attname, DEFERRED)
+
+    def get_changed_fields(self) -> set[str] | None:
+        """
+        Returns the attnames of the concrete fields changed since the instance
+        was loaded or last saved, or None if it was neither.
+        """
+        if self._tracked_values is None:
+            return None
+        deferred = self.get_deferred_fields()
+        changed = set()
+        for field in self._meta.concrete_fields:
+            if field.attname in deferred:
+                continue
+            tracked = self._tracked_values.get(field.attname, DEFERRED)
+            # Deferred when loaded, set since then
+            if tracked is DEFERRED or field.get_prep_value(
+                tracked
+            ) != field.get_prep_value(getattr(self, field.attname)):
+                changed.add(field.attname)
+        return changed
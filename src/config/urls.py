@@ -7,6 +7,8 @@ from drf_yasg.views import get_schema_view
 from rest_framework import permissions
 
 from config import settings
+from config.db import pool_stats_view
+from config.metrics import metrics_view
 
 schema_view = get_schema_view(
     validators=["flex", "ssv"],
@@ -29,6 +31,8 @@ urlpatterns = [
     path("api/v2/", include((urlpatterns_v2, "v2"), namespace="v2")),
     path("admin/", admin.site.urls),
     path("check/", lambda request: HttpResponse("Ok"), name="check"),
+    path("check/db-pool/", pool_stats_view, name="check-db-pool"),
+    path("metrics", metrics_view, name="metrics"),
     re_path(
         r"^swagger(?P<format>\.json|\.yaml)$",
         schema_view.without_ui(cache_timeout=0),
@@ -0,0 +1,120 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+"""
+Config versions used to invalidate the in-process read caches.
+
+Every namespace (e.g. ``chains``) owns a version stored in the ``default``
+cache. Signal receivers bump it when the underlying data changes and the
+per-process snapshots compare the version they were built for against the
+current one to decide whether they need to be rebuilt. They are also rebuilt
+once older than SNAPSHOT_MAX_AGE_SECONDS, which bounds their staleness when a
+bump is missed, e.g. by a process that does not share the ``default`` cache.
+"""
+
+import hashlib
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.dispatch import Signal
+from django.http import HttpRequest
+
+VERSIONS_CACHE_ALIAS = "default"
+
+# Sent with the bumped ``namespace`` once the transaction of the change commits
+version_bumped = Signal()
+
+
+def _cache_key(namespace: str) -> str:
+    return f"config-version:{namespace}"
+
+
+def _seed(namespace: str) -> None:
+    # Seeding with the current time keeps the counter monotonic even if the
+    # key is evicted or the cache is flushed.
+    caches[VERSIONS_CACHE_ALIAS].add(_cache_key(namespace), time.time_ns(), None)
+
+
+def get_version(namespace: str) -> int:
+    cache = caches[VERSIONS_CACHE_ALIAS]
+    version: int | None = cache.get(_cache_key(namespace))
+    if version is None:
+        _seed(namespace)
+        version = cache.get(_cache_key(namespace))
+    return version if version is not None else time.time_ns()
+
+
+async def aget_version(namespace: str) -> int:
+    """Async get_version, the counter is only seeded (synchronously) if missing."""
+    version: int | None = await caches[VERSIONS_CACHE_ALIAS].aget(
+        _cache_key(namespace)
+    )
+    if version is None:
+        return await sync_to_async(get_version)(namespace)
+    return version
+
+
+def has_expired(built_at: float) -> bool:
+    """Whether a snapshot built at ``built_at`` (time.monotonic) is too old."""
+    return time.monotonic() - built_at >= settings.SNAPSHOT_MAX_AGE_SECONDS
+
+
+def _bump(namespace: str) -> None:
+    cache = caches[VERSIONS_CACHE_ALIAS]
+    key = _cache_key(namespace)
+    current: int = cache.get(key, 0)
+    # Not every backend increments atomically (e.g. FileBasedCache), with a
+    # new timestamp concurrent bumps still set different versions
+    cache.set(key, max(time.time_ns(), current + 1), None)
+
+
+def bump_version(namespace: str) -> None:
+    """
+    Invalidate ``namespace`` now and again once the current transaction commits.
+
+    The second bump discards any snapshot that another request could have
+    built from the not yet committed data.
+    """
+    _bump(namespace)
+
+    def on_commit() -> None:
+        _bump(namespace)
+        version_bumped.send(sender=None, namespace=namespace)
+
+    transaction.on_commit(on_commit)
+
+
+def _etag(versions: Iterable[int], request: HttpRequest) -> str:
+    joined = ":".join(str(version) for version in versions)
+    return hashlib.sha1(
+        f"{joined}:{request.build_absolute_uri()}".encode()
+    ).hexdigest()
+
+
+def version_etag(*namespaces: str) -> Callable[..., str]:
+    """
+    Returns an ``etag_func`` for django.views.decorators.http.condition.
+
+    The ETag only depends on the versions of ``namespaces`` and on the absolute
+    request URI, so a matching ``If-None-Match`` is answered with a 304 without
+    touching the database or the serializers.
+    """
+
+    def etag_func(request: HttpRequest, *args: Any, **kwargs: Any) -> str:
+        return _etag([get_version(namespace) for namespace in namespaces], request)
+
+    return etag_func
+
+
+def aversion_etag(*namespaces: str) -> Callable[..., Awaitable[str]]:
+    """Async version_etag, for config.async_views.condition."""
+
+    async def etag_func(request: HttpRequest, *args: Any, **kwargs: Any) -> str:
+        return _etag(
+            [await aget_version(namespace) for namespace in namespaces], request
+        )
+
+    return etag_func
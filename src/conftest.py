@@ -2,6 +2,7 @@ import shutil
 import tempfile
 
 import pytest
+from django.core.cache import caches
 
 
 @pytest.fixture(autouse=True)
@@ -18,3 +19,31 @@ def use_tmp_media_root(settings):
 
     # After running each test remove the tmp directory
     shutil.rmtree(settings.MEDIA_ROOT)
+
+
+@pytest.fixture(autouse=True)
+def enforce_query_budgets(settings):
+    settings.QUERY_BUDGET_ENFORCE = True
+
+
+@pytest.fixture(autouse=True)
+def use_local_memory_cache(settings):
+    # Local stand-in for the shared cache backend
+    settings.CACHES = {
+        alias: {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": alias,
+        }
+        for alias in settings.CACHES
+    }
+    # Database changes are rolled back between tests without firing any signal
+    # so config versions and in-process snapshots need to be reset explicitly
+    from chains import feature_matrix, gas_tokens, snapshot
+    from safe_apps import catalog
+
+    for cache in caches.all():
+        cache.clear()
+    snapshot.clear()
+    feature_matrix.clear()
+    gas_tokens.clear()
+    catalog.clear()
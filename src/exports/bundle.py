@@ -0,0 +1,212 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+"""
+Static config bundle: the public API responses written as files.
+
+Every exported response is stored at ``<path>index<?query>.json``, next to
+its gzip-compressed copy, in a new version directory. Once complete, the
+``current`` symlink is swapped to it atomically so nginx, which looks the
+files up under ``current`` (see nginx/templates/nginx.conf.template), never
+serves a partial bundle.
+
+A config change withdraws the bundle: ``current`` is removed, so nginx proxies
+every request to the app until an export rendered after the change completes.
+"""
+
+import fcntl
+import gzip
+import json
+import logging
+import os
+import shutil
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.db.models import F, Func, PositiveBigIntegerField
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import Resolver404, resolve, reverse
+
+from chains.models import Chain, Service
+from safe_apps.models import SafeApp
+
+logger = logging.getLogger(__name__)
+
+CURRENT = "current"
+VERSIONS = "versions"
+# Changed by every withdrawal, an export started before it is stale
+WITHDRAWN = ".withdrawn"
+
+
+def get_paths() -> Iterator[str]:
+    """
+    Yields the paths (with their query string) of the exported responses.
+
+    The following pages of paginated lists are not listed, they are exported
+    by following the ``next`` links.
+    """
+    chains = list(
+        Chain.objects.filter(hidden=False)
+        .order_by("id")
+        .values_list("id", "short_name")
+    )
+    yield reverse("v1:chains:list")
+    for chain_id, short_name in chains:
+        yield reverse("v1:chains:detail", args=[chain_id])
+        yield reverse("v1:chains:detail_by_short_name", args=[short_name])
+        yield reverse("v1:chains:gas-tokens-list", args=[chain_id])
+
+    for service_key in Service.objects.order_by("key").values_list("key", flat=True):
+        yield reverse("v2:chains:list", args=[service_key])
+        for chain_id, _ in chains:
+            yield reverse("v2:chains:detail", args=[service_key, chain_id])
+
+    safe_apps_url = reverse("v1:safe-apps:list")
+    yield safe_apps_url
+    yield f"{safe_apps_url}?onlyListed=true"
+    safe_apps_chain_ids = (
+        SafeApp.objects.annotate(
+            chain_id=Func(
+                F("chain_ids"),
+                function="unnest",
+                output_field=PositiveBigIntegerField(),
+            )
+        )
+        .values_list("chain_id", flat=True)
+        .distinct()
+        .order_by("chain_id")
+    )
+    for chain_id in safe_apps_chain_ids:
+        yield f"{safe_apps_url}?chainId={chain_id}"
+        yield f"{safe_apps_url}?chainId={chain_id}&onlyListed=true"
+
+
+def render(path: str, base_url: str) -> HttpResponse:
+    """Renders the response of a GET request to ``base_url`` + ``path``."""
+    scheme, host, _, _, _ = urlsplit(base_url)
+    request = RequestFactory().get(
+        path,
+        secure=scheme == "https",
+        headers={"host": host, "accept": "application/json"},
+    )
+    match = resolve(request.path_info)
+    view = match.func
+    # The views are async with ASYNC_VIEWS (see config.async_views)
+    if iscoroutinefunction(view):
+        view = async_to_sync(view)
+    response: HttpResponse = view(request, *match.args, **match.kwargs)
+    if hasattr(response, "render"):
+        response.render()
+    return response
+
+
+def get_file(directory: Path, path: str) -> Path | None:
+    """
+    Returns the file of the response of ``path`` in ``directory``, or None if
+    it cannot be stored as a file.
+    """
+    path, _, query = path.partition("?")
+    # nginx looks the files up by the decoded path and the raw query string
+    segments = unquote(path).strip("/").split("/")
+    if not path.endswith("/") or "/" in query or {".", ".."} & set(segments):
+        return None
+    return directory.joinpath(*segments, f"index{'?' if query else ''}{query}.json")
+
+
+def get_next_path(response: HttpResponse) -> str | None:
+    """Returns the path of the next page of a paginated list response."""
+    data = json.loads(response.content)
+    next_link = data.get("next") if isinstance(data, dict) else None
+    if not next_link:
+        return None
+    next_url = urlsplit(next_link)
+    return f"{next_url.path}?{next_url.query}"
+
+
+def write(file: Path, content: bytes) -> None:
+    file.parent.mkdir(parents=True, exist_ok=True)
+    file.write_bytes(content)
+    # nginx gzip_static serves the .gz file to the clients accepting gzip
+    file.with_name(file.name + ".gz").write_bytes(
+        gzip.compress(content, compresslevel=9, mtime=0)
+    )
+
+
+def _get_withdrawal(root: Path) -> str:
+    try:
+        return (root / WITHDRAWN).read_text()
+    except FileNotFoundError:
+        return ""
+
+
+def withdraw(root: Path) -> None:
+    """
+    Stops serving the bundle under ``root`` until the next export completes,
+    as it no longer matches the config.
+    """
+    root.mkdir(parents=True, exist_ok=True)
+    (root / WITHDRAWN).write_text(str(time.time_ns()))
+    (root / CURRENT).unlink(missing_ok=True)
+
+
+def export_bundle(root: Path, base_url: str, keep: int = 2) -> Path:
+    """
+    Writes the bundle into a new version directory under ``root`` and points
+    ``root/current`` to it.
+
+    Exports are serialized with a file lock, so the last one to complete was
+    rendered from the latest data. An export the bundle was withdrawn during
+    is not served (see withdraw). Only the ``keep`` most recent versions are
+    kept.
+
+    Returns:
+        The new version directory.
+    """
+    root.mkdir(parents=True, exist_ok=True)
+    with open(root / ".lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        withdrawal = _get_withdrawal(root)
+        directory = root / VERSIONS / str(time.time_ns())
+        directory.mkdir(parents=True)
+        exported = 0
+
+        pending = list(dict.fromkeys(get_paths()))
+        seen = set(pending)
+        while pending:
+            path = pending.pop()
+            file = get_file(directory, path)
+            if file is None:
+                continue
+            try:
+                response = render(path, base_url)
+            except Resolver404:
+                continue
+            if response.status_code != 200:
+                continue
+            write(file, response.content)
+            exported += 1
+
+            next_path = get_next_path(response)
+            if next_path is not None and next_path not in seen:
+                seen.add(next_path)
+                pending.append(next_path)
+
+        current = root / CURRENT
+        link = root / f"{CURRENT}.{os.getpid()}"
+        link.unlink(missing_ok=True)
+        link.symlink_to(directory.relative_to(root))
+        os.replace(link, current)
+        # Checked once served, so a withdrawal racing with the replacement
+        # either removes it or is seen here
+        if _get_withdrawal(root) != withdrawal:
+            current.unlink(missing_ok=True)
+            logger.info("Config changed during the export to %s", directory)
+        else:
+            logger.info("Exported %d responses to %s", exported, directory)
+
+        versions = sorted((root / VERSIONS).iterdir(), key=lambda path: int(path.name))
+        for version in versions[: -max(keep, 1)]:
+            shutil.rmtree(version)
+        return directory
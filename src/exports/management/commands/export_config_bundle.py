@@ -0,0 +1,38 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from exports.bundle import export_bundle
+
+
+class Command(BaseCommand):
+    help = "Writes the public API responses as static files to be served by nginx"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--root",
+            default=settings.CONFIG_BUNDLE_ROOT,
+            help="Directory of the bundle (defaults to CONFIG_BUNDLE_ROOT)",
+        )
+        parser.add_argument(
+            "--base-url",
+            default=settings.CONFIG_BUNDLE_BASE_URL,
+            help="Scheme and host of the absolute URLs of the responses",
+        )
+        parser.add_argument(
+            "--keep",
+            type=int,
+            default=settings.CONFIG_BUNDLE_KEEP,
+            help="Number of bundle versions kept on disk",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if not options["root"]:
+            raise CommandError("CONFIG_BUNDLE_ROOT is not set")
+        directory = export_bundle(
+            Path(options["root"]), options["base_url"], keep=options["keep"]
+        )
+        self.stdout.write(f"Exported the config bundle to {directory}")
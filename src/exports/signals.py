@@ -0,0 +1,55 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+import logging
+from functools import cache
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.db import connections
+from django.dispatch import receiver
+
+from clients.hook_dispatcher import HookEventDispatcher
+from config.versioning import version_bumped
+
+from .bundle import export_bundle, withdraw
+
+logger = logging.getLogger(__name__)
+
+
+def _export(namespaces: list[str]) -> None:
+    try:
+        export_bundle(
+            Path(settings.CONFIG_BUNDLE_ROOT),
+            settings.CONFIG_BUNDLE_BASE_URL,
+            keep=settings.CONFIG_BUNDLE_KEEP,
+        )
+    finally:
+        # Connections opened by the exporter thread are not closed by Django
+        connections.close_all()
+
+
+@cache
+def get_exporter() -> HookEventDispatcher[str]:
+    # A single pending export at a time: the changes made while it waits are
+    # coalesced into it
+    return HookEventDispatcher(
+        send=_export,
+        key=lambda namespace: "bundle",
+        max_queue_size=1,
+        workers=1,
+        coalesce_window=settings.CONFIG_BUNDLE_EXPORT_DELAY_SECONDS,
+    )
+
+
+@receiver(version_bumped)
+def on_version_bumped(sender: Any, namespace: str, **kwargs: Any) -> None:
+    if not settings.CONFIG_BUNDLE_ROOT:
+        return
+    # The app serves the requests until the bundle is exported again
+    try:
+        withdraw(Path(settings.CONFIG_BUNDLE_ROOT))
+    except OSError:
+        logger.exception("Could not withdraw the config bundle")
+    if settings.CONFIG_BUNDLE_EXPORT_ON_CHANGE:
+        logger.info("Config %s changed. Exporting the config bundle", namespace)
+        get_exporter().enqueue(namespace)
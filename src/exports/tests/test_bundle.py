@@ -0,0 +1,193 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+import gzip
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.http import HttpResponse
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from chains.tests.factories import ChainFactory, GasTokenFactory, ServiceFactory
+from config.tests.utils import async_views
+from safe_apps.tests.factories import SafeAppFactory
+
+from .. import bundle
+from ..bundle import CURRENT, VERSIONS, export_bundle, get_file, withdraw
+from ..signals import get_exporter
+
+BASE_URL = "http://testserver"
+
+
+class BundleTestCase(TestCase):
+    def setUp(self) -> None:
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def _read(self, path: str) -> bytes:
+        file = get_file(self.root / CURRENT, path)
+        assert file is not None
+        return file.read_bytes()
+
+    def test_exported_responses_match_the_api(self) -> None:
+        chain = ChainFactory.create(id=1, short_name="eth")
+        GasTokenFactory.create(chains=[chain])
+        ServiceFactory.create(key="cgw")
+        SafeAppFactory.create(chain_ids=[1])
+        paths = [
+            reverse("v1:chains:list"),
+            reverse("v1:chains:detail", args=[1]),
+            reverse("v1:chains:detail_by_short_name", args=["eth"]),
+            reverse("v1:chains:gas-tokens-list", args=[1]),
+            reverse("v2:chains:list", args=["cgw"]),
+            reverse("v2:chains:detail", args=["cgw", 1]),
+            reverse("v1:safe-apps:list"),
+            reverse("v1:safe-apps:list") + "?chainId=1",
+            reverse("v1:safe-apps:list") + "?chainId=1&onlyListed=true",
+        ]
+
+        export_bundle(self.root, BASE_URL)
+
+        for path in paths:
+            with self.subTest(path=path):
+                content = self.client.get(path).content
+                self.assertEqual(self._read(path), content)
+                file = get_file(self.root / CURRENT, path)
+                assert file is not None
+                self.assertEqual(
+                    gzip.decompress(file.with_name(file.name + ".gz").read_bytes()),
+                    content,
+                )
+
+    def test_async_views_are_exported(self) -> None:
+        ChainFactory.create(id=1, short_name="eth")
+        SafeAppFactory.create(chain_ids=[1])
+        paths = [
+            reverse("v1:chains:list"),
+            reverse("v1:chains:detail", args=[1]),
+            reverse("v1:safe-apps:list") + "?chainId=1",
+        ]
+
+        with async_views():
+            export_bundle(self.root, BASE_URL)
+
+        for path in paths:
+            with self.subTest(path=path):
+                self.assertEqual(self._read(path), self.client.get(path).content)
+
+    def test_following_pages_are_exported(self) -> None:
+        for chain_id in range(1, 42):
+            ChainFactory.create(id=chain_id)
+        path = reverse("v1:chains:list") + "?limit=40&offset=40"
+
+        export_bundle(self.root, BASE_URL)
+
+        self.assertEqual(self._read(path), self.client.get(path).content)
+
+    def test_hidden_chains_are_not_exported(self) -> None:
+        ChainFactory.create(id=1, hidden=True)
+
+        export_bundle(self.root, BASE_URL)
+
+        file = get_file(self.root / CURRENT, reverse("v1:chains:detail", args=[1]))
+        assert file is not None
+        self.assertFalse(file.exists())
+
+    def test_current_points_to_the_latest_version(self) -> None:
+        ChainFactory.create(id=1, name="Before")
+        export_bundle(self.root, BASE_URL)
+        ChainFactory.create(id=2)
+
+        directories = [export_bundle(self.root, BASE_URL, keep=2) for _ in range(2)]
+
+        self.assertEqual((self.root / CURRENT).resolve(), directories[-1].resolve())
+        self.assertEqual(
+            sorted((self.root / VERSIONS).iterdir()),
+            sorted(directories),
+        )
+        self.assertIn(b'"chainId":"2"', self._read(reverse("v1:chains:list")))
+
+    def test_withdrawn_bundle_is_not_served(self) -> None:
+        ChainFactory.create(id=1)
+        export_bundle(self.root, BASE_URL)
+
+        withdraw(self.root)
+
+        self.assertFalse((self.root / CURRENT).exists())
+
+    def test_bundle_withdrawn_during_the_export_is_not_served(self) -> None:
+        ChainFactory.create(id=1)
+        render = bundle.render
+
+        def render_and_withdraw(path: str, base_url: str) -> HttpResponse:
+            withdraw(self.root)
+            return render(path, base_url)
+
+        with mock.patch.object(bundle, "render", side_effect=render_and_withdraw):
+            export_bundle(self.root, BASE_URL)
+
+        self.assertFalse((self.root / CURRENT).exists())
+
+        export_bundle(self.root, BASE_URL)
+
+        self.assertTrue((self.root / CURRENT).exists())
+
+    def test_unsafe_paths_are_not_exported(self) -> None:
+        self.assertIsNone(get_file(self.root, "/api/v1/chains/../"))
+        self.assertIsNone(get_file(self.root, "/api/v1/safe-apps/?url=https://a/b"))
+        self.assertEqual(
+            get_file(self.root, "/api/v1/chains/my%20chain/"),
+            self.root / "api" / "v1" / "chains" / "my chain" / "index.json",
+        )
+
+    def test_command_requires_root(self) -> None:
+        with self.assertRaisesMessage(CommandError, "CONFIG_BUNDLE_ROOT is not set"):
+            call_command("export_config_bundle")
+
+    def test_command(self) -> None:
+        ChainFactory.create(id=1)
+
+        call_command("export_config_bundle", "--root", str(self.root))
+
+        file = get_file(self.root / CURRENT, reverse("v1:chains:list"))
+        assert file is not None
+        self.assertTrue(file.exists())
+
+
+class BundleExportOnChangeTestCase(TransactionTestCase):
+    def setUp(self) -> None:
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        get_exporter.cache_clear()
+        self.addCleanup(get_exporter.cache_clear)
+
+    def test_bundle_exported_on_change(self) -> None:
+        with override_settings(
+            CONFIG_BUNDLE_ROOT=str(self.root),
+            CONFIG_BUNDLE_BASE_URL=BASE_URL,
+            CONFIG_BUNDLE_EXPORT_ON_CHANGE=True,
+            CONFIG_BUNDLE_EXPORT_DELAY_SECONDS=0,
+        ):
+            ChainFactory.create(id=1)
+            get_exporter().flush()
+
+        file = get_file(self.root / CURRENT, reverse("v1:chains:detail", args=[1]))
+        assert file is not None
+        self.assertTrue(file.exists())
+
+    def test_bundle_withdrawn_on_change(self) -> None:
+        export_bundle(self.root, BASE_URL)
+
+        with override_settings(CONFIG_BUNDLE_ROOT=str(self.root)):
+            ChainFactory.create(id=1)
+
+        self.assertFalse((self.root / CURRENT).exists())
+
+    def test_bundle_not_exported_by_default(self) -> None:
+        with override_settings(CONFIG_BUNDLE_ROOT=str(self.root)):
+            ChainFactory.create(id=1)
+            get_exporter().flush()
+
+        self.assertFalse((self.root / CURRENT).exists())
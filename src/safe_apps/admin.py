@@ -2,7 +2,7 @@ from typing import Any, List
 
 from django import forms
 from django.contrib import admin
-from django.db.models import Model, QuerySet
+from django.db.models import F, Func, Model, PositiveBigIntegerField, QuerySet
 
 from chains.models import Chain
 
@@ -32,11 +32,21 @@ class ChainIdFilter(admin.SimpleListFilter):
     parameter_name = "chain_ids"
 
     def lookups(self, request: Any, model_admin: Any) -> Any:
-        values = SafeApp.objects.values_list("chain_ids", flat=True)
+        # SELECT DISTINCT unnest(chain_ids): the database returns each chain once
+        chain_ids = (
+            SafeApp.objects.annotate(
+                chain_id=Func(
+                    F("chain_ids"),
+                    function="unnest",
+                    output_field=PositiveBigIntegerField(),
+                )
+            )
+            .values_list("chain_id", flat=True)
+            .distinct()
+            .order_by("chain_id")
+        )
         # lookups requires a tuple to be returned – (value, verbose value)
-        chains = [(chain, chain) for chains in values for chain in chains]
-        chains = sorted(set(chains))
-        return chains
+        return [(chain_id, chain_id) for chain_id in chain_ids]
 
     def queryset(self, request: Any, queryset: QuerySet[SafeApp]) -> QuerySet[SafeApp]:
         if value := self.value():
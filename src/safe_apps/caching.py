@@ -0,0 +1,63 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+"""
+Versions of the Safe Apps list responses.
+
+Responses are tagged with the chain they are filtered by (or with all the
+chains when not filtered). Every tag has its own config version, which is part
+of the ETag, so invalidating a set of chains only changes the ETags of the
+responses that depend on them. The responses themselves are rendered from the
+catalog (see safe_apps.catalog).
+"""
+
+import hashlib
+from collections.abc import Iterable
+from typing import Any
+
+from django.http import HttpRequest
+
+from config import metrics
+from config.versioning import aget_version, bump_version, get_version
+
+SAFE_APPS_VERSION_NAMESPACE = "safe-apps"
+
+INVALIDATIONS = metrics.registry.counter(
+    "safe_apps_invalidations_total",
+    "Invalidations of the Safe Apps responses by namespace",
+    ("namespace",),
+)
+
+
+def _chain_namespace(chain_id: int) -> str:
+    return f"{SAFE_APPS_VERSION_NAMESPACE}:chain:{chain_id}"
+
+
+def get_namespace(request: HttpRequest) -> str:
+    """Returns the version namespace the response for ``request`` depends on."""
+    chain_id = request.GET.get("chainId")
+    if chain_id is not None and chain_id.isdigit():
+        return _chain_namespace(int(chain_id))
+    return SAFE_APPS_VERSION_NAMESPACE
+
+
+def _request_hash(request: HttpRequest, version: int) -> str:
+    return hashlib.sha1(
+        f"{version}:{request.build_absolute_uri()}".encode()
+    ).hexdigest()
+
+
+def etag(request: HttpRequest, *args: Any, **kwargs: Any) -> str:
+    return _request_hash(request, get_version(get_namespace(request)))
+
+
+async def aetag(request: HttpRequest, *args: Any, **kwargs: Any) -> str:
+    """Async etag, for config.async_views.condition."""
+    return _request_hash(request, await aget_version(get_namespace(request)))
+
+
+def invalidate(chain_ids: Iterable[int]) -> None:
+    """Invalidates the responses including Safe Apps of any of ``chain_ids``."""
+    bump_version(SAFE_APPS_VERSION_NAMESPACE)
+    INVALIDATIONS.inc("all")
+    for chain_id in set(chain_ids):
+        bump_version(_chain_namespace(chain_id))
+        INVALIDATIONS.inc("chain")
@@ -0,0 +1,161 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+import logging
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+
+from asgiref.sync import sync_to_async
+from django.db.models import Prefetch
+from rest_framework.request import Request
+
+from config import metrics, timing
+from config.rendering import json_array, render_json
+from config.versioning import aget_version, get_version, has_expired
+
+from .caching import SAFE_APPS_VERSION_NAMESPACE
+from .models import Feature, SafeApp, SocialProfile, Tag
+from .serializers import SafeAppsResponseSerializer
+
+logger = logging.getLogger(__name__)
+
+CATALOG_LOOKUPS = metrics.registry.counter(
+    "safe_apps_catalog_lookups_total",
+    "Lookups of the Safe Apps catalog by result, a miss builds it",
+    ("result",),
+)
+
+
+def _indexes(bits: int) -> Iterator[int]:
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+
+@dataclass(frozen=True)
+class SafeAppsCatalog:
+    """
+    Every Safe App rendered as a JSON fragment, plus bitsets of the apps
+    matching each value of the list filters.
+
+    Bit ``i`` of a bitset is set if ``fragments[i]`` matches the filter, so
+    any combination of filters is answered by intersecting the bitsets.
+    """
+
+    version: int
+    fragments: list[bytes]
+    all: int
+    listed: int
+    unrestricted: int
+    by_chain: dict[int, int]
+    by_client: dict[str, int]
+    by_url: dict[str, int]
+    built_at: float = field(default_factory=time.monotonic)
+
+    def is_current(self, version: int) -> bool:
+        return self.version == version and not has_expired(self.built_at)
+
+    @timing.timed(timing.RENDER)
+    def render(
+        self,
+        only_listed: bool = False,
+        chain_id: int | None = None,
+        client_url: str | None = None,
+        url: str | None = None,
+    ) -> bytes:
+        """Returns the JSON array of the Safe Apps matching every filter."""
+        bits = self.all
+        if only_listed:
+            bits &= self.listed
+        if chain_id is not None:
+            bits &= self.by_chain.get(chain_id, 0)
+        if client_url is not None:
+            bits &= self.unrestricted | self.by_client.get(client_url, 0)
+        if url is not None:
+            bits &= self.by_url.get(url, 0)
+        return json_array(self.fragments[i] for i in _indexes(bits))
+
+
+_catalogs: dict[str, SafeAppsCatalog] = {}
+_lock = threading.Lock()
+
+
+@timing.timed(timing.SERIALIZE)
+def build_catalog(request: Request, version: int) -> SafeAppsCatalog:
+    safe_apps = (
+        SafeApp.objects.order_by("app_id")
+        .select_related("provider")
+        .prefetch_related(
+            "exclusive_clients",
+            Prefetch("tag_set", queryset=Tag.objects.order_by("name")),
+            Prefetch("feature_set", queryset=Feature.objects.order_by("key")),
+            Prefetch(
+                "socialprofile_set", queryset=SocialProfile.objects.order_by("platform")
+            ),
+        )
+    )
+    fragments: list[bytes] = []
+    listed = unrestricted = 0
+    by_chain: dict[int, int] = defaultdict(int)
+    by_client: dict[str, int] = defaultdict(int)
+    by_url: dict[str, int] = defaultdict(int)
+    for index, safe_app in enumerate(safe_apps):
+        bit = 1 << index
+        data = SafeAppsResponseSerializer(safe_app, context={"request": request}).data
+        fragments.append(render_json(data))
+        if safe_app.listed:
+            listed |= bit
+        clients = safe_app.exclusive_clients.all()
+        if not clients:
+            unrestricted |= bit
+        for client in clients:
+            by_client[client.url] |= bit
+        for chain_id in safe_app.chain_ids:
+            by_chain[chain_id] |= bit
+        by_url[safe_app.url] |= bit
+    return SafeAppsCatalog(
+        version=version,
+        fragments=fragments,
+        all=(1 << len(fragments)) - 1,
+        listed=listed,
+        unrestricted=unrestricted,
+        by_chain=dict(by_chain),
+        by_client=dict(by_client),
+        by_url=dict(by_url),
+    )
+
+
+def get_catalog(request: Request) -> SafeAppsCatalog:
+    version = get_version(SAFE_APPS_VERSION_NAMESPACE)
+    # Image fields are rendered as absolute URIs
+    base_url = request.build_absolute_uri("/")
+    catalog = _catalogs.get(base_url)
+    if catalog is None or not catalog.is_current(version):
+        with _lock:
+            catalog = _catalogs.get(base_url)
+            if catalog is None or not catalog.is_current(version):
+                logger.info("Building safe-apps catalog for version %d", version)
+                catalog = build_catalog(request, version)
+                _catalogs[base_url] = catalog
+                CATALOG_LOOKUPS.inc("miss")
+                return catalog
+    CATALOG_LOOKUPS.inc("hit")
+    return catalog
+
+
+async def aget_catalog(request: Request) -> SafeAppsCatalog:
+    """Async get_catalog, a stale catalog is rebuilt in a worker thread."""
+    catalog = _catalogs.get(request.build_absolute_uri("/"))
+    if catalog is not None and catalog.is_current(
+        await aget_version(SAFE_APPS_VERSION_NAMESPACE)
+    ):
+        CATALOG_LOOKUPS.inc("hit")
+        return catalog
+    return await sync_to_async(get_catalog)(request)
+
+
+def clear() -> None:
+    with _lock:
+        _catalogs.clear()
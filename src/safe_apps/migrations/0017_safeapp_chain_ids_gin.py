@@ -0,0 +1,20 @@
+# Generated by Django 6.0.5 on 2026-10-18 10:00
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("safe_apps", "0016_alter_socialprofile_platform"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="safeapp",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["chain_ids"], name="safe_apps_chain_ids_gin"
+            ),
+        ),
+    ]
@@ -4,11 +4,14 @@ from enum import Enum
 from typing import IO, Union
 
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
 from django.core.exceptions import ValidationError
 from django.core.files.images import get_image_dimensions
 from django.core.validators import RegexValidator
 from django.db import models
 
+from config.tracking import TrackedFieldsMixin
+
 _HOSTNAME_VALIDATOR = RegexValidator(
     r"^(https?:\/\/)?(www\.)?[-a-zA-Z0-9@:%._\+~#=]{2,256}\.[a-z]{2,6}\/?$",
     message="Enter a valid hostname (Without a resource path)",
@@ -52,7 +55,7 @@ class Client(models.Model):
         return f"Client: {self.url}"
 
 
-class SafeApp(models.Model):
+class SafeApp(TrackedFieldsMixin, models.Model):
     class AccessControlPolicy(str, Enum):
         NO_RESTRICTIONS = "NO_RESTRICTIONS"
         DOMAIN_ALLOWLIST = "DOMAIN_ALLOWLIST"
@@ -82,8 +85,15 @@ class SafeApp(models.Model):
     developer_website = models.URLField(null=True, blank=True)
     featured = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # Backs the chain_ids__contains (@>) lookups
+            GinIndex(fields=["chain_ids"], name="safe_apps_chain_ids_gin"),
+        ]
+
     def get_access_control_type(self) -> AccessControlPolicy:
-        if self.exclusive_clients.exists():
+        # Reads the prefetched clients, if any (see SafeAppsListView)
+        if self.exclusive_clients.all():
             return SafeApp.AccessControlPolicy.DOMAIN_ALLOWLIST
         return SafeApp.AccessControlPolicy.NO_RESTRICTIONS
 
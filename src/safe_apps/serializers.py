@@ -1,4 +1,6 @@
-from typing import Any
+from typing import Any, TypeVar
+
+from django.db.models import Model, QuerySet
 
 from drf_yasg.utils import swagger_serializer_method
 from rest_framework import serializers
@@ -6,6 +8,16 @@ from rest_framework.utils.serializer_helpers import ReturnDict
 
 from .models import Client, Feature, Provider, SafeApp, SocialProfile, Tag
 
+_M = TypeVar("_M", bound=Model)
+
+
+def _ordered(queryset: QuerySet[_M], field: str) -> QuerySet[_M]:
+    # Prefetched querysets (see SafeAppsListView) are already ordered, and
+    # ordering them again would run a new query per Safe App
+    if queryset.ordered:
+        return queryset
+    return queryset.order_by(field)
+
 
 class ProviderSerializer(serializers.ModelSerializer[Provider]):
     class Meta:
@@ -101,15 +113,15 @@ class SafeAppsResponseSerializer(serializers.ModelSerializer[SafeApp]):
 
     @swagger_serializer_method(serializer_or_field=TagSerializer)  # type: ignore[untyped-decorator]
     def get_tags(self, instance: SafeApp) -> ReturnDict[Any, Any]:
-        queryset = instance.tag_set.all().order_by("name")
-        return TagSerializer(queryset, many=True).data
+        tags = _ordered(instance.tag_set.all(), "name")
+        return TagSerializer(tags, many=True).data
 
     @swagger_serializer_method(serializer_or_field=FeatureSerializer)  # type: ignore[untyped-decorator]
     def get_features(self, instance: SafeApp) -> ReturnDict[Any, Any]:
-        features = instance.feature_set.all().order_by("key")
+        features = _ordered(instance.feature_set.all(), "key")
         return FeatureSerializer(features, many=True).data
 
     @swagger_serializer_method(serializer_or_field=SocialProfileSerializer)  # type: ignore[untyped-decorator]
     def get_social_profiles(self, instance: SafeApp) -> ReturnDict[Any, Any]:
-        profiles = instance.socialprofile_set.all().order_by("platform")
+        profiles = _ordered(instance.socialprofile_set.all(), "platform")
         return SocialProfileSerializer(profiles, many=True).data
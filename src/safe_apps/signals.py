@@ -1,7 +1,9 @@
 import logging
+import threading
+from collections.abc import Iterable
 from typing import Any
 
-from django.core.cache import caches
+from django.core.signals import request_finished
 from django.db.models.signals import (
     m2m_changed,
     post_delete,
@@ -11,44 +13,112 @@ from django.db.models.signals import (
 )
 from django.dispatch import receiver
 
-from clients.safe_client_gateway import HookEvent, hook_event
+from clients.safe_client_gateway import HookEvent, hook_events
 
-from .models import Feature, Provider, SafeApp, Tag
+from . import caching
+from .models import Client, Feature, Provider, SafeApp, SocialProfile, Tag
 
 logger = logging.getLogger(__name__)
 
 
+def _notify(chain_ids: Iterable[int]) -> None:
+    hook_events(
+        HookEvent(type=HookEvent.Type.SAFE_APPS_UPDATE, chain_id=chain_id)
+        for chain_id in chain_ids
+    )
+
+
+def _get_chain_ids(safe_apps: Iterable[SafeApp]) -> set[int]:
+    return {chain_id for safe_app in safe_apps for chain_id in safe_app.chain_ids}
+
+
+def _get_m2m_chain_ids(
+    instance: Tag | Feature | SafeApp,
+    action: str,
+    pk_set: set[int] | None,
+    reverse: bool,
+) -> set[int]:
+    """Chain ids of the Safe Apps affected by a Tag/Feature m2m change."""
+    if isinstance(instance, SafeApp):  # reverse relation: pk_set holds Tags/Features
+        return set(instance.chain_ids)
+    if action == "pre_clear":
+        return _get_chain_ids(instance.safe_apps.all())
+    return _get_chain_ids(SafeApp.objects.filter(app_id__in=pk_set or ()))
+
+
+# Chain ids of the Safe Apps being saved, by id, as they were before the save:
+# None if their fields are unchanged
+_saved_safe_app_storage = threading.local()
+
+
+def _get_saved_safe_apps() -> dict[int, tuple[SafeApp, set[int] | None]]:
+    if not hasattr(_saved_safe_app_storage, "chain_ids"):
+        _saved_safe_app_storage.chain_ids = {}
+    chain_ids: dict[int, tuple[SafeApp, set[int] | None]] = (
+        _saved_safe_app_storage.chain_ids
+    )
+    return chain_ids
+
+
+@receiver(request_finished)
+def _clear_saved_safe_apps(**kwargs: Any) -> None:
+    if hasattr(_saved_safe_app_storage, "chain_ids"):
+        _saved_safe_app_storage.chain_ids.clear()
+
+
+# Saving a Safe App without changing its fields, e.g. an admin save without
+# edits, neither invalidates the caches nor notifies CGW. The fields are
+# compared with the values the Safe App was loaded with (see config.tracking)
 @receiver(pre_save, sender=SafeApp)
-def on_safe_app_update(sender: SafeApp, instance: SafeApp, **kwargs: Any) -> None:
-    logger.info("Clearing safe-apps cache")
-    caches["safe-apps"].clear()
-    chain_ids = set(instance.chain_ids)
-    if instance.app_id is not None:  # existing SafeApp being updated
+def on_safe_app_pre_save(sender: SafeApp, instance: SafeApp, **kwargs: Any) -> None:
+    changed = instance.get_changed_fields()
+    if changed is not None and not changed:
+        _get_saved_safe_apps()[id(instance)] = (instance, None)
+        return
+    previous_chain_ids: set[int] = set()
+    if changed is not None:
+        previous_chain_ids.update(instance.get_tracked_value("chain_ids") or ())
+    elif instance.app_id is not None:  # existing SafeApp, not loaded
         previous = SafeApp.objects.filter(app_id=instance.app_id).first()
         if previous is not None:
-            chain_ids.update(previous.chain_ids)
-    for chain_id in chain_ids:
-        hook_event(HookEvent(type=HookEvent.Type.SAFE_APPS_UPDATE, chain_id=chain_id))
+            previous_chain_ids.update(previous.chain_ids)
+    _get_saved_safe_apps()[id(instance)] = (instance, previous_chain_ids)
+
+
+@receiver(post_save, sender=SafeApp)
+def on_safe_app_update(sender: SafeApp, instance: SafeApp, **kwargs: Any) -> None:
+    # The instance is kept in the storage so its id cannot be reused
+    saved, previous_chain_ids = _get_saved_safe_apps().pop(
+        id(instance), (instance, set())
+    )
+    if saved is not instance:
+        previous_chain_ids = set()
+    if previous_chain_ids is None:
+        logger.info(
+            "Safe App %s fields unchanged. Skipping CGW webhook",
+            instance.app_id,
+        )
+        return
+    chain_ids = previous_chain_ids | set(instance.chain_ids)
+    logger.info("Clearing safe-apps cache")
+    caching.invalidate(chain_ids)
+    _notify(chain_ids)
 
 
 @receiver(post_delete, sender=SafeApp)
 def on_safe_app_delete(sender: SafeApp, instance: SafeApp, **kwargs: Any) -> None:
     logger.info("Clearing safe-apps cache")
-    caches["safe-apps"].clear()
-    for chain_id in instance.chain_ids:
-        hook_event(HookEvent(type=HookEvent.Type.SAFE_APPS_UPDATE, chain_id=chain_id))
+    caching.invalidate(instance.chain_ids)
+    _notify(instance.chain_ids)
 
 
 @receiver(post_save, sender=Provider)
 @receiver(post_delete, sender=Provider)
 def on_provider_update(sender: Provider, instance: Provider, **kwargs: Any) -> None:
     logger.info("Clearing safe-apps cache")
-    caches["safe-apps"].clear()
-    for safe_app in instance.safeapp_set.all():
-        for chain_id in safe_app.chain_ids:
-            hook_event(
-                HookEvent(type=HookEvent.Type.SAFE_APPS_UPDATE, chain_id=chain_id)
-            )
+    safe_apps = list(instance.safeapp_set.all())
+    caching.invalidate(_get_chain_ids(safe_apps))
+    _notify(chain_id for safe_app in safe_apps for chain_id in safe_app.chain_ids)
 
 
 # pre_delete is used because on pre_delete the model still has safe_apps
@@ -57,29 +127,27 @@ def on_provider_update(sender: Provider, instance: Provider, **kwargs: Any) -> N
 @receiver(pre_delete, sender=Tag)
 def on_tag_update(sender: Tag, instance: Tag, **kwargs: Any) -> None:
     logger.info("Clearing safe-apps cache")
-    caches["safe-apps"].clear()
-    for safe_app in instance.safe_apps.all():
-        for chain_id in safe_app.chain_ids:
-            hook_event(
-                HookEvent(type=HookEvent.Type.SAFE_APPS_UPDATE, chain_id=chain_id)
-            )
+    safe_apps = list(instance.safe_apps.all())
+    caching.invalidate(_get_chain_ids(safe_apps))
+    _notify(chain_id for safe_app in safe_apps for chain_id in safe_app.chain_ids)
 
 
 @receiver(m2m_changed, sender=Tag.safe_apps.through)
 def on_tag_chains_update(
-    sender: Tag, instance: Tag, action: str, pk_set: set[int], **kwargs: Any
+    sender: Tag,
+    instance: Tag | SafeApp,
+    action: str,
+    pk_set: set[int] | None,
+    reverse: bool,
+    **kwargs: Any,
 ) -> None:
     logger.info("TagChains update. Triggering CGW webhook")
-    caches["safe-apps"].clear()
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    chain_ids = _get_m2m_chain_ids(instance, action, pk_set, reverse)
+    caching.invalidate(chain_ids)
     if action == "post_add" or action == "post_remove":
-        chain_ids = set()
-        for safe_app in SafeApp.objects.filter(app_id__in=pk_set):
-            for chain_id in safe_app.chain_ids:
-                chain_ids.add(chain_id)
-        for chain_id in chain_ids:
-            hook_event(
-                HookEvent(type=HookEvent.Type.SAFE_APPS_UPDATE, chain_id=chain_id)
-            )
+        _notify(chain_ids)
 
 
 # pre_delete is used because on pre_delete the model still has safe_apps
@@ -88,26 +156,81 @@ def on_tag_chains_update(
 @receiver(pre_delete, sender=Feature)
 def on_feature_update(sender: Feature, instance: Feature, **kwargs: Any) -> None:
     logger.info("Feature update. Triggering CGW webhook")
-    caches["safe-apps"].clear()
-    for safe_app in instance.safe_apps.all():
-        for chain_id in safe_app.chain_ids:
-            hook_event(
-                HookEvent(type=HookEvent.Type.SAFE_APPS_UPDATE, chain_id=chain_id)
-            )
+    safe_apps = list(instance.safe_apps.all())
+    caching.invalidate(_get_chain_ids(safe_apps))
+    _notify(chain_id for safe_app in safe_apps for chain_id in safe_app.chain_ids)
 
 
 @receiver(m2m_changed, sender=Feature.safe_apps.through)
 def on_feature_safe_apps_update(
-    sender: Feature, instance: Feature, action: str, pk_set: set[int], **kwargs: Any
+    sender: Feature,
+    instance: Feature | SafeApp,
+    action: str,
+    pk_set: set[int] | None,
+    reverse: bool,
+    **kwargs: Any,
 ) -> None:
     logger.info("FeatureSafeApps update. Triggering CGW webhook")
-    caches["safe-apps"].clear()
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    chain_ids = _get_m2m_chain_ids(instance, action, pk_set, reverse)
+    caching.invalidate(chain_ids)
     if action == "post_add" or action == "post_remove":
-        chain_ids = set()
-        for safe_app in SafeApp.objects.filter(app_id__in=pk_set):
-            for chain_id in safe_app.chain_ids:
-                chain_ids.add(chain_id)
-        for chain_id in chain_ids:
-            hook_event(
-                HookEvent(type=HookEvent.Type.SAFE_APPS_UPDATE, chain_id=chain_id)
-            )
+        _notify(chain_ids)
+
+
+# Chain ids of the Safe Apps of a Client, by id, between the pre_clear and
+# post_clear signals of its exclusive Safe Apps
+_cleared_client_storage = threading.local()
+
+
+def _get_cleared_clients() -> dict[int, set[int]]:
+    if not hasattr(_cleared_client_storage, "chain_ids"):
+        _cleared_client_storage.chain_ids = {}
+    chain_ids: dict[int, set[int]] = _cleared_client_storage.chain_ids
+    return chain_ids
+
+
+# The following changes are part of the safe-apps payloads but are not
+# notified to CGW. Only the local caches are invalidated.
+# pre_delete is used because on pre_delete the model still has safe_apps
+# which is not the case on post_delete
+@receiver(post_save, sender=Client)
+@receiver(pre_delete, sender=Client)
+def on_client_update(sender: Client, instance: Client, **kwargs: Any) -> None:
+    logger.info("Clearing safe-apps cache")
+    caching.invalidate(_get_chain_ids(instance.safeapp_set.all()))
+
+
+@receiver(m2m_changed, sender=SafeApp.exclusive_clients.through)
+def on_safe_app_exclusive_clients_update(
+    sender: SafeApp,
+    instance: SafeApp | Client,
+    action: str,
+    pk_set: set[int] | None,
+    **kwargs: Any,
+) -> None:
+    if action == "pre_clear" and isinstance(instance, Client):
+        # The Safe Apps of the Client are gone on post_clear
+        _get_cleared_clients()[id(instance)] = _get_chain_ids(
+            instance.safeapp_set.all()
+        )
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if isinstance(instance, SafeApp):
+        chain_ids = set(instance.chain_ids)
+    elif action == "post_clear":
+        chain_ids = _get_cleared_clients().pop(id(instance), set())
+    else:
+        chain_ids = _get_chain_ids(SafeApp.objects.filter(app_id__in=pk_set or ()))
+    logger.info("Clearing safe-apps cache")
+    caching.invalidate(chain_ids)
+
+
+@receiver(post_save, sender=SocialProfile)
+@receiver(post_delete, sender=SocialProfile)
+def on_social_profile_update(
+    sender: SocialProfile, instance: SocialProfile, **kwargs: Any
+) -> None:
+    logger.info("Clearing safe-apps cache")
+    caching.invalidate(instance.safe_app.chain_ids)
@@ -35,6 +35,20 @@ class ChainIdFilterTest(TestCase):
         expected = [(1, 1), (3, 3), (100, 100)]
         self.assertEqual(filterspec.lookup_choices, expected)  # type: ignore[attr-defined]
 
+    def test_look_up_deduplicates_chains(self) -> None:
+        SafeAppFactory.create(chain_ids=[3, 1])
+        SafeAppFactory.create(chain_ids=[1, 100])
+        SafeAppFactory.create(chain_ids=[100])
+        safe_app_admin = SafeAppAdmin(SafeApp, site)
+        request = self.request_factory.get("/")
+        request.user = self.alfred
+
+        changelist = safe_app_admin.get_changelist_instance(request)
+
+        filterspec = changelist.get_filters(request)[0][0]
+        expected = [(1, 1), (3, 3), (100, 100)]
+        self.assertEqual(filterspec.lookup_choices, expected)  # type: ignore[attr-defined]
+
     def test_unfiltered_lookup(self) -> None:
         safe_app_1 = SafeAppFactory.create(chain_ids=[3])
         safe_app_2 = SafeAppFactory.create(chain_ids=[1])
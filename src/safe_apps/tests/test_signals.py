@@ -1,3 +1,6 @@
+import json
+from unittest import mock
+
 import responses
 from django.test import TestCase, override_settings
 from faker import Faker
@@ -267,17 +270,17 @@ class ProviderHookTestCase(TestCase):
         provider = ProviderFactory.create()
         SafeAppFactory.create(chain_ids=[chain_id], provider=provider)
 
-        # Safe App Creation, Safe App Update
-        assert len(responses.calls) == 2
-        assert isinstance(responses.calls[1], responses.Call)
+        # Safe App Creation
+        assert len(responses.calls) == 1
+        assert isinstance(responses.calls[0], responses.Call)
         assert responses.calls[
-            1
+            0
         ].request.body == f'{{"type": "SAFE_APPS_UPDATE", "chainId": "{chain_id}"}}'.encode(
             "utf-8"
         )
-        assert responses.calls[1].request.url == "http://127.0.0.1/v1/hooks/events"
+        assert responses.calls[0].request.url == "http://127.0.0.1/v1/hooks/events"
         assert (
-            responses.calls[1].request.headers.get("Authorization")
+            responses.calls[0].request.headers.get("Authorization")
             == "Basic example-token"
         )
 
@@ -290,17 +293,17 @@ class ProviderHookTestCase(TestCase):
         provider.name = "New name"
         provider.save()
 
-        # Safe App Creation, Safe App Update, Provider update
-        assert len(responses.calls) == 3
-        assert isinstance(responses.calls[2], responses.Call)
+        # Safe App Creation, Provider update
+        assert len(responses.calls) == 2
+        assert isinstance(responses.calls[1], responses.Call)
         assert responses.calls[
-            2
+            1
         ].request.body == f'{{"type": "SAFE_APPS_UPDATE", "chainId": "{chain_id}"}}'.encode(
             "utf-8"
         )
-        assert responses.calls[2].request.url == "http://127.0.0.1/v1/hooks/events"
+        assert responses.calls[1].request.url == "http://127.0.0.1/v1/hooks/events"
         assert (
-            responses.calls[2].request.headers.get("Authorization")
+            responses.calls[1].request.headers.get("Authorization")
             == "Basic example-token"
         )
 
@@ -319,17 +322,17 @@ class ProviderHookTestCase(TestCase):
 
         provider.delete()
 
-        # Safe App Creation, Safe App Update, Provider update
-        assert len(responses.calls) == 2
-        assert isinstance(responses.calls[1], responses.Call)
+        # Safe App Creation, Provider update
+        assert len(responses.calls) == 1
+        assert isinstance(responses.calls[0], responses.Call)
         assert responses.calls[
-            1
+            0
         ].request.body == f'{{"type": "SAFE_APPS_UPDATE", "chainId": "{chain_id}"}}'.encode(
             "utf-8"
         )
-        assert responses.calls[1].request.url == "http://127.0.0.1/v1/hooks/events"
+        assert responses.calls[0].request.url == "http://127.0.0.1/v1/hooks/events"
         assert (
-            responses.calls[1].request.headers.get("Authorization")
+            responses.calls[0].request.headers.get("Authorization")
             == "Basic example-token"
         )
 
@@ -349,11 +352,11 @@ class TagHookTestCase(TestCase):
 
         TagFactory.create(safe_apps=(safe_app,))
 
-        # Safe App Creation, Safe App Update, M2M update, Tag create
-        assert len(responses.calls) == 4
-        assert isinstance(responses.calls[3], responses.Call)
+        # Safe App Creation, M2M update, Tag create
+        assert len(responses.calls) == 3
+        assert isinstance(responses.calls[2], responses.Call)
         assert responses.calls[
-            3
+            2
         ].request.body == f'{{"type": "SAFE_APPS_UPDATE", "chainId": "{chain_id}"}}'.encode(
             "utf-8"
         )
@@ -376,11 +379,11 @@ class TagHookTestCase(TestCase):
         tag.name = "test"
         tag.save()
 
-        # Safe App Creation, Safe App Update, M2M update, Tag create, Tag update
-        assert len(responses.calls) == 5
-        assert isinstance(responses.calls[4], responses.Call)
+        # Safe App Creation, M2M update, Tag create, Tag update
+        assert len(responses.calls) == 4
+        assert isinstance(responses.calls[3], responses.Call)
         assert responses.calls[
-            4
+            3
         ].request.body == f'{{"type": "SAFE_APPS_UPDATE", "chainId": "{chain_id}"}}'.encode(
             "utf-8"
         )
@@ -401,11 +404,11 @@ class TagHookTestCase(TestCase):
 
         tag.delete()
 
-        # Safe App Creation, Safe App Update, M2M update, Tag create, Tag delete
-        assert len(responses.calls) == 5
-        assert isinstance(responses.calls[4], responses.Call)
+        # Safe App Creation, M2M update, Tag create, Tag delete
+        assert len(responses.calls) == 4
+        assert isinstance(responses.calls[3], responses.Call)
         assert responses.calls[
-            4
+            3
         ].request.body == f'{{"type": "SAFE_APPS_UPDATE", "chainId": "{chain_id}"}}'.encode(
             "utf-8"
         )
@@ -464,11 +467,11 @@ class FeatureHookTestCase(TestCase):
 
         FeatureFactory.create(safe_apps=(safe_app,))
 
-        # Safe App Creation, Safe App Update, M2M update, Feature create
-        assert len(responses.calls) == 4
-        assert isinstance(responses.calls[3], responses.Call)
+        # Safe App Creation, M2M update, Feature create
+        assert len(responses.calls) == 3
+        assert isinstance(responses.calls[2], responses.Call)
         assert responses.calls[
-            3
+            2
         ].request.body == f'{{"type": "SAFE_APPS_UPDATE", "chainId": "{chain_id}"}}'.encode(
             "utf-8"
         )
@@ -491,11 +494,11 @@ class FeatureHookTestCase(TestCase):
         feature.name = "test"
         feature.save()
 
-        # Safe App Creation, Safe App Update, M2M update, Feature create, Feature update
-        assert len(responses.calls) == 5
-        assert isinstance(responses.calls[4], responses.Call)
+        # Safe App Creation, M2M update, Feature create, Feature update
+        assert len(responses.calls) == 4
+        assert isinstance(responses.calls[3], responses.Call)
         assert responses.calls[
-            4
+            3
         ].request.body == f'{{"type": "SAFE_APPS_UPDATE", "chainId": "{chain_id}"}}'.encode(
             "utf-8"
         )
@@ -516,11 +519,11 @@ class FeatureHookTestCase(TestCase):
 
         feature.delete()
 
-        # Safe App Creation, Safe App Update, M2M update, Feature create, Feature delete
-        assert len(responses.calls) == 5
-        assert isinstance(responses.calls[4], responses.Call)
+        # Safe App Creation, M2M update, Feature create, Feature delete
+        assert len(responses.calls) == 4
+        assert isinstance(responses.calls[3], responses.Call)
         assert responses.calls[
-            4
+            3
         ].request.body == f'{{"type": "SAFE_APPS_UPDATE", "chainId": "{chain_id}"}}'.encode(
             "utf-8"
         )
@@ -562,3 +565,52 @@ class FeatureHookTestCase(TestCase):
         ].request.body == f'{{"type": "SAFE_APPS_UPDATE", "chainId": "{chain_id_2}"}}'.encode(
             "utf-8"
         )
+
+
+@override_settings(CGW_URL="http://127.0.0.1", CGW_AUTH_TOKEN="example-token")
+class UnchangedSafeAppHookTestCase(TestCase):
+    @responses.activate
+    def test_no_hook_on_save_without_changes(self) -> None:
+        safe_app = SafeAppFactory.create(chain_ids=[1], provider=ProviderFactory.create())
+        TagFactory.create(safe_apps=(safe_app,))
+        responses.reset()
+        responses.add(responses.POST, "http://127.0.0.1/v1/hooks/events", status=200)
+
+        SafeApp.objects.get(pk=safe_app.pk).save()
+
+        assert len(responses.calls) == 0
+
+    @responses.activate
+    def test_hook_on_listed_change(self) -> None:
+        safe_app = SafeAppFactory.create(chain_ids=[1], listed=True)
+        responses.reset()
+        responses.add(responses.POST, "http://127.0.0.1/v1/hooks/events", status=200)
+
+        safe_app.listed = False
+        safe_app.save()
+
+        assert [json.loads(call.request.body) for call in responses.calls] == [
+            {"type": "SAFE_APPS_UPDATE", "chainId": "1"}
+        ]
+
+    @responses.activate
+    def test_invalidation_after_save(self) -> None:
+        safe_app = SafeAppFactory.create(chain_ids=[1])
+        responses.reset()
+        responses.add(responses.POST, "http://127.0.0.1/v1/hooks/events", status=200)
+        saved_chain_ids = []
+
+        def invalidate(chain_ids: set[int]) -> None:
+            saved_chain_ids.append(SafeApp.objects.get(pk=safe_app.pk).chain_ids)
+
+        safe_app.chain_ids = [2]
+        with mock.patch(
+            "safe_apps.signals.caching.invalidate", side_effect=invalidate
+        ) as invalidate_mock:
+            safe_app.save()
+
+        invalidate_mock.assert_called_once_with({1, 2})
+        assert saved_chain_ids == [[2]]
+        assert sorted(
+            json.loads(call.request.body)["chainId"] for call in responses.calls
+        ) == ["1", "2"]
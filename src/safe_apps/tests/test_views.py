@@ -1,9 +1,17 @@
+import os
+import tempfile
 from typing import Any, Dict, List
+from unittest.mock import patch
 
+from django.test import AsyncRequestFactory, TestCase, override_settings
 from django.urls import reverse
 from rest_framework.test import APITestCase
 
-from ..models import SocialProfile
+from config.async_views import build_async_view
+
+from .. import caching
+from ..models import SafeApp, SocialProfile
+from ..views import SafeAppsListView, fast_safe_apps_list
 from .factories import (
     ClientFactory,
     FeatureFactory,
@@ -651,6 +659,242 @@ class CacheSafeAppTests(APITestCase):
         self.assertCountEqual(response.json(), json_response)
 
 
+class SharedCacheSafeAppTests(APITestCase):
+    def test_invalidation_is_shared_through_the_cache_location(self) -> None:
+        with tempfile.TemporaryDirectory() as location:
+            caches_setting = {
+                "default": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": location,
+                }
+            }
+            with override_settings(CACHES=caches_setting):
+                SafeAppFactory.create()
+                url = reverse("v1:safe-apps:list")
+
+                self.client.get(path=url, data=None, format="json")
+                # Any worker sharing the location can read the config versions
+                self.assertNotEqual(os.listdir(location), [])
+
+                # and sees the version bumped after a change in any other worker
+                SafeAppFactory.create()
+                response = self.client.get(path=url, data=None, format="json")
+
+            self.assertEqual(len(response.json()), 2)
+
+
+class PerChainInvalidationSafeAppTests(APITestCase):
+    def test_change_on_other_chain_keeps_etag(self) -> None:
+        SafeAppFactory.create(chain_ids=[1])
+        url = reverse("v1:safe-apps:list") + f'{"?chainId=1"}'
+        etag = self.client.get(path=url, data=None, format="json").headers["ETag"]
+
+        SafeAppFactory.create(chain_ids=[2])
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                path=url, data=None, format="json", HTTP_IF_NONE_MATCH=etag
+            )
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_change_on_same_chain_invalidates_response(self) -> None:
+        safe_app = SafeAppFactory.create(chain_ids=[1])
+        url = reverse("v1:safe-apps:list") + f'{"?chainId=1"}'
+        self.client.get(path=url, data=None, format="json")
+
+        tag = TagFactory.create()
+        tag.safe_apps.add(safe_app)
+        response = self.client.get(path=url, data=None, format="json")
+
+        self.assertEqual(response.json()[0]["tags"], [tag.name])
+
+    def test_change_on_any_chain_invalidates_unfiltered_response(self) -> None:
+        SafeAppFactory.create(chain_ids=[1])
+        url = reverse("v1:safe-apps:list")
+        self.client.get(path=url, data=None, format="json")
+
+        SafeAppFactory.create(chain_ids=[2])
+        response = self.client.get(path=url, data=None, format="json")
+
+        self.assertEqual(len(response.json()), 2)
+
+    def test_moving_safe_app_to_other_chain_invalidates_both(self) -> None:
+        safe_app = SafeAppFactory.create(chain_ids=[1])
+        url_1 = reverse("v1:safe-apps:list") + f'{"?chainId=1"}'
+        url_2 = reverse("v1:safe-apps:list") + f'{"?chainId=2"}'
+        self.client.get(path=url_1, data=None, format="json")
+        self.client.get(path=url_2, data=None, format="json")
+
+        safe_app.chain_ids = [2]
+        safe_app.save()
+
+        self.assertEqual(
+            self.client.get(path=url_1, data=None, format="json").json(), []
+        )
+        self.assertEqual(
+            len(self.client.get(path=url_2, data=None, format="json").json()), 1
+        )
+
+    def test_client_delete_invalidates_response(self) -> None:
+        client = ClientFactory.create()
+        SafeAppFactory.create(chain_ids=[1], exclusive_clients=(client,))
+        url = reverse("v1:safe-apps:list") + f'{"?chainId=1"}'
+        etag = self.client.get(path=url, data=None, format="json").headers["ETag"]
+
+        client.delete()
+        response = self.client.get(
+            path=url, data=None, format="json", HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()[0]["accessControl"]["type"], "NO_RESTRICTIONS"
+        )
+
+    def test_exclusive_clients_change_invalidates_once(self) -> None:
+        client = ClientFactory.create()
+        safe_app = SafeAppFactory.create(chain_ids=[1])
+
+        with patch("safe_apps.signals.caching.invalidate") as invalidate:
+            safe_app.exclusive_clients.add(client)
+            client.safeapp_set.clear()
+
+        self.assertEqual(
+            [set(call.args[0]) for call in invalidate.call_args_list], [{1}, {1}]
+        )
+
+
+class SafeAppsQueryCountTests(APITestCase):
+    def test_query_count_does_not_depend_on_safe_apps(self) -> None:
+        client = ClientFactory.create()
+        provider = ProviderFactory.create()
+        for count in (1, 20):
+            with self.subTest(count=count):
+                for _ in range(count):
+                    safe_app = SafeAppFactory.create(
+                        provider=provider, exclusive_clients=(client,)
+                    )
+                    TagFactory.create(safe_apps=(safe_app,))
+                    FeatureFactory.create(safe_apps=(safe_app,))
+                    SocialProfileFactory.create(safe_app=safe_app)
+                url = reverse("v1:safe-apps:list")
+
+                # safe apps with providers, clients, tags, features and
+                # social profiles
+                with self.assertNumQueries(5):
+                    response = self.client.get(path=url, data=None, format="json")
+
+                self.assertEqual(len(response.json()), count)
+                SafeApp.objects.all().delete()
+
+
+class SafeAppsCatalogTests(APITestCase):
+    def test_any_filter_combination_is_served_from_the_catalog(self) -> None:
+        client = ClientFactory.create(url="safe.global")
+        safe_app_1 = SafeAppFactory.create(chain_ids=[1, 2], exclusive_clients=(client,))
+        safe_app_2 = SafeAppFactory.create(chain_ids=[1], listed=False)
+        SafeAppFactory.create(chain_ids=[2], exclusive_clients=(ClientFactory.create(),))
+        url = reverse("v1:safe-apps:list")
+        self.client.get(path=url, data=None, format="json")
+
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                path=url + "?chainId=1&clientUrl=safe.global&onlyListed=true",
+                data=None,
+                format="json",
+            )
+
+        self.assertEqual([app["id"] for app in response.json()], [safe_app_1.app_id])
+
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                path=url + "?chainId=1&clientUrl=other.global",
+                data=None,
+                format="json",
+            )
+
+        self.assertEqual([app["id"] for app in response.json()], [safe_app_2.app_id])
+
+    def test_catalog_is_rebuilt_on_change(self) -> None:
+        SafeAppFactory.create(chain_ids=[1])
+        url = reverse("v1:safe-apps:list") + "?onlyListed=true"
+        self.client.get(path=url, data=None, format="json")
+
+        SafeAppFactory.create(chain_ids=[1], listed=True)
+        response = self.client.get(
+            path=reverse("v1:safe-apps:list") + "?chainId=1",
+            data=None,
+            format="json",
+        )
+
+        self.assertEqual(len(response.json()), 2)
+
+
+class ConditionalGetSafeAppTests(APITestCase):
+    def test_matching_etag_returns_not_modified(self) -> None:
+        SafeAppFactory.create()
+        url = reverse("v1:safe-apps:list")
+        etag = self.client.get(path=url, data=None, format="json").headers["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                path=url, data=None, format="json", HTTP_IF_NONE_MATCH=etag
+            )
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_etag_changes_on_social_profile_update(self) -> None:
+        safe_app = SafeAppFactory.create()
+        url = reverse("v1:safe-apps:list")
+        etag = self.client.get(path=url, data=None, format="json").headers["ETag"]
+
+        social_profile = SocialProfileFactory.create(safe_app=safe_app)
+        response = self.client.get(
+            path=url, data=None, format="json", HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        self.assertEqual(
+            response.json()[0]["socialProfiles"],
+            [{"platform": social_profile.platform, "url": social_profile.url}],
+        )
+
+    def test_etag_differs_per_query(self) -> None:
+        SafeAppFactory.create()
+        url = reverse("v1:safe-apps:list")
+
+        response_1 = self.client.get(path=url, data=None, format="json")
+        response_2 = self.client.get(
+            path=url + "?onlyListed=true", data=None, format="json"
+        )
+
+        self.assertNotEqual(response_1.headers["ETag"], response_2.headers["ETag"])
+
+
+class AsyncSafeAppsListViewTests(TestCase):
+    def setUp(self) -> None:
+        SafeAppFactory.create(chain_ids=[1])
+        SafeAppFactory.create(chain_ids=[2], listed=False)
+
+    async def test_responses_match_sync_view(self) -> None:
+        view = build_async_view(
+            SafeAppsListView, fast_safe_apps_list, caching.aetag
+        )
+        url = reverse("v1:safe-apps:list")
+        for query in ("", "?chainId=1", "?onlyListed=true", "?chainId=invalid"):
+            with self.subTest(query=query):
+                expected = await self.async_client.get(url + query)
+
+                response = await view(AsyncRequestFactory().get(url + query))
+
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.content, expected.content)
+                self.assertEqual(response["ETag"], expected["ETag"])
+                self.assertEqual(response["Cache-Control"], expected["Cache-Control"])
+
+
 class SafeAppsVisibilityTests(APITestCase):
     def test_listed_safe_app_is_shown(self) -> None:
         listed_safe_app = SafeAppFactory.create(listed=True)
@@ -1,9 +1,16 @@
 from django.urls import path
 
-from .views import SafeAppsListView
+from config.async_views import async_view
+
+from . import caching
+from .views import SafeAppsListView, fast_safe_apps_list
 
 app_name = "apps"
 
 urlpatterns = [
-    path("", SafeAppsListView.as_view(), name="list"),
+    path(
+        "",
+        async_view(SafeAppsListView, fast_safe_apps_list, caching.aetag),
+        name="list",
+    ),
 ]
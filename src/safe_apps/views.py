@@ -1,25 +1,56 @@
 from typing import Any, Union
 
-from django.db.models import Q, QuerySet
+from django.http import HttpRequest, HttpResponse, QueryDict
+from django.utils.cache import patch_response_headers
 from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
+from django.views.decorators.http import condition
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework.generics import ListAPIView
 from rest_framework.request import Request
 from rest_framework.response import Response
 
+from config.rendering import json_response
+
+from . import caching, catalog
 from .models import SafeApp
 from .serializers import SafeAppsResponseSerializer
 
 
+CACHE_TIMEOUT = 60 * 10  # Cache-Control max-age, 10 minutes
+
+
 def parse_boolean_query_param(value: Union[bool, str, int]) -> bool:
     return value in (True, "True", "true", "1", 1)
 
 
+def render_catalog(
+    safe_apps_catalog: catalog.SafeAppsCatalog, query_params: QueryDict
+) -> HttpResponse:
+    chain_id = query_params.get("chainId")
+    client_url = query_params.get("clientUrl")
+    url = query_params.get("url")
+    content = safe_apps_catalog.render(
+        only_listed=parse_boolean_query_param(query_params.get("onlyListed", False)),
+        chain_id=(
+            int(chain_id) if chain_id is not None and chain_id.isdigit() else None
+        ),
+        client_url=client_url if client_url and "\0" not in client_url else None,
+        url=url if url and "\0" not in url else None,
+    )
+    # The Safe Apps are rendered by the catalog
+    response = json_response(content)
+    patch_response_headers(response, CACHE_TIMEOUT)
+    return response
+
+
 class SafeAppsListView(ListAPIView):  # type: ignore[type-arg]
     serializer_class = SafeAppsResponseSerializer
     pagination_class = None
+    queryset = SafeApp.objects.all()
+    # Catalog build: safe apps with providers, clients, tags, features and
+    # social profiles
+    query_budget = 5
 
     _swagger_chain_id_param = openapi.Parameter(
         "chainId",
@@ -48,7 +79,7 @@ class SafeAppsListView(ListAPIView):  # type: ignore[type-arg]
         default=False,
     )
 
-    @method_decorator(cache_page(60 * 10, cache="safe-apps"))  # Cache 10 minutes
+    @method_decorator(condition(etag_func=caching.etag))
     @swagger_auto_schema(
         manual_parameters=[
             _swagger_chain_id_param,
@@ -64,27 +95,13 @@ class SafeAppsListView(ListAPIView):  # type: ignore[type-arg]
         """
         return super().get(request, *args, **kwargs)
 
-    def get_queryset(self) -> QuerySet[SafeApp]:
-        only_listed = parse_boolean_query_param(
-            self.request.query_params.get("onlyListed", False)
-        )
-        if only_listed:
-            queryset = SafeApp.objects.filter(listed=True)
-        else:
-            queryset = SafeApp.objects.all()
-
-        chain_id = self.request.query_params.get("chainId")
-        if chain_id is not None and chain_id.isdigit():
-            queryset = queryset.filter(chain_ids__contains=[chain_id])
-
-        client_url = self.request.query_params.get("clientUrl")
-        if client_url and "\0" not in client_url:
-            queryset = queryset.filter(
-                Q(exclusive_clients__url=client_url) | Q(exclusive_clients__isnull=True)
-            )
-
-        url = self.request.query_params.get("url")
-        if url and "\0" not in url:
-            queryset = queryset.filter(url=url)
-
-        return queryset
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> HttpResponse:  # type: ignore[override]
+        return render_catalog(catalog.get_catalog(request), request.query_params)
+
+
+async def fast_safe_apps_list(request: HttpRequest) -> HttpResponse:
+    """Fast path of the async view (see config.async_views)."""
+    drf_request = Request(request)
+    return render_catalog(
+        await catalog.aget_catalog(drf_request), drf_request.query_params
+    )
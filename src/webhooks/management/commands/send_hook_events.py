@@ -0,0 +1,118 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+import logging
+import time
+from datetime import datetime
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import transaction
+from django.utils import timezone
+
+from clients.safe_client_gateway import send_hook_events
+from webhooks.models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+
+def _claim(batch_size: int) -> tuple[list[OutboxEvent], datetime]:
+    """
+    Leases up to ``batch_size`` due events by pushing their next attempt to the
+    end of the lease, so that no other worker sends them meanwhile.
+
+    The rows are only locked (SKIP LOCKED) for this short transaction: saves
+    enqueueing the same events do not wait for CGW.
+    """
+    with transaction.atomic():
+        outbox_events = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True)
+            .filter(dead_at__isnull=True, next_attempt_at__lte=timezone.now())
+            .order_by("next_attempt_at")[:batch_size]
+        )
+        leased_until = timezone.now() + OutboxEvent.LEASE
+        OutboxEvent.objects.filter(
+            id__in=[outbox_event.id for outbox_event in outbox_events]
+        ).update(next_attempt_at=leased_until)
+    return outbox_events, leased_until
+
+
+def send_due_events(batch_size: int) -> int:
+    """
+    Sends up to ``batch_size`` outbox events whose next attempt is due.
+
+    The events are claimed first (see _claim) so several workers can drain the
+    outbox concurrently, and sent outside of any transaction. Sent events are
+    deleted, failed ones are rescheduled with exponential backoff until they
+    fail CGW_HOOKS_OUTBOX_MAX_ATTEMPTS times. Events enqueued again while
+    being sent are left due.
+
+    Returns:
+        The number of events processed.
+    """
+    outbox_events, leased_until = _claim(batch_size)
+    if not outbox_events:
+        return 0
+
+    hook_events = [outbox_event.to_hook_event() for outbox_event in outbox_events]
+    failed = {id(event) for event in send_hook_events(hook_events)}
+
+    now = timezone.now()
+    with transaction.atomic():
+        # Enqueueing an event again resets its next attempt, ending the lease
+        leased = OutboxEvent.objects.filter(next_attempt_at=leased_until)
+        leased.filter(
+            id__in=[
+                outbox_event.id
+                for outbox_event, hook_event in zip(outbox_events, hook_events)
+                if id(hook_event) not in failed
+            ]
+        ).delete()
+        for outbox_event, hook_event in zip(outbox_events, hook_events):
+            if id(hook_event) not in failed:
+                continue
+            attempts = outbox_event.attempts + 1
+            if attempts >= settings.CGW_HOOKS_OUTBOX_MAX_ATTEMPTS:
+                logger.error(
+                    "Giving up on hook event %s after %d attempts",
+                    outbox_event,
+                    attempts,
+                )
+                leased.filter(id=outbox_event.id).update(attempts=attempts, dead_at=now)
+            else:
+                leased.filter(id=outbox_event.id).update(
+                    attempts=attempts, next_attempt_at=now + outbox_event.backoff()
+                )
+    return len(outbox_events)
+
+
+class Command(BaseCommand):
+    help = "Sends the hook events stored in the outbox to the Safe Client Gateway"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Maximum number of events claimed and sent at once",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait when there are no events due",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once there are no more events due instead of polling",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        while True:
+            processed = send_due_events(options["batch_size"])
+            if processed:
+                self.stdout.write(f"Processed {processed} hook events")
+                continue
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,29 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(choices=[('CHAIN_UPDATE', 'CHAIN_UPDATE'), ('SAFE_APPS_UPDATE', 'SAFE_APPS_UPDATE')], max_length=32)),
+                ('chain_id', models.PositiveBigIntegerField()),
+                ('service', models.CharField(blank=True, default='', max_length=255)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('dead_at', models.DateTimeField(blank=True, null=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('type', 'chain_id', 'service'), name='unique_outbox_event')],
+            },
+        ),
+    ]
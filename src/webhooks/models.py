@@ -0,0 +1,80 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+from collections.abc import Iterable
+from datetime import timedelta
+
+from django.db import models
+from django.utils import timezone
+
+from clients.safe_client_gateway import HookEvent
+
+
+class OutboxEventManager(models.Manager["OutboxEvent"]):
+    def enqueue(self, events: Iterable[HookEvent]) -> None:
+        """
+        Stores ``events`` in the current transaction. An event already in the
+        outbox, even a dead one, is rescheduled to be sent as soon as possible.
+        """
+        now = timezone.now()
+        outbox_events = {
+            (event.type.value, event.chain_id, event.service or ""): OutboxEvent(
+                type=event.type.value,
+                chain_id=event.chain_id,
+                service=event.service or "",
+                attempts=0,
+                next_attempt_at=now,
+                dead_at=None,
+            )
+            for event in events
+        }
+        self.bulk_create(
+            outbox_events.values(),
+            update_conflicts=True,
+            unique_fields=["type", "chain_id", "service"],
+            update_fields=["attempts", "next_attempt_at", "dead_at"],
+        )
+
+
+class OutboxEvent(models.Model):
+    """A hook event pending to be sent to the Safe Client Gateway."""
+
+    # Caps the exponential backoff between failed attempts
+    MAX_BACKOFF = timedelta(minutes=10)
+    # Time given to a worker to send the events it claimed before they are
+    # due again, e.g. if the worker died
+    LEASE = timedelta(minutes=5)
+
+    type = models.CharField(
+        max_length=32, choices=[(t.value, t.value) for t in HookEvent.Type]
+    )
+    chain_id = models.PositiveBigIntegerField()
+    # Empty (instead of NULL) when the event is not for a specific service,
+    # so the unique constraint deduplicates these events too
+    service = models.CharField(max_length=255, blank=True, default="")
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now, db_index=True)
+    # Set once the event failed CGW_HOOKS_OUTBOX_MAX_ATTEMPTS times, it is no
+    # longer sent unless enqueued again
+    dead_at = models.DateTimeField(null=True, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    objects = OutboxEventManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["type", "chain_id", "service"], name="unique_outbox_event"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.type} | {self.chain_id} | {self.service}"
+
+    def to_hook_event(self) -> HookEvent:
+        return HookEvent(
+            type=HookEvent.Type(self.type),
+            chain_id=self.chain_id,
+            service=self.service or None,
+        )
+
+    def backoff(self) -> timedelta:
+        return min(timedelta(seconds=2**self.attempts), self.MAX_BACKOFF)
@@ -0,0 +1,133 @@
+# SPDX-License-Identifier: FSL-1.1-MIT
+import json
+from datetime import timedelta
+from typing import Any
+
+import responses
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from chains.tests.factories import ChainFactory
+from clients.safe_client_gateway import HookEvent
+
+from ..management.commands.send_hook_events import send_due_events
+from ..models import OutboxEvent
+
+HOOKS_URL = "http://127.0.0.1/v1/hooks/events"
+
+
+@override_settings(
+    CGW_URL="http://127.0.0.1", CGW_AUTH_TOKEN="example-token", CGW_HOOKS_OUTBOX=True
+)
+class OutboxTestCase(TestCase):
+    @responses.activate
+    def test_events_are_stored_instead_of_sent(self) -> None:
+        chain = ChainFactory.create()
+
+        assert len(responses.calls) == 0
+        assert list(OutboxEvent.objects.values_list("type", "chain_id", "service")) == [
+            ("CHAIN_UPDATE", chain.id, "")
+        ]
+
+    @responses.activate
+    def test_events_are_deduplicated(self) -> None:
+        chain = ChainFactory.create()
+        OutboxEvent.objects.update(
+            attempts=3, next_attempt_at=timezone.now() + timedelta(hours=1)
+        )
+
+        chain.name = "Updated"
+        chain.save()
+
+        outbox_event = OutboxEvent.objects.get()
+        assert outbox_event.attempts == 0
+        assert outbox_event.next_attempt_at <= timezone.now()
+
+    @responses.activate
+    def test_sent_events_are_deleted(self) -> None:
+        chain = ChainFactory.create()
+        responses.add(responses.POST, HOOKS_URL, status=200)
+
+        call_command("send_hook_events", "--once")
+
+        assert len(responses.calls) == 1
+        assert json.loads(responses.calls[0].request.body) == {
+            "type": "CHAIN_UPDATE",
+            "chainId": str(chain.id),
+        }
+        assert not OutboxEvent.objects.exists()
+
+    @responses.activate
+    def test_failed_events_are_retried_with_backoff(self) -> None:
+        ChainFactory.create()
+        responses.add(responses.POST, HOOKS_URL, status=503)
+
+        assert send_due_events(batch_size=10) == 1
+        outbox_event = OutboxEvent.objects.get()
+        assert outbox_event.attempts == 1
+        assert outbox_event.next_attempt_at > timezone.now()
+        # Not due yet
+        assert send_due_events(batch_size=10) == 0
+
+        OutboxEvent.objects.update(next_attempt_at=timezone.now())
+        assert send_due_events(batch_size=10) == 1
+        outbox_event = OutboxEvent.objects.get()
+        assert outbox_event.attempts == 2
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    @override_settings(CGW_HOOKS_OUTBOX_MAX_ATTEMPTS=2)
+    def test_events_are_dead_after_max_attempts(self) -> None:
+        chain = ChainFactory.create()
+        responses.add(responses.POST, HOOKS_URL, status=503)
+
+        for _ in range(2):
+            assert send_due_events(batch_size=10) == 1
+            OutboxEvent.objects.update(next_attempt_at=timezone.now())
+
+        outbox_event = OutboxEvent.objects.get()
+        assert outbox_event.attempts == 2
+        assert outbox_event.dead_at is not None
+        assert send_due_events(batch_size=10) == 0
+
+        # A new change revives it
+        chain.name = "Updated"
+        chain.save()
+        assert OutboxEvent.objects.get().dead_at is None
+        assert send_due_events(batch_size=10) == 1
+
+    @responses.activate
+    def test_events_are_sent_outside_the_claim(self) -> None:
+        chain = ChainFactory.create()
+
+        def on_request(request: Any) -> tuple[int, dict[str, str], str]:
+            # Leased to this worker
+            assert send_due_events(batch_size=10) == 0
+            # Changed again while being sent
+            OutboxEvent.objects.enqueue(
+                [HookEvent(type=HookEvent.Type.CHAIN_UPDATE, chain_id=chain.id)]
+            )
+            return 200, {}, ""
+
+        responses.add_callback(responses.POST, HOOKS_URL, callback=on_request)
+
+        assert send_due_events(batch_size=10) == 1
+        outbox_event = OutboxEvent.objects.get()
+        assert outbox_event.attempts == 0
+        assert outbox_event.next_attempt_at <= timezone.now()
+
+    def test_backoff_is_exponential_and_capped(self) -> None:
+        assert OutboxEvent(attempts=0).backoff() == timedelta(seconds=1)
+        assert OutboxEvent(attempts=3).backoff() == timedelta(seconds=8)
+        assert OutboxEvent(attempts=30).backoff() == OutboxEvent.MAX_BACKOFF
+
+    @responses.activate
+    def test_events_are_sent_in_batches(self) -> None:
+        ChainFactory.create_batch(3)
+        responses.add(responses.POST, HOOKS_URL, status=200)
+
+        processed = send_due_events(batch_size=2)
+
+        assert processed == 2
+        assert OutboxEvent.objects.count() == 1